@@ -0,0 +1,58 @@
+# Native 后端（MDOFNative 向量化积分器）与 OpenSees 后端的对比：
+# 1. 精度：MDOF_LU 3 层建筑在 H-E12140 × 3.0 下的 MaxDrift / MaxAbsAccel / ResDrift 相对偏差；
+# 2. 速度：同一记录 × 200 个缩放系数，DynamicAnalysisBatch 与逐个 OpenSees 分析的单个工况平均耗时，
+#    分别在记录原始时间步长与 DynamicAnalysisBatch 默认的 DeltaT = 0.1 s 下比较。
+from pathlib import Path
+import os
+import time
+
+import numpy as np
+
+from MDOFModel.models import MDOF_LU as mlu
+from MDOFModel.models import MDOFOpenSees as mops
+
+NumofStories = 3
+Record = os.path.join(os.path.dirname(__file__), 'H-E12140')
+EQScaling = 3.0
+StructuralTypes = ['W1', 'S1', 'S2', 'C1', 'PC1', 'RM1', 'URM']
+
+def build(StructuralType, Backend):
+    bld = mlu.MDOF_LU(NumofStories, 3600, StructuralType)
+    bld.set_DesignLevel('pre-code')
+    fe = mops.MDOFOpenSees(NumofStories, [bld.mass]*bld.N, [bld.K0]*bld.N, bld.DampingRatio,
+        bld.HystereticCurveType, bld.Vyi, bld.betai, bld.etai, bld.DeltaCi, bld.tao)
+    fe.outputdir = os.path.dirname(__file__)
+    fe.Backend = Backend
+    return bld, fe
+
+def rel_dev(a, b):
+    a, b = np.atleast_1d(np.asarray(a, float)), np.atleast_1d(np.asarray(b, float))
+    return np.max(np.abs(a - b)) / np.max(np.abs(a))
+
+# ── 1. 精度 ──────────────────────────────────────────────────────────────────
+print('结构类型  滞回模型              MaxDrift   MaxAbsAccel  ResDrift')
+for StructuralType in StructuralTypes:
+    bld, fe_ops = build(StructuralType, 'OpenSees')
+    fe_ops.DynamicAnalysis(Record, EQScaling, False)
+    _, fe_nat = build(StructuralType, 'Native')
+    fe_nat.DynamicAnalysis(Record, EQScaling, False)
+    print(f'{StructuralType:8s}  {bld.HystereticCurveType:20s}  '
+          f'{rel_dev(fe_ops.MaxDrift, fe_nat.MaxDrift):.1e}    '
+          f'{rel_dev(fe_ops.MaxAbsAccel, fe_nat.MaxAbsAccel):.1e}      '
+          f'{rel_dev(fe_ops.ResDrift, fe_nat.ResDrift):.1e}')
+
+# ── 2. 速度 ──────────────────────────────────────────────────────────────────
+N_Batch = 200
+N_OpenSees = 20    # OpenSees 逐个分析较慢，取部分工况的平均耗时
+Scalings = np.linspace(0.5, 5.0, N_Batch)
+_, fe = build('S2', 'OpenSees')
+for DeltaT in ('AsInRecord', 0.1):
+    t0 = time.perf_counter()
+    fe.DynamicAnalysisBatch(Record, Scalings.tolist(), DeltaT)
+    t_native = (time.perf_counter() - t0) / N_Batch
+    t0 = time.perf_counter()
+    for sf in Scalings[::N_Batch // N_OpenSees]:
+        fe.DynamicAnalysis(Record, sf, False, DeltaT)
+    t_ops = (time.perf_counter() - t0) / N_OpenSees
+    print(f'DeltaT = {DeltaT}: 单个工况平均耗时 OpenSees {t_ops:.4f} s, '
+          f'Native 批量 {t_native:.4f} s, 加速比 {t_ops / t_native:.1f}')
@@ -34,8 +34,9 @@ Example 7 — 6 层钢矩形框架：自定义 EDP（柱截面应变）IDA 与 P
 ``if __name__ == '__main__':`` 块内，Python ``multiprocessing`` spawn 模式对它们可
 正确 pickle，因此 ``NumPool > 1`` 的并行 IDA 完全受支持。
 
-``tmp_dir``（= ``TmpDir/opensees_{UniqueRecorderPrefix}``）在每条地震波记录
-对应唯一子目录，确保并行进程间 recorder 输出文件不冲突。
+``tmp_dir`` 为每次动力分析（进程 × 记录 × IM）单独建立的临时目录（见
+``GeneralModelWrapper.ScratchMode``），确保并行进程间 recorder 输出文件不冲突；
+``extra_post_process`` 返回后该目录即被删除，需要保留时设置 ``KeepScratch = True``。
 """
 
 from pathlib import Path
@@ -203,7 +204,7 @@ if __name__ == '__main__':
     # ── Step 3：3D IDA 分析 ──────────────────────────────────────────────────
     # 回调定义在独立模块 mrf_strain_callbacks.py，可被 multiprocessing 正确
     # pickle → NumPool > 1 的并行执行完全支持。
-    # tmp_dir = TmpDir/opensees_{UniqueRecorderPrefix} 已保证各进程文件不冲突。
+    # 每次分析的 tmp_dir 各不相同（见 ScratchMode），已保证各进程文件不冲突。
     # 3D IDA：对每对记录分别运行 X、Y 方向动力分析，IM 取两分量谱加速度的几何均值。
     print('\n[Step 3] 执行 3D IDA（2 个 IM × 5 对记录 × 2 方向 = 20 次动力分析）...')
     ida = IDAAnalysis(wrapper)
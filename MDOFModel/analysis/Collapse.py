@@ -10,6 +10,8 @@ import pandas as pd
 from scipy.optimize import minimize
 from scipy.stats import norm
 
+from .IDA_2D import read_IDA, read_IDA_matrices
+
 # Hazus Table 5.9 中各设防等级 Complete 损伤状态层间位移角中值所在列索引（0-based）
 _HAZUS_DESIGN_LEVEL_COL = {
     'high-code':     9,
@@ -58,25 +60,14 @@ def get_hazus_collapse_drift(
     return float(match.iloc[0, col_idx])
 
 
-def _parse_ida_array(value):
-    if isinstance(value, str):
-        return np.fromstring(value.strip().strip('[]').replace(',', ' '), sep=' ')
-    return np.asarray(value, dtype=float)
-
-
-def _max_drift_value(val) -> float:
-    arr = _parse_ida_array(val)
-    return float(arr.max()) if arr.size > 0 else 0.0
-
+def _peak_drift(matrices: dict) -> np.ndarray:
+    """由各层 EDP 矩阵（见 ``read_IDA_matrices``）计算每行的最大层间位移角。
 
-def _is_3d_csv(df: pd.DataFrame) -> bool:
-    """判断 DataFrame 是否为 3D IDA 格式（含 MaxDrift_X 和 MaxDrift_Y 列）。"""
-    return 'MaxDrift_X' in df.columns and 'MaxDrift_Y' in df.columns
-
-
-def _max_drift_3d(row) -> float:
-    """取 3D IDA 行中 X 和 Y 两方向最大层间位移角的较大值。"""
-    return max(_max_drift_value(row['MaxDrift_X']), _max_drift_value(row['MaxDrift_Y']))
+    3D 格式（含 MaxDrift_X 和 MaxDrift_Y）取两方向较大值；补齐用的 NaN 及空行按 0 计。
+    """
+    cols = ['MaxDrift_X', 'MaxDrift_Y'] if 'MaxDrift_X' in matrices else ['MaxDrift']
+    peaks = [np.max(np.nan_to_num(matrices[c], nan=0.0), axis=1, initial=0.0) for c in cols]
+    return np.maximum.reduce(peaks)
 
 
 class CollapseAnalysis:
@@ -88,7 +79,7 @@ class CollapseAnalysis:
     Parameters
     ----------
     ida_csv : str or Path
-        IDA 分析结果 CSV 文件路径（完整结果，含倒塌记录）。
+        IDA 分析结果文件路径（完整结果，含倒塌记录），CSV 或 NPZ 格式。
     collapse_drift_limit : float or None, optional
         判定倒塌的最大层间位移角限值（绝对值，非百分比）。
         与 building_type 二选一；若同时提供，以此参数为准。
@@ -98,6 +89,10 @@ class CollapseAnalysis:
     design_level : str, optional
         设防等级，可选 high-code、moderate-code、low-code、pre-code，
         默认 moderate-code。仅当 building_type 不为 None 时生效。
+    nonconvergence_as_collapse : bool, optional
+        是否将未收敛（Iffinish == False 且 Collapsed == False）的分析视为倒塌，
+        默认 True。为 False 时，拟合易损性曲线时剔除这些结果，只统计由
+        ``Collapsed`` 列或位移角阈值判定的倒塌。
 
     Attributes
     ----------
@@ -105,6 +100,8 @@ class CollapseAnalysis:
         IDA 结果 CSV 路径。
     collapse_drift_limit : float or None
         实际使用的倒塌位移角阈值（若通过 building_type 查询则已换算为数值）。
+    nonconvergence_as_collapse : bool
+        未收敛结果是否按倒塌计。
 
     Examples
     --------
@@ -119,8 +116,10 @@ class CollapseAnalysis:
         collapse_drift_limit: Optional[float] = None,
         building_type: Optional[str] = None,
         design_level: str = 'moderate-code',
+        nonconvergence_as_collapse: bool = True,
     ):
         self.ida_csv = Path(ida_csv)
+        self.nonconvergence_as_collapse = nonconvergence_as_collapse
         if collapse_drift_limit is not None:
             self.collapse_drift_limit = collapse_drift_limit
         elif building_type is not None:
@@ -133,7 +132,8 @@ class CollapseAnalysis:
 
         倒塌判定条件（满足其一即剔除）：
 
-        1. Iffinish == False：分析未收敛。
+        1. Iffinish == False：分析未收敛，或因超过模型的 CollapseDriftLimit
+           提前终止（Collapsed == True）。
         2. max(MaxDrift) >= collapse_drift_limit（仅当构造时提供了阈值时生效）。
 
         自动识别 3D IDA CSV 格式（含 MaxDrift_X / MaxDrift_Y 列）：
@@ -142,20 +142,34 @@ class CollapseAnalysis:
         Returns
         -------
         pandas.DataFrame
-            剔除倒塌记录后的 IDA 结果表格。
+            剔除倒塌记录后的 IDA 结果表格，各层 EDP 列已解析为 numpy 数组。
         """
-        df = pd.read_csv(self.ida_csv)
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+        df = read_IDA(self.ida_csv)
 
-        mask = df['Iffinish'].astype(bool)
+        mask = df['Iffinish'].astype(bool).to_numpy()
         if self.collapse_drift_limit is not None:
-            if _is_3d_csv(df):
-                mask = mask & df.apply(_max_drift_3d, axis=1).lt(self.collapse_drift_limit)
-            else:
-                mask = mask & df['MaxDrift'].apply(_max_drift_value).lt(self.collapse_drift_limit)
+            mask = mask & (_peak_drift(read_IDA_matrices(df)[1]) < self.collapse_drift_limit)
 
         return df.loc[mask].reset_index(drop=True)
 
+    @staticmethod
+    def _synthesized_code(df: pd.DataFrame, code: np.ndarray) -> np.ndarray:
+        """合成结果行沿用同一记录中 IM 更低的最后一个实际分析结果（触发跳过的结果）的判定。
+
+        触发结果判为倒塌时合成行计为倒塌；否则（按当前阈值未倒塌，或作为不收敛被剔除）
+        合成行的结果未知，一并剔除。``code`` 为各行判定：1 倒塌，0 未倒塌，-1 剔除。
+        """
+        synth = df['Synthesized'].eq(True).to_numpy()
+        if not synth.any():
+            return code
+        rec_cols = [c for c in ('EQRecord', 'EQRecord_X', 'EQRecord_Y') if c in df.columns]
+        trig = (df[rec_cols + ['IM']]
+                .assign(_code=np.where(synth, np.nan, code))
+                .sort_values(rec_cols + ['IM'], kind='stable')
+                .groupby(rec_cols, sort=False)['_code'].ffill()
+                .reindex(df.index).to_numpy())
+        return np.where(synth, np.where(trig == 1, 1, -1), code)
+
     def fit_collapse_fragility(
         self,
         fig_path: Union[str, Path, None] = None,
@@ -178,23 +192,32 @@ class CollapseAnalysis:
         dict
             'median' (float) — 倒塌易损性中值 Sa（g）；
             'logstd' (float) — 倒塌易损性对数标准差。
+
+        Notes
+        -----
+        若 CSV 含 ``Collapsed`` 列（模型设置了 CollapseDriftLimit），该列为 True 的结果
+        直接判为倒塌；其余未收敛结果按 ``nonconvergence_as_collapse`` 处理。
+        倒塌后跳过生成的结果行（``Synthesized == True``，见 ``IDA_f`` 的 ``CollapseSkip``）
+        未实际分析，沿用同一记录中触发跳过的结果的判定，见 :meth:`_synthesized_code`。
         """
-        df = pd.read_csv(self.ida_csv)
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+        # 只需标量列与位移角矩阵，不构造逐行数组
+        df, matrices = read_IDA_matrices(self.ida_csv)
         df['Iffinish'] = df['Iffinish'].astype(bool)
+        if 'Collapsed' in df.columns:
+            df['Collapsed'] = df['Collapsed'].astype(bool)
+        else:
+            df['Collapsed'] = False
 
-        drift_limit = self.collapse_drift_limit
-        is_3d = _is_3d_csv(df)
-
-        def _is_collapse(row) -> bool:
-            if not row['Iffinish']:
-                return True
-            if drift_limit is not None:
-                max_d = _max_drift_3d(row) if is_3d else _max_drift_value(row['MaxDrift'])
-                return max_d >= drift_limit
-            return False
-
-        df['_collapse'] = df.apply(_is_collapse, axis=1)
+        collapse = df['Collapsed'].to_numpy(copy=True)
+        if self.collapse_drift_limit is not None:
+            collapse |= _peak_drift(matrices) >= self.collapse_drift_limit
+        nonconverged = ~df['Iffinish'].to_numpy() & ~collapse
+        # 每行的判定：1 倒塌，0 未倒塌，-1 剔除（不计入拟合）
+        code = np.where(collapse, 1, np.where(nonconverged, 1 if self.nonconvergence_as_collapse else -1, 0))
+        if 'Synthesized' in df.columns:
+            code = self._synthesized_code(df, code)
+        df['_collapse'] = code == 1
+        df = df.loc[code >= 0]
 
         groups = df.groupby('IM')
         im_levels  = np.array(sorted(groups.groups.keys()), dtype=float)
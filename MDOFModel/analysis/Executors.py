@@ -0,0 +1,326 @@
+########################################################
+# IDA 任务执行器：串行、本机进程池、concurrent.futures 执行器与 MPI（mpi4py）。
+#
+# IDA_f 只通过 initialize / submit / wait 三个操作派发任务：initialize 在每个工作
+# 进程中执行一次初始化函数（常驻模型），submit 提交一个任务并返回编号，wait 阻塞
+# 直到任一已提交的任务完成。任务函数及其参数须可 pickle（模块级函数）。
+########################################################
+
+import abc
+import concurrent.futures
+import multiprocessing as mp
+import queue
+import traceback
+from collections import deque
+from typing import Callable
+
+
+class IDAExecutor(abc.ABC):
+    """IDA 任务执行器的抽象基类。
+
+    子类须实现 :meth:`initialize`、:meth:`submit` 与 :meth:`wait`；可作为上下文管理器使用，
+    退出时调用 :meth:`shutdown`。
+
+    Attributes
+    ----------
+    num_workers : int
+        并行的工作进程数，决定同时在途的任务数。
+    is_root : bool
+        是否为负责调度的进程（仅 :class:`MPIExecutor` 的非根进程为 ``False``）。
+    supports_queue : bool
+        能否向任务传递 ``multiprocessing.Manager().Queue()``（用于子进度条）。
+    """
+
+    num_workers = 1
+    is_root = True
+    supports_queue = False
+
+    def __init__(self):
+        self._next_ticket = 0
+
+    def _ticket(self) -> int:
+        self._next_ticket += 1
+        return self._next_ticket
+
+    @abc.abstractmethod
+    def initialize(self, initializer: Callable, initargs: tuple = ()) -> None:
+        """在每个工作进程中执行一次 ``initializer(*initargs)``，此后提交的任务均在初始化后的进程中执行。"""
+
+    @abc.abstractmethod
+    def submit(self, fn: Callable, args: tuple) -> int:
+        """提交任务 ``fn(*args)``，返回任务编号。"""
+
+    @abc.abstractmethod
+    def wait(self) -> tuple:
+        """阻塞直到任一已提交的任务完成，返回 ``(任务编号, 结果, 异常)``，成功时异常为 ``None``。"""
+
+    def map(self, fn: Callable, args_list: list) -> list:
+        """并行执行 ``[fn(*args) for args in args_list]``，按输入顺序返回结果；任一任务出错时抛出其异常。"""
+        order = {self.submit(fn, args): i for i, args in enumerate(args_list)}
+        results = [None] * len(order)
+        for _ in range(len(order)):
+            ticket, result, err = self.wait()
+            if err is not None:
+                raise err
+            results[order[ticket]] = result
+        return results
+
+    def shutdown(self) -> None:
+        """释放工作进程。"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+
+class SerialExecutor(IDAExecutor):
+    """在当前进程中依次执行任务，便于调试及与并行结果对比。"""
+
+    def __init__(self):
+        super().__init__()
+        self._done = deque()
+
+    def initialize(self, initializer, initargs=()):
+        initializer(*initargs)
+
+    def submit(self, fn, args):
+        ticket = self._ticket()
+        try:
+            self._done.append((ticket, fn(*args), None))
+        except Exception as e:
+            self._done.append((ticket, None, e))
+        return ticket
+
+    def wait(self):
+        return self._done.popleft()
+
+
+class PoolExecutor(IDAExecutor):
+    """本机进程池（``multiprocessing.Pool``），``NumPool > 1`` 时 IDA_f 的默认执行器。
+
+    每次 :meth:`initialize` 重新建立进程池，以便常驻新的模型。
+
+    Parameters
+    ----------
+    num_workers : int
+        进程数。
+    max_tasks_per_child : int or None
+        每个工作进程完成多少个任务后由新进程替换；``None`` 表示不替换。
+    """
+
+    supports_queue = True
+
+    def __init__(self, num_workers: int, max_tasks_per_child: int = None):
+        super().__init__()
+        self.num_workers = int(num_workers)
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool = None
+        self._done = queue.Queue()
+
+    def initialize(self, initializer, initargs=()):
+        self.shutdown()
+        self._pool = mp.Pool(self.num_workers, initializer=initializer, initargs=initargs,
+                             maxtasksperchild=self.max_tasks_per_child)
+
+    def submit(self, fn, args):
+        if self._pool is None:
+            self._pool = mp.Pool(self.num_workers, maxtasksperchild=self.max_tasks_per_child)
+        ticket = self._ticket()
+        self._pool.apply_async(fn, args,
+                               callback=lambda r, t=ticket: self._done.put((t, r, None)),
+                               error_callback=lambda e, t=ticket: self._done.put((t, None, e)))
+        return ticket
+
+    def wait(self):
+        return self._done.get()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+# 工作进程中最近一次执行的初始化编号（FuturesExecutor 用），同一编号只初始化一次
+_FUTURES_INIT_TOKEN = None
+
+
+def _call_initialized(token, initializer, initargs, fn, args):
+    """在工作进程中执行 ``fn(*args)``；该进程尚未以编号 ``token`` 初始化时先执行 ``initializer``。"""
+    global _FUTURES_INIT_TOKEN
+    if _FUTURES_INIT_TOKEN != token:
+        initializer(*initargs)
+        _FUTURES_INIT_TOKEN = token
+    return fn(*args)
+
+
+class FuturesExecutor(IDAExecutor):
+    """使用已有的 ``concurrent.futures.Executor``（如 ``ProcessPoolExecutor``）执行任务。
+
+    外部执行器无法在创建后设置初始化函数，初始化参数随每个任务一起传递，
+    每个工作进程只在第一次收到新的初始化编号时执行初始化。OpenSees 的模型是进程内
+    全局状态，不能使用 ``ThreadPoolExecutor``。执行器由调用方负责关闭。
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        进程型执行器。
+    num_workers : int, optional
+        同时在途的任务数，默认取 ``executor._max_workers``（不存在时为 1）。
+    """
+
+    def __init__(self, executor: concurrent.futures.Executor, num_workers: int = None):
+        super().__init__()
+        self.executor = executor
+        self.num_workers = int(num_workers or getattr(executor, '_max_workers', 1) or 1)
+        self._init = None
+        self._init_count = 0
+        self._futures = {}
+
+    def initialize(self, initializer, initargs=()):
+        self._init_count += 1
+        self._init = (f'{id(self)}:{self._init_count}', initializer, initargs)
+
+    def submit(self, fn, args):
+        ticket = self._ticket()
+        if self._init is None:
+            future = self.executor.submit(fn, *args)
+        else:
+            future = self.executor.submit(_call_initialized, *self._init, fn, args)
+        self._futures[future] = ticket
+        return ticket
+
+    def wait(self):
+        done, _ = concurrent.futures.wait(self._futures, return_when=concurrent.futures.FIRST_COMPLETED)
+        future = next(iter(done))
+        ticket = self._futures.pop(future)
+        err = future.exception()
+        return ticket, (future.result() if err is None else None), err
+
+
+class MPIExecutor(IDAExecutor):
+    """基于 mpi4py 的多节点执行器：根进程调度 (记录, IM) 任务并汇总结果，其余进程执行任务。
+
+    所有进程运行同一脚本。非根进程在进入 ``with`` 块时即开始等待任务，直到根进程退出
+    ``with`` 块才返回，因此分析代码只在 ``is_root`` 为 ``True`` 时执行。只有一个进程时
+    根进程自己依次执行任务。各进程须能以相同路径访问记录文件；结果与断点只由根进程写出。
+
+    Parameters
+    ----------
+    comm : mpi4py.MPI.Comm, optional
+        通信子，默认 ``MPI.COMM_WORLD``。
+    root : int
+        调度进程的编号，默认 0。
+
+    Examples
+    --------
+    ``mpirun -n 4 python run_ida.py``，其中 ``run_ida.py``::
+
+        with MPIExecutor() as ex:
+            if ex.is_root:
+                IDAAnalysis(model).Analyze(IM_list, records=records, Executor=ex,
+                                           output_csv='IDA_results.npz')
+    """
+
+    _TAG_CMD = 11
+    _TAG_RESULT = 12
+    _TAG_INIT = 13
+
+    def __init__(self, comm=None, root: int = 0):
+        super().__init__()
+        from mpi4py import MPI  # 可选依赖，仅在使用 MPI 时导入
+        self._MPI = MPI
+        self.comm = comm if comm is not None else MPI.COMM_WORLD
+        self.root = root
+        self.rank = self.comm.Get_rank()
+        self.is_root = self.rank == root
+        self._workers = [r for r in range(self.comm.Get_size()) if r != root]
+        self.num_workers = max(1, len(self._workers))
+        self._idle = deque(self._workers)
+        self._backlog = deque()
+        self._outstanding = 0
+        self._local = SerialExecutor() if not self._workers else None
+        self._closed = False
+
+    def __enter__(self):
+        if not self.is_root:
+            self.serve()
+        return self
+
+    def serve(self) -> None:
+        """非根进程：循环接收并执行根进程的命令，直到收到停止命令。"""
+        while True:
+            msg = self.comm.recv(source=self.root, tag=self._TAG_CMD)
+            kind = msg[0]
+            if kind == 'stop':
+                return
+            if kind == 'init':
+                # 初始化结果（出错时为异常信息）回报根进程，出错后本进程仍继续等待命令
+                _, initializer, initargs = msg
+                try:
+                    initializer(*initargs)
+                    err = None
+                except Exception:
+                    err = traceback.format_exc()
+                self.comm.send(err, dest=self.root, tag=self._TAG_INIT)
+                continue
+            _, ticket, fn, args = msg
+            try:
+                reply = (ticket, fn(*args), None)
+            except Exception:
+                reply = (ticket, None, traceback.format_exc())
+            self.comm.send(reply, dest=self.root, tag=self._TAG_RESULT)
+
+    def initialize(self, initializer, initargs=()):
+        if self._local is not None:
+            return self._local.initialize(initializer, initargs)
+        if self._outstanding or self._backlog:
+            raise RuntimeError("MPIExecutor.initialize：仍有未完成的任务。")
+        for r in self._workers:
+            self.comm.send(('init', initializer, initargs), dest=r, tag=self._TAG_CMD)
+        errors = {r: self.comm.recv(source=r, tag=self._TAG_INIT) for r in self._workers}
+        errors = {r: e for r, e in errors.items() if e is not None}
+        if errors:
+            r = min(errors)
+            raise RuntimeError(f"MPI 进程 {sorted(errors)} 初始化出错，进程 {r}：\n{errors[r]}")
+
+    def submit(self, fn, args):
+        if self._local is not None:
+            return self._local.submit(fn, args)
+        ticket = self._ticket()
+        if self._idle:
+            self.comm.send(('task', ticket, fn, args), dest=self._idle.popleft(), tag=self._TAG_CMD)
+            self._outstanding += 1
+        else:
+            self._backlog.append((ticket, fn, args))
+        return ticket
+
+    def wait(self):
+        if self._local is not None:
+            return self._local.wait()
+        status = self._MPI.Status()
+        ticket, result, err = self.comm.recv(source=self._MPI.ANY_SOURCE, tag=self._TAG_RESULT, status=status)
+        self._outstanding -= 1
+        worker = status.Get_source()
+        if self._backlog:
+            t, fn, args = self._backlog.popleft()
+            self.comm.send(('task', t, fn, args), dest=worker, tag=self._TAG_CMD)
+            self._outstanding += 1
+        else:
+            self._idle.append(worker)
+        if err is not None:
+            err = RuntimeError(f"MPI 进程 {worker} 执行任务出错：\n{err}")
+        return ticket, result, err
+
+    def shutdown(self):
+        if not self.is_root or self._closed:
+            return
+        self._closed = True
+        # 丢弃未派发的任务并收回在途任务的结果，再通知各进程退出
+        self._backlog.clear()
+        while self._outstanding:
+            self.wait()
+        for r in self._workers:
+            self.comm.send(('stop',), dest=r, tag=self._TAG_CMD)
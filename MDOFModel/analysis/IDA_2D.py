@@ -6,15 +6,18 @@
 #   - 双向分析：records = [('file_x.AT2', 'file_y.AT2'), ...]
 #   两种模式均通过 IDA_1record / IDA_f / IDAAnalysis 统一接受，
 #   区别仅在于 record_y 参数（None 表示单向，非 None 表示双向）。
+#   - IM 序列：固定 IM_list，或 HuntFill 自适应追踪（IDA_1record_hunt_fill）
 #
 # 双向 IM 定义：Sa_gm = sqrt(Sa_X × Sa_Y)（两分量几何均值）
 #
-# 依赖：openseespy, pandas, numpy, eqsig, tqdm
+# 依赖：openseespy, pandas, numpy, scipy, tqdm
 ########################################################
 
+import contextlib
 import copy
 import math
 import multiprocessing as mp
+import os
 import threading
 from collections import Counter
 from pathlib import Path
@@ -26,7 +29,10 @@ import pandas as pd
 from tqdm import tqdm
 
 from . import ReadRecord
+from .Checkpoint import IDACheckpoint
+from .Executors import IDAExecutor, PoolExecutor
 from ..utils.record_utils import compute_sa as _compute_sa
+from ..utils.sampling import normal_samples
 
 # ── 模型协议 & 标准列集合 ─────────────────────────────────────────────────────
 
@@ -43,19 +49,46 @@ class IDAModelProtocol(Protocol):
 
 # 用于识别自定义 EDP 列（排除这些标准列后即为自定义列）
 _STANDARD_COLS_1D = frozenset({
-    'IM', 'EQRecord', 'MaxDrift', 'MaxAbsAccel', 'MaxRelativeAccel', 'MaxAbsVel', 'ResDrift', 'Iffinish', 'tCurrent', 'TotalTime',
+    'IM', 'EQRecord', 'MaxDrift', 'MaxAbsAccel', 'MaxRelativeAccel', 'MaxAbsVel', 'ResDrift', 'Iffinish', 'Collapsed', 'tCurrent', 'TotalTime',
+    'TrimStart', 'TrimEnd', 'TrimTail', 'OriginalDuration', 'Settled', 'Synthesized',
 })
 _STANDARD_COLS_2D = frozenset({
     'IM', 'EQRecord_X', 'EQRecord_Y',
-    'MaxDrift_X', 'MaxDrift_Y', 'MaxAbsAccel_X', 'MaxAbsAccel_Y', 'MaxAbsVel_X', 'MaxAbsVel_Y', 'ResDrift_X', 'ResDrift_Y', 'Iffinish', 'Iffinish_X', 'Iffinish_Y', 'tCurrent_X', 'tCurrent_Y', 'TotalTime', '_pair',
+    'MaxDrift_X', 'MaxDrift_Y', 'MaxAbsAccel_X', 'MaxAbsAccel_Y', 'MaxAbsVel_X', 'MaxAbsVel_Y', 'ResDrift_X', 'ResDrift_Y', 'Iffinish', 'Iffinish_X', 'Iffinish_Y',
+    'Collapsed', 'Collapsed_X', 'Collapsed_Y', 'tCurrent_X', 'tCurrent_Y', 'TotalTime', '_pair',
+    'TrimStart_X', 'TrimStart_Y', 'TrimEnd_X', 'TrimEnd_Y', 'TrimTail_X', 'TrimTail_Y',
+    'OriginalDuration_X', 'OriginalDuration_Y', 'Settled_X', 'Settled_Y', 'Synthesized',
 })
 
+# 模型设置 RecordTrim 时记录截取信息的列（见 record_utils.trim_record），双向分析时加 _X / _Y 后缀
+_TRIM_COLS = ('TrimStart', 'TrimEnd', 'TrimTail', 'OriginalDuration')
+
 
 # ── 地震动文件工具 ─────────────────────────────────────────────────────────────
 
+_FEMA_METADATA_CACHE = {}   # MetaData.txt 路径 -> ((大小, 修改时间), [(X 文件名, Y 文件名), ...])
+
+
+def _read_fema_pairs(meta: Path) -> list:
+    """读取 MetaData.txt 中的 (X, Y) 分量文件名；文件未变化时复用上次的结果。"""
+    st = meta.stat()
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _FEMA_METADATA_CACHE.get(meta)
+    if cached is None or cached[0] != stamp:
+        T = pd.read_table(str(meta), sep=',')
+        pairs = [(x.replace('.txt', ''), y.replace('.txt', ''))
+                 for x, y in zip(T['AccelXfile'], T['AccelYfile'])]
+        cached = _FEMA_METADATA_CACHE[meta] = (stamp, pairs)
+    return cached[1]
+
+
 def load_fema_records(bidir: bool = False) -> list:
     """返回 FEMA P-695 远场地震动记录列表。
 
+    元数据只在首次调用（或 MetaData.txt 变化）时读取。记录目录打包为记录库
+    （见 :class:`~MDOFModel.utils.record_library.RecordLibrary`）后，读取记录时直接
+    从内存映射的数组切片，路径列表本身不变。
+
     Parameters
     ----------
     bidir : bool
@@ -67,14 +100,10 @@ def load_fema_records(bidir: bool = False) -> list:
     meta = fema_dir / 'MetaData.txt'
     if not meta.exists():
         raise FileNotFoundError(f"FEMA P-695 元数据文件未找到：{meta}")
-    T = pd.read_table(str(meta), sep=',')
+    pairs = _read_fema_pairs(meta)
     if bidir:
-        return [
-            (str(fema_dir / row['AccelXfile'].replace('.txt', '')),
-             str(fema_dir / row['AccelYfile'].replace('.txt', '')))
-            for _, row in T.iterrows()
-        ]
-    return [str(fema_dir / x.replace('.txt', '')) for x in T['AccelXfile']]
+        return [(str(fema_dir / x), str(fema_dir / y)) for x, y in pairs]
+    return [str(fema_dir / x) for x, _ in pairs]
 
 
 # ── 数值插值工具 ───────────────────────────────────────────────────────────────
@@ -103,47 +132,6 @@ def _parse_ida_array(value) -> np.ndarray:
     return np.asarray(value, dtype=float)
 
 
-def _interp_ida_value(rows: pd.DataFrame, im_target: float, column: str):
-    """在目标 IM 处对单条记录的 IDA 结果进行分段线性插值。
-
-    对同一地震动记录在各 IM 级别下的分析结果，在目标 IM 处插值
-    指定 EDP 列。超出 IM 范围时返回边界值（不外推）。
-    目标列可为标量列（如 ``ResDrift``）或数组列（如 ``MaxDrift``）。
-
-    Parameters
-    ----------
-    rows : pandas.DataFrame
-        同一地震动记录的 IDA 结果子集，须包含 ``'IM'`` 列及 ``column`` 列。
-    im_target : float
-        目标强度指标值（单位：g）。
-    column : str
-        待插值的列名。
-
-    Returns
-    -------
-    float or numpy.ndarray
-        插值结果。标量列返回 float；数组列（各层 EDP）返回
-        插值后的 numpy 数组，长度与原数组相同。
-    """
-    im_vals = rows['IM'].astype(float).to_numpy()
-    order = np.argsort(im_vals)
-    rows, im_vals = rows.iloc[order].reset_index(drop=True), im_vals[order]
-
-    exact = np.where(np.isclose(im_vals, im_target))[0]
-    if len(exact):
-        return rows.iloc[exact[0]][column]
-    if im_target <= im_vals[0]:
-        return rows.iloc[0][column]
-    if im_target >= im_vals[-1]:
-        return rows.iloc[-1][column]
-
-    up = int(np.searchsorted(im_vals, im_target, side='right'))
-    w = (im_target - im_vals[up - 1]) / (im_vals[up] - im_vals[up - 1])
-    lo_arr  = _parse_ida_array(rows.iloc[up - 1][column])
-    hi_arr  = _parse_ida_array(rows.iloc[up][column])
-    return lo_arr + w * (hi_arr - lo_arr)
-
-
 def _to_scalar(val) -> float:
     """将标量或数组形式的 EDP 转换为单个浮点数（取各层最大值）。
 
@@ -166,6 +154,28 @@ def _to_scalar(val) -> float:
     return float(val)
 
 
+# DynamicAnalysisBatch 结果行中与 DynamicAnalysis 后模型属性同名的列；
+# ExtraEDP 只引用这些属性时才能由结果行取值
+_BATCH_EDP_ATTRS = ('MaxDrift', 'MaxAbsAccel', 'MaxRelativeAccel', 'MaxAbsVel',
+                    'ResDrift', 'Collapsed', 'Settled')
+
+
+def _supports_batch(FEModel, ExtraEDP: dict = None) -> bool:
+    """模型能否用 ``DynamicAnalysisBatch`` 一次完成同一记录的所有 IM。
+
+    目前为 ``MDOFOpenSees``：Elastic 模型（振型叠加，每条记录只积分一次）
+    或 ``Backend == 'Native'`` 的非线性模型（向量化积分）。
+    ``ExtraEDP`` 引用批量结果行之外的属性（如 ``DriftHistory``、``AnalysisStats``）时，
+    这些属性只有逐个 IM 调用 ``DynamicAnalysis`` 才会更新，此时退回逐个 IM 分析。
+    """
+    if not hasattr(FEModel, 'DynamicAnalysisBatch'):
+        return False
+    if ExtraEDP and any(attr not in _BATCH_EDP_ATTRS for attr in ExtraEDP.values()):
+        return False
+    return (getattr(FEModel, 'HystereticCurveType', None) == 'Elastic'
+            or getattr(FEModel, 'Backend', 'OpenSees') == 'Native')
+
+
 # ── 多进程进度显示线程 ─────────────────────────────────────────────────────────
 
 def _progress_thread(queue, stop_event, pbar, num_workers: int):
@@ -184,7 +194,7 @@ def _progress_thread(queue, stop_event, pbar, num_workers: int):
         - ``record`` (str)：记录名（用于标识子进度条）
         - ``im_idx`` (int)：当前已完成的 IM 序号（0 表示初始化）
         - ``im_total`` (int)：该记录的 IM 总数
-        - ``IM``, ``finished``, ``tCurrent``, ``TotalTime``：分析状态信息
+        - ``IM``, ``finished``, ``collapsed``, ``tCurrent``, ``TotalTime``：分析状态信息
 
     stop_event : threading.Event
         停止信号；主进程在所有子进程完成后调用 ``set()``，
@@ -225,6 +235,166 @@ def _progress_thread(queue, stop_event, pbar, num_workers: int):
 
 # ── 核心分析：单条（或一对）记录 ──────────────────────────────────────────────
 
+def _trim_info(source, suffix: str = '') -> dict:
+    """模型的 ``RecordTrimInfo``（或批量分析结果行中的截取列），列名加 ``suffix``；未截取时为空字典。"""
+    if isinstance(source, pd.Series):
+        info = {c: source[c] for c in _TRIM_COLS if c in source.index and pd.notna(source[c])}
+    else:
+        info = getattr(source, 'RecordTrimInfo', None) or {}
+    return {c + suffix: float(info[c]) for c in _TRIM_COLS if c in info}
+
+
+def _extra_edp_value(model, attr: str, batch_row: pd.Series = None):
+    """读取 ExtraEDP 属性：批量分析时取结果行中的列，否则读模型属性（缺失为 None）。
+
+    批量分析只在 ExtraEDP 均为 ``_BATCH_EDP_ATTRS`` 时使用（见 :func:`_supports_batch`），
+    否则模型上的属性并非该 IM 的结果。
+    """
+    if batch_row is not None:
+        return batch_row[attr] if attr in batch_row.index else None
+    return getattr(model, attr, None)
+
+
+def _extra_edp_cell(v):
+    """ExtraEDP 值转为结果单元格：None → NaN，数组 → 单元素列表包装，标量 → float。"""
+    return (
+        float('nan') if v is None
+        else [list(v)] if hasattr(v, '__len__') and not isinstance(v, str)
+        else float(v)
+    )
+
+
+def _settle_info(source, suffix: str = '') -> dict:
+    """模型设置 ``SettleTolerance`` 时返回 ``{'Settled' + suffix: 是否因振动衰减提前结束}``，否则为空字典。"""
+    if isinstance(source, pd.Series):
+        return {'Settled' + suffix: bool(source['Settled'])} if 'Settled' in source.index else {}
+    if getattr(source, 'SettleTolerance', None) is None:
+        return {}
+    return {'Settled' + suffix: bool(getattr(source, 'Settled', False))}
+
+
+def _run_one_im(
+    FEModel: IDAModelProtocol,
+    IM: float,
+    SF: float,
+    record_x: str,
+    record_y: str = None,
+    DeltaT='AsInRecord',
+    ExtraEDP: dict = None,
+    batch_row=None,
+) -> tuple:
+    """在单个 IM 下运行一次分析（单向或双向）并组装标准结果行。
+
+    Parameters
+    ----------
+    SF : float
+        地震动缩放系数（``IM / Sa_ref``）。
+    batch_row : pandas.Series, optional
+        ``DynamicAnalysisBatch`` 已算好的对应行；提供时不再重复分析。
+
+    Returns
+    -------
+    tuple
+        ``(data, finished, collapsed, t_cur, TotalTime)``，``data`` 为可直接构造
+        ``pd.DataFrame`` 的结果行字典。
+    """
+    bidir = record_y is not None
+    if bidir:
+        # 两方向副本在调用方设置的前缀后加 X_/Y_，保证同一 (记录, IM) 的文件互不覆盖
+        FEM_X = copy.deepcopy(FEModel)
+        FEM_X.UniqueRecorderPrefix = FEModel.UniqueRecorderPrefix + 'X_'
+        ok_x, t_x, TotalTime = FEM_X.DynamicAnalysis(record_x, SF, False, DeltaT)
+
+        FEM_Y = copy.deepcopy(FEModel)
+        FEM_Y.UniqueRecorderPrefix = FEModel.UniqueRecorderPrefix + 'Y_'
+        ok_y, t_y, _           = FEM_Y.DynamicAnalysis(record_y, SF, False, DeltaT)
+
+        finished = bool(ok_x) and bool(ok_y)
+        t_cur    = max(t_x, t_y)
+        # 模型设置了 CollapseDriftLimit 时，超限提前终止记为倒塌，与不收敛区分
+        collapsed_x = bool(getattr(FEM_X, 'Collapsed', False))
+        collapsed_y = bool(getattr(FEM_Y, 'Collapsed', False))
+        collapsed   = collapsed_x or collapsed_y
+    elif batch_row is not None:
+        res = batch_row
+        ok, t_cur, TotalTime = res['Iffinish'], res['tCurrent'], res['TotalTime']
+        finished = bool(ok)
+        collapsed = bool(res.get('Collapsed', False))
+    else:
+        ok, t_cur, TotalTime = FEModel.DynamicAnalysis(record_x, SF, False, DeltaT)
+        finished = bool(ok)
+        collapsed = bool(getattr(FEModel, 'Collapsed', False))
+        res = FEModel
+
+    # 组装结果行
+    if bidir:
+        data = {
+            'IM': IM, 'EQRecord_X': record_x, 'EQRecord_Y': record_y,
+            'MaxDrift_X':    [list(FEM_X.MaxDrift)],
+            'MaxDrift_Y':    [list(FEM_Y.MaxDrift)],
+            'MaxAbsAccel_X': [list(FEM_X.MaxAbsAccel)],
+            'MaxAbsAccel_Y': [list(FEM_Y.MaxAbsAccel)],
+            'MaxAbsVel_X':   [list(getattr(FEM_X, 'MaxAbsVel', []))],
+            'MaxAbsVel_Y':   [list(getattr(FEM_Y, 'MaxAbsVel', []))],
+            'ResDrift_X': _to_scalar(FEM_X.ResDrift),
+            'ResDrift_Y': _to_scalar(FEM_Y.ResDrift),
+            'Iffinish': finished, 'Iffinish_X': bool(ok_x), 'Iffinish_Y': bool(ok_y),
+            'Collapsed': collapsed, 'Collapsed_X': collapsed_x, 'Collapsed_Y': collapsed_y,
+            'tCurrent_X': t_x, 'tCurrent_Y': t_y, 'TotalTime': TotalTime,
+            **_trim_info(FEM_X, '_X'), **_trim_info(FEM_Y, '_Y'),
+            **_settle_info(FEM_X, '_X'), **_settle_info(FEM_Y, '_Y'),
+        }
+        if ExtraEDP:
+            for col, attr in ExtraEDP.items():
+                for suf, m in (('_X', FEM_X), ('_Y', FEM_Y)):
+                    data[col + suf] = _extra_edp_cell(getattr(m, attr, None))
+    else:
+        data = {
+            'IM': IM, 'EQRecord': record_x,
+            'MaxDrift':         [res.MaxDrift],
+            'MaxAbsAccel':      [res.MaxAbsAccel],
+            'MaxRelativeAccel': [res.MaxRelativeAccel],
+            'MaxAbsVel':        [getattr(res, 'MaxAbsVel', [])],
+            'ResDrift': res.ResDrift, 'Iffinish': finished, 'Collapsed': collapsed,
+            'tCurrent': t_cur, 'TotalTime': TotalTime,
+            **_trim_info(res), **_settle_info(res),
+        }
+        if ExtraEDP:
+            for col, attr in ExtraEDP.items():
+                data[col] = _extra_edp_cell(_extra_edp_value(FEModel, attr, batch_row))
+
+    return data, finished, collapsed, t_cur, TotalTime
+
+
+def _record_sa_ref(record_x: str, period: float, record_y: str = None) -> float:
+    """计算记录的参考 Sa（双向取两分量几何均值），按周期精确积分，不用反应谱索引的插值。"""
+    sa_x   = _compute_sa(record_x, period, use_index=False)
+    Sa_ref = (math.sqrt(sa_x * _compute_sa(record_y, period, use_index=False))
+              if record_y is not None else sa_x)
+    if Sa_ref <= 0:
+        Sa_ref = 1e-9
+    return Sa_ref
+
+
+def _recorder_prefix(record_x: str, tag: str = '') -> str:
+    """单次分析的 recorder 文件前缀；``tag`` 用于区分同一记录并行分析的不同 IM。"""
+    return 'URP' + Path(record_x).name + '_' + (f'{tag}_' if tag else '')
+
+
+def _report_im(rec_name, im_idx, n_im, IM, finished, collapsed, t_cur, TotalTime,
+               _status_queue=None, rec_pbar=None):
+    """上报单个 IM 的分析状态：多进程模式写入状态队列，否则更新记录子进度条。"""
+    if _status_queue is not None:
+        _status_queue.put({'record': rec_name, 'im_idx': im_idx + 1, 'im_total': n_im,
+                           'IM': IM, 'finished': finished, 'collapsed': collapsed,
+                           'tCurrent': t_cur, 'TotalTime': TotalTime})
+    else:
+        status = 'OK' if finished else 'COLLAPSE' if collapsed else 'FAIL'
+        rec_pbar.set_postfix_str(f"{status} t={t_cur:.1f}/{TotalTime:.1f}s")
+        if not finished:
+            tqdm.write(f"  [{rec_name}] IM={IM:.3f}g: {status} t={t_cur:.2f}/{TotalTime:.2f}s")
+
+
 def IDA_1record(
     FEModel: IDAModelProtocol,
     IM_list: list,
@@ -235,6 +405,9 @@ def IDA_1record(
     _status_queue=None,
     ExtraEDP: dict = None,
     _main_pbar=None,
+    _on_row=None,
+    CollapseSkip: dict = None,
+    _skip=None,
 ) -> pd.DataFrame:
     """对单条（或一对）地震动记录运行 IDA 分析。
 
@@ -246,19 +419,21 @@ def IDA_1record(
         None → 单向分析；提供路径 → 双向分析（IM 取几何均值 Sa）。
     ExtraEDP : dict, optional
         ``{'列名': '模型属性名'}``；双向时自动附加 ``_X`` / ``_Y`` 后缀。
+        引用批量分析结果之外的属性时，支持批量分析的模型也逐个 IM 分析。
+    _on_row : Callable, optional
+        每完成一个 IM 后以 ``_on_row(IM, rows)`` 回调（``rows`` 为单行 DataFrame），
+        供 :func:`IDA_f` 按 IM 写入断点分片。
+    CollapseSkip : dict, optional
+        提供时（可为空字典）启用倒塌后跳过（见 :class:`_CollapseSkip`）：``IM_list`` 按升序
+        分析，第一次倒塌（或不收敛）后更高的 IM 不再分析，改为生成 ``Synthesized = True``
+        的倒塌结果行；参数见 ``_COLLAPSE_SKIP_DEFAULTS``。结果增加 ``Synthesized`` 列。
     """
     bidir  = record_y is not None
     name_x = Path(record_x).stem
     rec_name = f"{name_x}+{Path(record_y).stem}" if bidir else name_x
 
-    # 计算参考 Sa（双向取两分量几何均值）
-    sa_x   = _compute_sa(record_x, period)
-    Sa_ref = (math.sqrt(sa_x * _compute_sa(record_y, period))
-              if bidir else sa_x)
-    if Sa_ref <= 0:
-        Sa_ref = 1e-9
-    if not bidir:
-        FEModel.UniqueRecorderPrefix = 'URP' + Path(record_x).name + '_'
+    Sa_ref = _record_sa_ref(record_x, period, record_y)
+    FEModel.UniqueRecorderPrefix = _recorder_prefix(record_x)
 
     n_im = len(IM_list)
     im_iter = (
@@ -267,88 +442,426 @@ def IDA_1record(
         if _status_queue is None else enumerate(IM_list)
     )
 
-    IDA_result = pd.DataFrame()
+    # 支持批量分析的模型（Elastic 或 Native 后端的 MDOFOpenSees）：所有 IM 一次算完
+    batch = None
+    if not bidir and _supports_batch(FEModel, ExtraEDP):
+        batch = FEModel.DynamicAnalysisBatch(
+            record_x, [IM / Sa_ref for IM in IM_list], DeltaT)
+
+    # 倒塌后跳过：IDA_f 传入已由断点结果恢复状态的 _skip，其 IM 序列可多于本次的 IM_list
+    skip = _skip if _skip is not None else (
+        _CollapseSkip(IM_list, CollapseSkip) if CollapseSkip is not None else None)
+    own_ims = {round(float(IM), 10) for IM in IM_list}
+
+    rows = []
+
+    def _emit(IM, data):
+        rows.append(pd.DataFrame(data))
+        if _main_pbar is not None:
+            _main_pbar.update(1)
+        if _on_row is not None:
+            _on_row(IM, rows[-1])
 
     for im_idx, IM in im_iter:
         # 多进程模式：第一条 IM 前先上报，供主进程创建子进度条
         if _status_queue is not None and im_idx == 0:
             _status_queue.put({'record': rec_name, 'im_idx': 0, 'im_total': n_im, 'IM': IM, 'finished': True, 'tCurrent': 0.0, 'TotalTime': 0.0})
 
-        SF = IM / Sa_ref
+        # 已判定倒塌：合成的结果行在判定时已输出，只上报进度
+        if skip is not None and skip.skipped(IM):
+            if _status_queue is not None:
+                _status_queue.put({'record': rec_name, 'im_idx': im_idx + 1, 'im_total': n_im, 'IM': IM,
+                                   'finished': False, 'collapsed': True, 'tCurrent': 0.0, 'TotalTime': 0.0})
+            continue
+
+        data, finished, collapsed, t_cur, TotalTime = _run_one_im(
+            FEModel, IM, IM / Sa_ref, record_x, record_y, DeltaT, ExtraEDP,
+            batch.iloc[im_idx] if batch is not None else None)
+
+        _report_im(rec_name, im_idx, n_im, IM, finished, collapsed, t_cur, TotalTime,
+                   _status_queue, im_iter if _status_queue is None else None)
+
+        if skip is None:
+            _emit(IM, data)
+            continue
+        ready = skip.add(IM, data)
+        for IM_k, data_k in ready:
+            if round(float(IM_k), 10) in own_ims:
+                _emit(IM_k, data_k)
+        n_synth = sum(bool(d['Synthesized']) for _, d in ready)
+        if n_synth and _status_queue is None:
+            tqdm.write(f"  [{rec_name}] IM={IM:.3f}g 判定倒塌，跳过 {n_synth} 个更高的 IM")
+
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+# 自适应 IM 追踪（hunt & fill）默认参数，见 IDA_1record_hunt_fill
+_HUNT_FILL_DEFAULTS = {
+    'IM_start':      0.1,   # 第一次分析的 IM（g）
+    'IM_step':       0.1,   # 搜索阶段的初始步长（g）
+    'step_growth':   0.5,   # 搜索阶段步长的增长率：每步步长乘以 (1 + step_growth)
+    'max_runs':      12,    # 每条记录的分析次数上限
+    'tol':           0.05,  # 倒塌 IM 区间的相对宽度容差 (IM_hi - IM_lo) / IM_hi
+    'IM_max':        None,  # 搜索阶段 IM 上限（g），None 表示不限
+    'collapse_drift': None, # 额外的倒塌层间位移角限值；None 时仅按 Iffinish 判别
+}
+
+
+def _is_collapse_run(data: dict, collapse_drift=None) -> bool:
+    """判断一次分析是否进入倒塌平台段：未完成（倒塌或不收敛），或最大层间位移角超过限值。"""
+    if not data['Iffinish']:
+        return True
+    return _exceeds_drift(data, collapse_drift)
+
+
+def _exceeds_drift(data: dict, collapse_drift=None) -> bool:
+    """结果行的最大层间位移角（双向取两方向较大值）是否达到 ``collapse_drift``；限值为 None 时返回 False。"""
+    if collapse_drift is None:
+        return False
+    drifts = ([data['MaxDrift_X'][0], data['MaxDrift_Y'][0]] if 'MaxDrift_X' in data
+              else [data['MaxDrift'][0]])
+    return any(_to_scalar(list(d)) >= collapse_drift for d in drifts)
+
+
+def IDA_1record_hunt_fill(
+    FEModel: IDAModelProtocol,
+    record_x: str,
+    period: float,
+    record_y: str = None,
+    DeltaT='AsInRecord',
+    _status_queue=None,
+    ExtraEDP: dict = None,
+    _main_pbar=None,
+    HuntFill: dict = None,
+) -> pd.DataFrame:
+    """对单条（或一对）地震动记录进行自适应 IM 追踪的 IDA（Vamvatsikos & Cornell 的 hunt & fill 算法）。
 
-        if bidir:
-            FEM_X = copy.deepcopy(FEModel)
-            FEM_X.UniqueRecorderPrefix = f'URP_X_{name_x}_'
-            ok_x, t_x, TotalTime = FEM_X.DynamicAnalysis(record_x, SF, False, DeltaT)
+    在 ``max_runs`` 次分析的预算内依次进行：
 
-            FEM_Y = copy.deepcopy(FEModel)
-            FEM_Y.UniqueRecorderPrefix = f'URP_Y_{Path(record_y).stem}_'
-            ok_y, t_y, _           = FEM_Y.DynamicAnalysis(record_y, SF, False, DeltaT)
+    1. **搜索（hunt）**：从 ``IM_start`` 开始，步长按 ``IM_step * (1 + step_growth)^k`` 几何递增，
+       直到首次出现倒塌（进入 IDA 曲线的平台段）；
+    2. **夹逼（bracket）**：在最后一个未倒塌 IM 与第一个倒塌 IM 之间二分，
+       直到区间相对宽度不超过 ``tol``；
+    3. **填充（fill）**：剩余次数用于在已分析的 IM（含 0）之间、最大未倒塌 IM 以下最大的间隙
+       中点补充分析。中点倒塌（IDA 曲线非单调，“复活”）时同样作为已分析的点，把间隙一分为二，
+       不会重复分析同一 IM。
 
-            finished = bool(ok_x) and bool(ok_y)
-            t_cur    = max(t_x, t_y)
-        else:
-            ok, t_cur, TotalTime = FEModel.DynamicAnalysis(record_x, SF, False, DeltaT)
-            finished = bool(ok)
+    分析总次数由计数器限制，不超过 ``max_runs``。
 
-        if _status_queue is not None:
-            _status_queue.put({'record': rec_name, 'im_idx': im_idx + 1, 'im_total': n_im,
-                               'IM': IM, 'finished': finished,
-                               'tCurrent': t_cur, 'TotalTime': TotalTime})
-        else:
-            im_iter.set_postfix_str(f"{'OK' if finished else 'FAIL'} t={t_cur:.1f}/{TotalTime:.1f}s")
-            if not finished:
-                tqdm.write(f"  [{rec_name}] IM={IM:.3f}g: FAIL t={t_cur:.2f}/{TotalTime:.2f}s")
+    Parameters
+    ----------
+    HuntFill : dict, optional
+        覆盖 ``_HUNT_FILL_DEFAULTS`` 中的参数：``IM_start``、``IM_step``、
+        ``step_growth``、``max_runs``、``tol``、``IM_max``、``collapse_drift``。
+    其余参数同 :func:`IDA_1record`。
+
+    Returns
+    -------
+    pandas.DataFrame
+        与 :func:`IDA_1record` 相同格式的结果，按 IM 升序排列。
+    """
+    opts = {**_HUNT_FILL_DEFAULTS, **(HuntFill or {})}
+    max_runs = int(opts['max_runs'])
+    tol = float(opts['tol'])
+
+    bidir  = record_y is not None
+    name_x = Path(record_x).stem
+    rec_name = f"{name_x}+{Path(record_y).stem}" if bidir else name_x
 
+    Sa_ref = _record_sa_ref(record_x, period, record_y)
+    FEModel.UniqueRecorderPrefix = _recorder_prefix(record_x)
+
+    rec_pbar = (tqdm(total=max_runs, desc=f"  {rec_name[:28]}", leave=False, unit='IM')
+                if _status_queue is None else None)
+    if _status_queue is not None:
+        _status_queue.put({'record': rec_name, 'im_idx': 0, 'im_total': max_runs, 'IM': opts['IM_start'],
+                           'finished': True, 'tCurrent': 0.0, 'TotalTime': 0.0})
+
+    rows = []       # 结果行
+    runs = {}       # IM -> 是否倒塌
+    n_runs = 0      # 已分析次数
+
+    def _run(IM):
+        nonlocal n_runs
+        data, finished, collapsed, t_cur, TotalTime = _run_one_im(
+            FEModel, IM, IM / Sa_ref, record_x, record_y, DeltaT, ExtraEDP)
+        rows.append(data)
+        runs[IM] = _is_collapse_run(data, opts['collapse_drift'])
+        n_runs += 1
+        _report_im(rec_name, n_runs - 1, max_runs, IM, finished, collapsed, t_cur, TotalTime,
+                   _status_queue, rec_pbar)
+        if rec_pbar is not None:
+            rec_pbar.update(1)
         if _main_pbar is not None:
             _main_pbar.update(1)
+        return runs[IM]
+
+    # 1. 搜索：几何递增步长，直到倒塌或达到上限
+    IM, step = float(opts['IM_start']), float(opts['IM_step'])
+    IM_hi = None
+    while n_runs < max_runs:
+        if _run(IM):
+            IM_hi = IM
+            break
+        IM_next = IM + step
+        step *= 1.0 + float(opts['step_growth'])
+        if opts['IM_max'] is not None and IM_next > opts['IM_max']:
+            break
+        IM = IM_next
+
+    # 2. 夹逼：二分倒塌 IM 所在区间
+    if IM_hi is not None:
+        IM_lo = max([im for im, c in runs.items() if not c], default=0.0)
+        while n_runs < max_runs and (IM_hi - IM_lo) > tol * IM_hi:
+            IM_mid = 0.5 * (IM_lo + IM_hi)
+            if _run(IM_mid):
+                IM_hi = IM_mid
+            else:
+                IM_lo = IM_mid
+
+    # 3. 填充：在最大未倒塌 IM 以下、已分析 IM 之间（含 0）最大间隙的中点补充分析；
+    #    倒塌的中点同样分割间隙，每次分析都使最大间隙变小，不会重复分析同一 IM
+    while n_runs < max_runs:
+        IM_top = max([im for im, c in runs.items() if not c], default=None)
+        if IM_top is None:
+            break
+        ims = np.array([0.0] + sorted(im for im in runs if im <= IM_top))
+        gaps = np.diff(ims)
+        k = int(np.argmax(gaps))
+        if gaps[k] <= tol * ims[-1]:
+            break
+        _run(0.5 * (ims[k] + ims[k + 1]))
+
+    # 未用完的预算计入进度，保持总数一致
+    n_skip = max_runs - n_runs
+    if _status_queue is not None:
+        for im_idx in range(n_runs, max_runs):
+            _status_queue.put({'record': rec_name, 'im_idx': im_idx + 1, 'im_total': max_runs, 'IM': IM,
+                               'finished': True, 'tCurrent': 0.0, 'TotalTime': 0.0})
+    elif rec_pbar is not None:
+        rec_pbar.close()
+    if _main_pbar is not None and n_skip > 0:
+        _main_pbar.update(n_skip)
+
+    IDA_result = pd.concat([pd.DataFrame(d) for d in rows], ignore_index=True)
+    return IDA_result.sort_values('IM', kind='stable').reset_index(drop=True)
+
+
+# ── 倒塌后跳过（固定 IM 序列） ────────────────────────────────────────────────
+
+# 倒塌后跳过默认参数，见 _CollapseSkip
+_COLLAPSE_SKIP_DEFAULTS = {
+    'confirm':        False,  # 首次倒塌后在高一级 IM 再分析一次，仍倒塌才跳过（防止结构"复活"）
+    'collapse_drift': None,   # 额外的倒塌层间位移角限值；None 时仅按 Iffinish 判别
+}
+
+
+def _synthesize_collapse_row(trigger: dict, IM: float, collapse_drift=None) -> dict:
+    """由判定倒塌的结果行 ``trigger`` 生成 ``IM`` 处未实际分析的结果行。
+
+    EDP 列沿用 ``trigger``；``Iffinish = False``、``Synthesized = True``，分析时长记为 0。
+    ``trigger`` 为倒塌（``Collapsed`` 或位移角超限）时 ``Collapsed = True``，仅为不收敛时
+    保持 ``False``，与 ``trigger`` 在 :class:`~MDOFModel.analysis.Collapse.CollapseAnalysis` 中的判定一致。
+    """
+    data = dict(trigger, IM=IM, Iffinish=False, Synthesized=True,
+                Collapsed=bool(trigger.get('Collapsed', False)) or _exceeds_drift(trigger, collapse_drift))
+    for col in ('Iffinish_X', 'Iffinish_Y'):
+        if col in data:
+            data[col] = False
+    for col in ('tCurrent', 'tCurrent_X', 'tCurrent_Y'):
+        if col in data:
+            data[col] = 0.0
+    return data
 
-        # 组装结果行
-        if bidir:
-            data = {
-                'IM': IM, 'EQRecord_X': record_x, 'EQRecord_Y': record_y,
-                'MaxDrift_X':    [list(FEM_X.MaxDrift)],
-                'MaxDrift_Y':    [list(FEM_Y.MaxDrift)],
-                'MaxAbsAccel_X': [list(FEM_X.MaxAbsAccel)],
-                'MaxAbsAccel_Y': [list(FEM_Y.MaxAbsAccel)],
-                'MaxAbsVel_X':   [list(getattr(FEM_X, 'MaxAbsVel', []))],
-                'MaxAbsVel_Y':   [list(getattr(FEM_Y, 'MaxAbsVel', []))],
-                'ResDrift_X': _to_scalar(FEM_X.ResDrift),
-                'ResDrift_Y': _to_scalar(FEM_Y.ResDrift),
-                'Iffinish': finished, 'Iffinish_X': bool(ok_x), 'Iffinish_Y': bool(ok_y),
-                'tCurrent_X': t_x, 'tCurrent_Y': t_y, 'TotalTime': TotalTime,
-            }
-            if ExtraEDP:
-                for col, attr in ExtraEDP.items():
-                    for suf, m in (('_X', FEM_X), ('_Y', FEM_Y)):
-                        v = getattr(m, attr, None)
-                        data[col + suf] = (
-                            float('nan') if v is None
-                            else [list(v)] if hasattr(v, '__len__') and not isinstance(v, str)
-                            else float(v)
-                        )
-        else:
-            data = {
-                'IM': IM, 'EQRecord': record_x,
-                'MaxDrift':         [FEModel.MaxDrift],
-                'MaxAbsAccel':      [FEModel.MaxAbsAccel],
-                'MaxRelativeAccel': [FEModel.MaxRelativeAccel],
-                'MaxAbsVel':        [getattr(FEModel, 'MaxAbsVel', [])],
-                'ResDrift': FEModel.ResDrift, 'Iffinish': finished,
-                'tCurrent': t_cur, 'TotalTime': TotalTime,
-            }
-            if ExtraEDP:
-                for col, attr in ExtraEDP.items():
-                    v = getattr(FEModel, attr, None)
-                    data[col] = (
-                        float('nan') if v is None
-                        else [list(v)] if hasattr(v, '__len__') and not isinstance(v, str)
-                        else float(v)
-                    )
-
-        IDA_result = pd.concat([IDA_result, pd.DataFrame(data)], ignore_index=True)
-
-    return IDA_result
+
+def _row_data(row: pd.Series) -> dict:
+    """把已有结果（如断点文件）中的一行转为 :func:`_run_one_im` 返回的结果行字典格式。"""
+    return {c: [v] if isinstance(v, (list, np.ndarray)) else v for c, v in row.items()}
+
+
+class _CollapseSkip:
+    """一条记录在固定 IM 序列上的倒塌后跳过状态。
+
+    按 IM 序列的顺序处理分析结果（并行时结果可乱序到达，先缓存）：遇到第一个倒塌结果
+    （见 :func:`_is_collapse_run`；``confirm=True`` 时须在下一个 IM 再次倒塌）后，序列中
+    其余的 IM 不再分析，改为由该结果生成 ``Synthesized = True`` 的倒塌结果行（见
+    :func:`_synthesize_collapse_row`）。判定之前已经算完的更高 IM 结果同样被替换，
+    因此并行与串行的结果相同。
+
+    Parameters
+    ----------
+    IM_list : list
+        该记录的完整 IM 序列（升序）。
+    opts : dict
+        覆盖 ``_COLLAPSE_SKIP_DEFAULTS`` 中的参数。
+    """
+
+    def __init__(self, IM_list: list, opts: dict = None):
+        opts = {**_COLLAPSE_SKIP_DEFAULTS, **(opts or {})}
+        self.IM_list = list(IM_list)
+        self.confirm = bool(opts['confirm'])
+        self.collapse_drift = opts['collapse_drift']
+        self._pos = {round(float(IM), 10): k for k, IM in enumerate(self.IM_list)}
+        self._results = {}       # IM 序号 -> 尚未按顺序处理的结果行
+        self._next = 0           # 下一个按顺序处理的 IM 序号
+        self._candidate = False  # 上一个 IM 倒塌，待确认
+        self.stop = None         # 第一个不再分析的 IM 序号
+        self.trigger = None      # 判定倒塌的结果行
+
+    def skipped(self, IM: float) -> bool:
+        """``IM`` 是否已不需要分析（记录已判定倒塌）。"""
+        k = self._pos.get(round(float(IM), 10))
+        return self.stop is not None and k is not None and k >= self.stop
+
+    def add(self, IM: float, data: dict) -> list:
+        """接收 ``IM`` 的分析结果，返回按 IM 顺序已可确定的 ``[(IM, 结果行), ...]``。
+
+        实际分析的结果行加 ``Synthesized = False``；本次判定倒塌时，其后各 IM 的合成结果行
+        一并返回。不在序列中或已跳过的 IM 返回空列表。
+        """
+        k = self._pos.get(round(float(IM), 10))
+        if k is None or self.skipped(IM):
+            return []
+        self._results[k] = dict(data, Synthesized=False)
+        ready = []
+        while self.stop is None and self._next in self._results:
+            k = self._next
+            data = self._results.pop(k)
+            self._next += 1
+            ready.append((self.IM_list[k], data))
+            if not _is_collapse_run(data, self.collapse_drift):
+                self._candidate = False
+            elif self.confirm and not self._candidate:
+                self._candidate = True
+            else:
+                self.stop, self.trigger = self._next, data
+                self._results.clear()
+                ready += [(IM_k, _synthesize_collapse_row(data, IM_k, self.collapse_drift))
+                          for IM_k in self.IM_list[self.stop:]]
+        return ready
+
+
+# ── 任务级调度（记录 × IM） ────────────────────────────────────────────────────
+
+def _record_cost(record_x: str, record_y: str = None) -> float:
+    """记录的相对计算量估计：记录文件大小（与数据点数即分析步数近似成正比）。"""
+    def _size(rec):
+        for ext in ('.at2', '.AT2', '.txt'):
+            f = Path(rec + ext)
+            if f.exists():
+                return float(f.stat().st_size)
+        return 1.0
+    return _size(record_x) + (_size(record_y) if record_y is not None else 0.0)
+
+
+# ── 常驻进程池 ───────────────────────────────────────────────────────────────
+#
+# 执行器（见 Executors.py）的每个工作进程由 _init_worker 接收一次模型及本次 IDA 的公共参数并常驻，
+# 此后任务只携带 (记录, Sa_ref, IM 序号)；每个任务在进程内复制常驻模型后分析，
+# 与逐任务 pickle 模型的结果相同。工作进程完成 MaxTasksPerChild 个任务后由新进程替换，
+# 防止 OpenSees 内存持续增长。
+
+_WORKER_CONTEXT = {}   # 工作进程内常驻：FEModel, IM_list, DeltaT, ExtraEDP, HuntFill
+
+# 工作进程启动时预先导入的模块（不存在的跳过），避免第一个任务承担导入开销
+_WORKER_PRELOAD = ('openseespy.opensees',)
+
+
+def _init_worker(context: dict) -> None:
+    """进程池初始化函数：预先导入分析依赖，并常驻本次 IDA 的模型与公共参数。"""
+    import importlib
+    for name in _WORKER_PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    _WORKER_CONTEXT.clear()
+    _WORKER_CONTEXT.update(context)
+
+
+def _ida_task(record_x: str, record_y: str, Sa_ref: float, im_indices: list) -> list:
+    """进程池任务：在一条记录上分析常驻 ``IM_list`` 中 ``im_indices`` 指定的 IM。
+
+    支持批量分析的模型每个任务包含该记录的全部 IM，一次算完；其余模型每个任务一个 IM。
+    recorder 前缀带 IM 序号，同一记录的不同 IM 可在不同进程中同时分析。模型为旧方式
+    （``ScratchMode = None``）时任务内改用 ``'disk'`` 临时目录，读取结果后删除，
+    否则每个 (记录, IM) 的 recorder 文件都会留在 outputdir 中；需要保留时设 ``KeepScratch = True``。
+
+    Returns
+    -------
+    list
+        ``[(im_idx, data, finished, collapsed, t_cur, TotalTime), ...]``
+    """
+    ctx = _WORKER_CONTEXT
+    FEModel = copy.deepcopy(ctx['FEModel'])
+    if hasattr(FEModel, 'ScratchMode') and FEModel.ScratchMode is None:
+        FEModel.ScratchMode = 'disk'
+    IM_list, DeltaT, ExtraEDP = ctx['IM_list'], ctx['DeltaT'], ctx['ExtraEDP']
+    batch = None
+    if record_y is None and len(im_indices) > 1 and _supports_batch(FEModel, ExtraEDP):
+        batch = FEModel.DynamicAnalysisBatch(
+            record_x, [IM_list[i] / Sa_ref for i in im_indices], DeltaT)
+    out = []
+    for k, i in enumerate(im_indices):
+        FEModel.UniqueRecorderPrefix = _recorder_prefix(record_x, f'IM{i}')
+        out.append((i,) + _run_one_im(
+            FEModel, IM_list[i], IM_list[i] / Sa_ref, record_x, record_y, DeltaT, ExtraEDP,
+            batch.iloc[k] if batch is not None else None))
+    return out
+
+
+def _hunt_fill_task(record_x: str, record_y: str, period: float, _status_queue) -> pd.DataFrame:
+    """进程池任务：用常驻模型对一条记录执行自适应 IM 追踪（见 :func:`IDA_1record_hunt_fill`）。"""
+    ctx = _WORKER_CONTEXT
+    return IDA_1record_hunt_fill(copy.deepcopy(ctx['FEModel']), record_x, period, record_y, ctx['DeltaT'],
+                                 _status_queue, ExtraEDP=ctx['ExtraEDP'], HuntFill=ctx['HuntFill'])
+
+
+class _NullQueue:
+    """不支持传递状态队列的执行器（见 ``IDAExecutor.supports_queue``）使用的空队列，丢弃子进度消息。"""
+
+    def put(self, msg) -> None:
+        pass
+
+
+def _run_scheduled(executor, tasks: list, worker, max_in_flight: int, on_result, should_skip=None) -> None:
+    """按 ``tasks`` 的顺序向执行器惰性派发任务，同时在途的任务不超过 ``max_in_flight``。
+
+    任务只在派发时才检查 ``should_skip(key)``，因此已返回的结果（例如某记录在较低 IM
+    已经倒塌）可以作用于尚未派发的任务；被跳过的任务以 ``on_result(key, None)`` 回调。
+    ``on_result`` 总在主进程中按完成顺序调用。
+
+    Parameters
+    ----------
+    executor : IDAExecutor
+        任务执行器（见 :mod:`~MDOFModel.analysis.Executors`）。
+    tasks : list
+        ``[(key, args), ...]``，``args`` 为传给 ``worker`` 的位置参数元组。
+    worker : Callable
+        可被 pickle 的模块级函数。
+    """
+    todo = iter(tasks)
+    in_flight = {}   # 任务编号 -> key
+
+    def _submit() -> bool:
+        for key, args in todo:
+            if should_skip is not None and should_skip(key):
+                on_result(key, None)
+                continue
+            in_flight[executor.submit(worker, args)] = key
+            return True
+        return False
+
+    while len(in_flight) < max_in_flight and _submit():
+        pass
+    while in_flight:
+        ticket, result, err = executor.wait()
+        key = in_flight.pop(ticket)
+        if err is not None:
+            raise err
+        on_result(key, result)
+        while len(in_flight) < max_in_flight and _submit():
+            pass
 
 
 # ── 批量分析（多条记录，支持并行） ────────────────────────────────────────────
@@ -363,108 +876,392 @@ def IDA_f(
     ExtraEDP: dict = None,
     output_csv: Union[str, Path] = None,
     restart: bool = False,
+    HuntFill: dict = None,
+    MaxTasksPerChild: int = 500,
+    Executor: IDAExecutor = None,
+    CollapseSkip: dict = None,
 ) -> pd.DataFrame:
     """对多条记录（或记录对）批量执行 IDA，支持多进程并行与断点续算。
 
+    ``NumPool > 1`` 或提供 ``Executor`` 且为固定 IM 序列时，以 (记录, IM) 为单位向执行器派发任务
+    （见 :func:`_run_scheduled`），计算量大的记录优先，避免尾部少数长记录串行拖慢整体。
+    工作进程接收一次模型并常驻（见 :func:`_init_worker`），任务只携带记录与 IM。
+
     Parameters
     ----------
+    IM_list : list
+        固定 IM 序列（g）；``HuntFill`` 不为 None 时不使用，可传 ``None``。
     records : list or None
         - ``None``：使用 FEMA P-695 远场 X 方向记录（单向）
         - ``list[str]``：单向分析
         - ``list[(str, str)]``：双向分析（IM 取几何均值 Sa）
     output_csv : str or Path, optional
-        结果输出路径。若提供：
-
-        - 每完成一条记录后立即写入该文件；
-        - 若文件已存在且 ``restart=False``，自动加载已有结果并跳过已完成记录（断点续算）；
-        - 若 ``restart=True``，忽略已有文件，从头重新计算。
+        结果输出路径，扩展名为 ``.npz`` 时写为列式二进制格式（见 :func:`write_IDA_npz`），
+        否则写 CSV。若提供：
+
+        - 每完成一个 (记录, IM) 即在 ``<output_csv>.shards/`` 中追加一个断点分片，
+          全部完成后合并写入该文件并删除分片；
+        - 若文件或分片已存在且 ``restart=False``，自动加载已有结果并跳过已完成的
+          (记录, IM)（断点续算；自适应模式以整条记录为单位）；
+        - 若 ``restart=True``，忽略已有文件和分片，从头重新计算。
     restart : bool, default False
         ``True`` 时强制从头重算，忽略 ``output_csv`` 中的已有结果。
+    HuntFill : dict, optional
+        提供时改用自适应 IM 追踪（见 :func:`IDA_1record_hunt_fill`），各记录的 IM
+        序列由搜索、夹逼与填充确定，可为空字典以使用默认参数。结果格式不变。
+    MaxTasksPerChild : int or None, default 500
+        每个工作进程完成多少个任务后由新进程替换（重新导入依赖并接收模型），
+        防止长时间运行时 OpenSees 的内存持续增长；``None`` 表示不替换。
+    Executor : IDAExecutor, optional
+        任务执行器（见 :mod:`~MDOFModel.analysis.Executors`）：:class:`SerialExecutor`、
+        :class:`PoolExecutor`、:class:`FuturesExecutor` 或 :class:`MPIExecutor`。提供时
+        ``NumPool`` 与 ``MaxTasksPerChild`` 不再使用，执行器由调用方负责关闭；未提供且
+        ``NumPool > 1`` 时使用 ``PoolExecutor(NumPool, MaxTasksPerChild)``。
+    CollapseSkip : dict, optional
+        固定 IM 序列（升序）时，提供（可为空字典）即启用倒塌后跳过：每条记录第一次倒塌
+        （或不收敛）后，更高的 IM 不再分析，改为写入 ``Synthesized = True`` 的倒塌结果行，
+        ``confirm=True`` 时先在高一级 IM 确认一次，见 :class:`_CollapseSkip`。并行时尚未派发的
+        更高 IM 任务直接跳过；续算时由已完成的结果恢复各记录的倒塌状态。``HuntFill`` 模式不使用。
     """
     if records is None:
         records = load_fema_records(bidir=False)
 
+    # 模态分析结果在主进程中算好并缓存在模型上，随模型 pickle / deepcopy 传给各任务
+    if callable(getattr(FEModel, 'ModalProperties', None)):
+        FEModel.ModalProperties()
+
     bidir = isinstance(records[0], (tuple, list))
     label = 'IDA (bidir)' if bidir else 'IDA'
+    rec_cols = ['EQRecord_X', 'EQRecord_Y'] if bidir else ['EQRecord']
 
     def _unpack(rec):
         return (rec[0], rec[1]) if bidir else (rec, None)
 
-    # ── 断点续算：加载已完成记录 ─────────────────────────────────────────
-    IDA_result = pd.DataFrame()
-    done_keys: set = set()
-    ckpt = Path(output_csv) if output_csv else None
-
-    if ckpt is not None and not restart and ckpt.exists():
+    def _unit(rx, ry, IM=None):
+        """分析单元键：固定 IM 序列为 (记录, IM)，自适应追踪为整条记录。"""
+        return (rx, ry, 'HuntFill' if HuntFill is not None else round(float(IM), 10))
+
+    def _row_units(df: pd.DataFrame) -> list:
+        ry_col = df['EQRecord_Y'] if bidir else [None] * len(df)
+        return [_unit(rx, ry, IM) for rx, ry, IM in zip(df[rec_cols[0]], ry_col, df['IM'])]
+
+    # ── 断点续算 ───────────────────────────────────────────────────────────
+    # 每完成一个分析单元，即在 <output_csv>.shards/ 中追加一个不可变分片（见 IDACheckpoint）；
+    # 全部完成后合并写出 output_csv 并删除分片。续算时已完成单元取自 output_csv
+    # （上次合并的结果或旧版整表断点）与分片两部分。
+    ckpt  = Path(output_csv) if output_csv else None
+    store = IDACheckpoint(ckpt.with_name(ckpt.name + '.shards')) if ckpt is not None else None
+    base  = pd.DataFrame()
+    new_frames = []
+    if store is not None and restart:
+        store.clear()
+    elif ckpt is not None and ckpt.exists():
         try:
-            IDA_result = read_IDA_csv(ckpt)
-            n_im = len(IM_list)
-            if bidir and 'EQRecord_X' in IDA_result.columns and 'EQRecord_Y' in IDA_result.columns:
-                counts = IDA_result.groupby(['EQRecord_X', 'EQRecord_Y']).size()
-                done_keys = {k for k, v in counts.items() if v >= n_im}
-            elif not bidir and 'EQRecord' in IDA_result.columns:
-                counts = IDA_result.groupby('EQRecord').size()
-                done_keys = {k for k, v in counts.items() if v >= n_im}
-            if done_keys:
-                tqdm.write(f"  [断点续算] 已跳过 {len(done_keys)} 条记录（从 {ckpt.name} 加载）")
+            base = read_IDA(ckpt)
+            if not all(c in base.columns for c in rec_cols + ['IM']):
+                base = pd.DataFrame()
         except Exception as e:
             tqdm.write(f"  [断点续算] 读取断点文件失败（{e}），将从头开始")
-            IDA_result = pd.DataFrame()
-            done_keys = set()
-
-    def _is_done(rec) -> bool:
-        rx, ry = _unpack(rec)
-        return (rx, ry) in done_keys if bidir else rx in done_keys
-
-    def _save_ckpt() -> None:
+            base = pd.DataFrame()
+    done_units = set(_row_units(base)) if not base.empty else set()
+    if store is not None:
+        done_units |= store.keys()
+
+    def _save_unit(key, rows: pd.DataFrame) -> None:
+        if store is not None:
+            store.append(key, rows)
+        else:
+            new_frames.append(rows)
+
+    def _consolidate() -> pd.DataFrame:
+        parts = [base]
+        if store is not None:
+            shard_units = store.keys()
+            if not base.empty:
+                parts = [base.loc[[u not in shard_units for u in _row_units(base)]]]
+            parts.append(store.read())
+        else:
+            parts += new_frames
+        parts = [p for p in parts if not p.empty]
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts, ignore_index=True)
+        # 按 records 顺序、IM 升序排列
+        order = {tuple(_unpack(rec)) if bidir else rec: k for k, rec in enumerate(records)}
+        keys = zip(df['EQRecord_X'], df['EQRecord_Y']) if bidir else df['EQRecord']
+        df['_order'] = [order.get(k, len(order)) for k in keys]
+        return (df.sort_values(['_order', 'IM'], kind='stable')
+                  .drop(columns='_order').reset_index(drop=True))
+
+    def _finish() -> pd.DataFrame:
+        df = _consolidate()
         if ckpt is not None:
-            IDA_result.to_csv(ckpt, index=False, encoding='utf-8-sig')
-
-    pending = [rec for rec in records if not _is_done(rec)]
+            tmp = ckpt.with_name(ckpt.stem + '.tmp' + ckpt.suffix)
+            write_IDA(df, tmp)
+            os.replace(tmp, ckpt)
+            store.clear()
+        return df
+
+    # 待分析单元：[(记录, 待分析的 IM 序号列表)]；自适应追踪时序号列表为 None
+    if HuntFill is not None:
+        pending = [(rec, None) for rec in records if _unit(*_unpack(rec)) not in done_units]
+        n_per_rec = int({**_HUNT_FILL_DEFAULTS, **HuntFill}['max_runs'])
+        n_todo = len(pending) * n_per_rec
+    else:
+        pending = []
+        for rec in records:
+            idx = [i for i, IM in enumerate(IM_list) if _unit(*_unpack(rec), IM) not in done_units]
+            if idx:
+                pending.append((rec, idx))
+        # 倒塌后跳过：每条待分析记录一个状态，先由已完成的结果恢复，已可确定的合成结果行直接写入
+        skips = []
+        if CollapseSkip is not None:
+            prior = _consolidate() if done_units else pd.DataFrame()
+            kept = []
+            for rec, idx in pending:
+                rx, ry = _unpack(rec)
+                skip = _CollapseSkip(IM_list, CollapseSkip)
+                if not prior.empty:
+                    mask = ((prior['EQRecord_X'] == rx) & (prior['EQRecord_Y'] == ry) if bidir
+                            else prior['EQRecord'] == rx)
+                    for _, row in prior.loc[mask].iterrows():
+                        for IM, data in skip.add(row['IM'], _row_data(row)):
+                            if _unit(rx, ry, IM) not in done_units:
+                                _save_unit(_unit(rx, ry, IM), pd.DataFrame(data))
+                    idx = [i for i in idx if not skip.skipped(IM_list[i])]
+                if idx:
+                    kept.append((rec, idx))
+                    skips.append(skip)
+            pending = kept
+        n_per_rec = len(IM_list)
+        n_todo = sum(len(idx) for _, idx in pending)
+
+    # 自适应模式下每条记录按预算上限计数，未用完的部分在记录结束时计入进度
+    total_all = len(records) * n_per_rec
+    done_sa   = total_all - n_todo
     if not pending:
         tqdm.write("  [断点续算] 所有记录已完成，直接返回已有结果。")
-        return IDA_result
+        return _finish()
+    if done_sa:
+        tqdm.write(f"  [断点续算] 已跳过 {done_sa} 个已完成的分析（从 {ckpt.name} 加载）")
 
-    total_all = len(records) * len(IM_list)
-    done_sa   = len(done_keys) * len(IM_list)
+    executor = Executor
+    if executor is None and NumPool > 1:
+        executor = PoolExecutor(NumPool, MaxTasksPerChild)
 
-    if NumPool == 1:
+    if executor is None:
         with tqdm(total=total_all, initial=done_sa, desc=label, unit='Sa', position=0) as pbar:
-            for rec in pending:
+            for r, (rec, idx) in enumerate(pending):
                 rx, ry = _unpack(rec)
-                result = IDA_1record(copy.deepcopy(FEModel), IM_list, rx, period, ry, DeltaT, None, ExtraEDP, pbar)
-                IDA_result = pd.concat([IDA_result, result], ignore_index=True)
-                _save_ckpt()
-    else:
-        with mp.Manager() as manager:
-            sq       = manager.Queue()
-            stop_ev  = threading.Event()
-            with tqdm(total=total_all, initial=done_sa, desc=label, unit='Sa', position=0) as pbar:
+                if HuntFill is not None:
+                    result = IDA_1record_hunt_fill(copy.deepcopy(FEModel), rx, period, ry, DeltaT, None, ExtraEDP, pbar, HuntFill)
+                    _save_unit(_unit(rx, ry), result)
+                else:
+                    IDA_1record(copy.deepcopy(FEModel), [IM_list[i] for i in idx], rx, period, ry, DeltaT, None, ExtraEDP, pbar,
+                                _on_row=lambda IM, rows, rx=rx, ry=ry: _save_unit(_unit(rx, ry, IM), rows),
+                                _skip=skips[r] if skips else None)
+    elif HuntFill is not None:
+        # 自适应追踪每条记录内部是串行的，按记录分配任务；
+        # 支持状态队列的执行器由进度线程显示各记录的子进度条，否则每条记录完成时整体计入进度
+        def _on_hunt_result(r, result):
+            _save_unit(_unit(*_unpack(pending[r][0])), result)
+            if sq is None:
+                pbar.update(n_per_rec)
+
+        with contextlib.ExitStack() as stack:
+            if Executor is None:
+                stack.enter_context(executor)
+            pbar = stack.enter_context(
+                tqdm(total=total_all, initial=done_sa, desc=label, unit='Sa', position=0))
+            sq = None
+            if executor.supports_queue:
+                sq      = stack.enter_context(mp.Manager()).Queue()
+                stop_ev = threading.Event()
                 t = threading.Thread(target=_progress_thread,
-                                     args=(sq, stop_ev, pbar, NumPool), daemon=True)
+                                     args=(sq, stop_ev, pbar, executor.num_workers), daemon=True)
                 t.start()
-                with mp.Pool(NumPool) as pool:
-                    futures = [
-                        pool.apply_async(
-                            IDA_1record,
-                            args=(copy.deepcopy(FEModel), IM_list, _unpack(rec)[0], period, _unpack(rec)[1], DeltaT, sq),
-                            kwds={'ExtraEDP': ExtraEDP},
-                        )
-                        for rec in pending
-                    ]
-                    for fut in futures:
-                        IDA_result = pd.concat([IDA_result, fut.get()], ignore_index=True)
-                        _save_ckpt()
-            stop_ev.set()
-            t.join(timeout=3.0)
-
-    return IDA_result
-
-
-# ── CSV 读写 ───────────────────────────────────────────────────────────────────
+            executor.initialize(_init_worker, ({'FEModel': FEModel, 'DeltaT': DeltaT,
+                                                'ExtraEDP': ExtraEDP, 'HuntFill': HuntFill},))
+            tasks = [(r, (*_unpack(rec), period, sq if sq is not None else _NullQueue()))
+                     for r, (rec, _) in enumerate(pending)]
+            _run_scheduled(executor, tasks, _hunt_fill_task, 2 * executor.num_workers, _on_hunt_result)
+            if sq is not None:
+                stop_ev.set()
+                t.join(timeout=3.0)
+    else:
+        # 任务级调度：每个 (记录, IM) 一个任务（支持批量分析的模型每条记录一个任务），
+        # 记录按预计计算量从大到小排列（最长者先算），同一记录内 IM 从低到高；
+        # 每个 IM 的结果返回后立即写入断点分片
+        per_record = not bidir and _supports_batch(FEModel, ExtraEDP)
+
+        def _on_result(key, out):
+            if out is None:   # 倒塌后跳过的任务，合成结果行已在判定倒塌时写入
+                return
+            r, _ = key
+            rx, ry = _unpack(pending[r][0])
+            name = f"{Path(rx).stem}+{Path(ry).stem}" if bidir else Path(rx).stem
+            for i, data, finished, collapsed, t_cur, TotalTime in out:
+                _report_im(name, i, n_per_rec, IM_list[i], finished, collapsed, t_cur, TotalTime, None, pbar)
+                ready = skips[r].add(IM_list[i], data) if skips else [(IM_list[i], data)]
+                for IM, data_k in ready:
+                    if _unit(rx, ry, IM) not in done_units:
+                        pbar.update(1)
+                        _save_unit(_unit(rx, ry, IM), pd.DataFrame(data_k))
+
+        def _skip_task(key) -> bool:
+            r, g = key
+            return bool(skips) and all(skips[r].skipped(IM_list[i]) for i in g)
+
+        with contextlib.ExitStack() as stack:
+            if Executor is None:
+                stack.enter_context(executor)
+            pbar = stack.enter_context(
+                tqdm(total=total_all, initial=done_sa, desc=label, unit='Sa', position=0))
+            executor.initialize(_init_worker, ({'FEModel': FEModel, 'IM_list': IM_list,
+                                                'DeltaT': DeltaT, 'ExtraEDP': ExtraEDP},))
+            sa_refs = executor.map(_record_sa_ref,
+                                   [(_unpack(rec)[0], period, _unpack(rec)[1]) for rec, _ in pending])
+            order = sorted(range(len(pending)), key=lambda r: -_record_cost(*_unpack(pending[r][0])))
+            tasks = [
+                ((r, tuple(g)), (*_unpack(pending[r][0]), sa_refs[r], g))
+                for r in order
+                for g in ([pending[r][1]] if per_record else [[i] for i in pending[r][1]])
+            ]
+            _run_scheduled(executor, tasks, _ida_task, 2 * executor.num_workers, _on_result, _skip_task)
+
+    return _finish()
+
+
+# ── 结果文件读写（CSV / NPZ） ───────────────────────────────────────────────────
+#
+# NPZ 为列式二进制格式：标量列各存为一维数组，各层 EDP 列（MaxDrift 等及数组型
+# 自定义 EDP）存为 NaN 补齐的定宽矩阵 ``(n_rows, width)`` 并附各行实际长度，
+# 读取时无需逐单元格解析字符串。文件内键名按列序号编排，列名另存于 '__columns__'。
+
+_IDA_NPZ_VERSION = 1
+
+
+def _column_kind(values: pd.Series) -> str:
+    """判断列的存储方式：'array'（各层 EDP）、'bool'、'num' 或 'str'。"""
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return 'bool'
+    if values.dtype != object:
+        return 'num' if pd.api.types.is_numeric_dtype(values.dtype) else 'str'
+    non_null = [v for v in values if not (isinstance(v, float) and math.isnan(v)) and v is not None]
+    if non_null and all(isinstance(v, (list, tuple, np.ndarray)) for v in non_null):
+        return 'array'
+    if non_null and all(isinstance(v, (bool, np.bool_)) for v in non_null):
+        return 'bool'
+    try:
+        values.astype(float)
+        return 'num'
+    except (ValueError, TypeError):
+        return 'str'
+
+
+def _stack_ragged(values) -> Tuple[np.ndarray, np.ndarray]:
+    """将逐行数组堆叠为 NaN 补齐的定宽矩阵，返回 ``(matrix, lengths)``。"""
+    rows = [np.ravel(np.asarray(v, dtype=float)) if isinstance(v, (list, tuple, np.ndarray))
+            else np.empty(0) for v in values]
+    lengths = np.fromiter((r.size for r in rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) else 0
+    if len(rows) and (lengths == width).all():
+        return np.array(rows, dtype=float).reshape(len(rows), width), lengths
+    mat = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        mat[i, :r.size] = r
+    return mat, lengths
+
+
+def _unstack_ragged(mat: np.ndarray, lengths: np.ndarray) -> list:
+    """:func:`_stack_ragged` 的逆操作，按行长度截取为逐行数组（行视图，不复制数据）。"""
+    if (lengths == mat.shape[1]).all():
+        return list(mat)
+    return [row[:n] for row, n in zip(mat, lengths)]
+
+
+def write_IDA_npz(IDA_result: pd.DataFrame, npz_file: Union[str, Path], compressed: bool = False) -> Path:
+    """将 IDA 结果写为列式 NPZ 文件。
+
+    Parameters
+    ----------
+    IDA_result : pandas.DataFrame
+        IDA 结果（单向或双向）。各层 EDP 列的单元格为数组或列表。
+    npz_file : str or Path
+        输出路径（不会自动追加扩展名）。
+    compressed : bool, default False
+        是否压缩存储；压缩后文件更小，但读写更慢。
+
+    Returns
+    -------
+    pathlib.Path
+        输出路径。
+    """
+    npz_file = Path(npz_file)
+    df = IDA_result.loc[:, ~IDA_result.columns.astype(str).str.contains('^Unnamed')]
+    arrays = {
+        '__version__': np.array(_IDA_NPZ_VERSION),
+        '__columns__': np.array([str(c) for c in df.columns], dtype=str),
+    }
+    kinds = []
+    for j, col in enumerate(df.columns):
+        kind = _column_kind(df[col])
+        values = df[col]
+        if kind == 'array':
+            arrays[f'c{j}'], arrays[f'c{j}_len'] = _stack_ragged(values)
+        elif kind == 'bool':
+            arrays[f'c{j}'] = values.fillna(False).astype(bool).to_numpy()
+        elif kind == 'num':
+            arrays[f'c{j}'] = values.astype(float if values.dtype == object else values.dtype).to_numpy()
+        else:
+            arrays[f'c{j}'] = np.array(['' if v is None else str(v) for v in values], dtype=str)
+        kinds.append(kind)
+    arrays['__kinds__'] = np.array(kinds, dtype=str)
+
+    with open(npz_file, 'wb') as f:
+        (np.savez_compressed if compressed else np.savez)(f, **arrays)
+    return npz_file
+
+
+def read_IDA_npz(npz_file: Union[str, Path], dense: bool = False):
+    """读取 :func:`write_IDA_npz` 写出的 NPZ 文件。
+
+    Parameters
+    ----------
+    npz_file : str or Path
+        NPZ 文件路径。
+    dense : bool, default False
+        - ``False``：返回与 :func:`read_IDA_csv` 相同格式的 DataFrame（各层 EDP
+          单元格为 numpy 数组）；
+        - ``True``：返回 ``(scalars, matrices)``，``scalars`` 为仅含标量列的
+          DataFrame，``matrices`` 为 {列名: NaN 补齐的 ``(n_rows, width)`` 矩阵}，
+          适合直接做向量化运算。
+
+    Returns
+    -------
+    pandas.DataFrame or tuple[pandas.DataFrame, dict]
+    """
+    with np.load(Path(npz_file), allow_pickle=False) as z:
+        columns = z['__columns__'].tolist()
+        kinds   = z['__kinds__'].tolist()
+        scalars, matrices = {}, {}
+        for j, (col, kind) in enumerate(zip(columns, kinds)):
+            if kind == 'array':
+                mat = z[f'c{j}']
+                matrices[col] = mat if dense else _unstack_ragged(mat, z[f'c{j}_len'])
+            else:
+                scalars[col] = z[f'c{j}']
+
+    if dense:
+        return pd.DataFrame({c: scalars[c] for c in columns if c in scalars}), matrices
+    return pd.DataFrame({c: scalars[c] if c in scalars else matrices[c] for c in columns})
+
 
 def read_IDA_csv(csv_file: Union[str, Path]) -> pd.DataFrame:
-    """读取 IDA CSV（自动兼容单向/双向格式），将字符串数组列解析为 numpy 数组。"""
+    """读取 IDA CSV（自动兼容单向/双向格式），将字符串数组列解析为 numpy 数组。
+
+    大规模结果建议先用 :func:`convert_IDA_csv_to_npz` 转为 NPZ，再用 :func:`read_IDA` 读取。
+    """
     def _parse(v):
         if not isinstance(v, str):
             return v
@@ -482,13 +1279,13 @@ def read_IDA_csv(csv_file: Union[str, Path]) -> pd.DataFrame:
         if bidir else
         ['MaxDrift', 'MaxAbsAccel', 'MaxRelativeAccel', 'MaxAbsVel', 'ResDrift']
     )
-    df = pd.read_csv(Path(csv_file), converters={c: _parse for c in array_cols})
+    df = pd.read_csv(Path(csv_file), converters={c: _parse for c in array_cols if c in tmp.columns})
     df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
 
     # 自动解析其余含 '[' 的字符串列（自定义 EDP）
     std_cols = _STANDARD_COLS_2D if bidir else _STANDARD_COLS_1D
     for col in df.columns:
-        if col not in std_cols and df[col].dtype == object:
+        if col not in std_cols and not pd.api.types.is_numeric_dtype(df[col].dtype):
             try:
                 df[col] = df[col].apply(
                     lambda v: _parse(v) if isinstance(v, str) and '[' in v else v)
@@ -497,6 +1294,66 @@ def read_IDA_csv(csv_file: Union[str, Path]) -> pd.DataFrame:
     return df
 
 
+def read_IDA(ida_file: Union[str, Path]) -> pd.DataFrame:
+    """按扩展名读取 IDA 结果：``.npz`` 用 :func:`read_IDA_npz`，其余按 CSV 读取。"""
+    if Path(ida_file).suffix.lower() == '.npz':
+        return read_IDA_npz(ida_file)
+    return read_IDA_csv(ida_file)
+
+
+def read_IDA_columns(ida_file: Union[str, Path]) -> list:
+    """只读取 IDA 结果文件的列名（不加载数据），用于探测单向/双向格式。"""
+    if Path(ida_file).suffix.lower() == '.npz':
+        with np.load(Path(ida_file), allow_pickle=False) as z:
+            return z['__columns__'].tolist()
+    return pd.read_csv(Path(ida_file), nrows=0).columns.tolist()
+
+
+def read_IDA_matrices(ida_file: Union[str, Path, pd.DataFrame]) -> Tuple[pd.DataFrame, dict]:
+    """读取 IDA 结果并返回 ``(scalars, matrices)``，格式同 ``read_IDA_npz(dense=True)``。
+
+    NPZ 文件直接返回存储的定宽矩阵；CSV 文件或 DataFrame 先解析再堆叠。
+    """
+    if isinstance(ida_file, (str, Path)) and Path(ida_file).suffix.lower() == '.npz':
+        return read_IDA_npz(ida_file, dense=True)
+    df = ida_file if isinstance(ida_file, pd.DataFrame) else read_IDA_csv(ida_file)
+    df = df.loc[:, ~df.columns.astype(str).str.contains('^Unnamed')]
+    matrices = {}
+    for col in df.columns:
+        if df[col].dtype == object and _column_kind(df[col]) == 'array':
+            matrices[col] = _stack_ragged(df[col])[0]
+    return df.drop(columns=list(matrices)), matrices
+
+
+def write_IDA(IDA_result: pd.DataFrame, ida_file: Union[str, Path]) -> Path:
+    """按扩展名写出 IDA 结果：``.npz`` 用 :func:`write_IDA_npz`，其余写 CSV。"""
+    ida_file = Path(ida_file)
+    if ida_file.suffix.lower() == '.npz':
+        return write_IDA_npz(IDA_result, ida_file)
+    IDA_result.to_csv(ida_file, index=False, encoding='utf-8-sig')
+    return ida_file
+
+
+def convert_IDA_csv_to_npz(csv_file: Union[str, Path], npz_file: Union[str, Path] = None,
+                           compressed: bool = False) -> Path:
+    """将 IDA CSV 转为 NPZ。``npz_file`` 缺省时与 CSV 同名，扩展名改为 ``.npz``。"""
+    csv_file = Path(csv_file)
+    npz_file = csv_file.with_suffix('.npz') if npz_file is None else Path(npz_file)
+    return write_IDA_npz(read_IDA_csv(csv_file), npz_file, compressed)
+
+
+def convert_IDA_npz_to_csv(npz_file: Union[str, Path], csv_file: Union[str, Path] = None) -> Path:
+    """将 IDA NPZ 转回 CSV（与旧版工具兼容）。``csv_file`` 缺省时与 NPZ 同名。"""
+    npz_file = Path(npz_file)
+    csv_file = npz_file.with_suffix('.csv') if csv_file is None else Path(csv_file)
+    df = read_IDA_npz(npz_file)
+    for col in df.columns:
+        if df[col].dtype == object and _column_kind(df[col]) == 'array':
+            df[col] = [v.tolist() for v in df[col]]
+    df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+    return csv_file
+
+
 # ── 绘图（自动检测单向/双向） ──────────────────────────────────────────────────
 
 def plot_IDA(
@@ -512,7 +1369,7 @@ def plot_IDA(
         False 绘制各条记录曲线；True 绘制中位数 ± σ 统计包络。
     """
     if isinstance(IDA_result, (str, Path)):
-        IDA_result = read_IDA_csv(IDA_result)
+        IDA_result = read_IDA(IDA_result)
 
     bidir = 'EQRecord_X' in IDA_result.columns
 
@@ -546,9 +1403,25 @@ def plot_IDA(
                     label='Records' if i == 0 else None, zorder=1)
 
         IM_list_sorted = sorted(Counter(IDA_result['IM'].values.tolist()).keys())
+        vals_per_im = [[_max_drift(r) for _, r in IDA_result[IDA_result['IM'] == im].iterrows()]
+                       for im in IM_list_sorted]
+        if len(set(IDA_result.groupby(record_col)['IM'].apply(frozenset))) > 1:
+            # 自适应 IM（hunt & fill）：各记录 IM 不同，先在公共网格上对收敛结果线性插值，
+            # 超过该记录最大收敛 IM 的网格点不参与统计
+            curves = []
+            for rec in groups:
+                rows = IDA_result[IDA_result[record_col] == rec]
+                rows = rows[rows['Iffinish'].astype(bool)].sort_values('IM')
+                curves.append((np.r_[0.0, rows['IM'].values],
+                               np.r_[0.0, [_max_drift(r) for _, r in rows.iterrows()]]))
+            IM_list_sorted = np.linspace(0.0, max(c[0][-1] for c in curves), 51)[1:].tolist()
+            vals_per_im = [[np.interp(im, x, y) for x, y in curves if im <= x[-1]]
+                           for im in IM_list_sorted]
+            keep = [len(v) > 0 for v in vals_per_im]
+            IM_list_sorted = [im for im, k in zip(IM_list_sorted, keep) if k]
+            vals_per_im = [v for v, k in zip(vals_per_im, keep) if k]
         medians, lo, hi = [], [], []
-        for im in IM_list_sorted:
-            vals = [_max_drift(r) for _, r in IDA_result[IDA_result['IM'] == im].iterrows()]
+        for vals in vals_per_im:
             ln   = np.log(np.clip(vals, 1e-12, None))
             sig  = np.std(ln)
             med  = np.exp(np.mean(ln))
@@ -569,15 +1442,247 @@ def plot_IDA(
     plt.show()
 
 
-# ── EDP 插值（单向） ───────────────────────────────────────────────────────────
+# ── EDP 插值（预计算插值表） ───────────────────────────────────────────────────
+
+def _take_width(mat: np.ndarray, n: int) -> np.ndarray:
+    """取最后一维的前 ``n`` 个元素，不足时以 NaN 补齐。"""
+    out = mat[..., :n]
+    if out.shape[-1] < n:
+        pad = np.full(out.shape[:-1] + (n - out.shape[-1],), np.nan)
+        out = np.concatenate([out, pad], axis=-1)
+    return out
+
+
+class IDAInterpolator:
+    """IDA 结果的预计算插值表，一次调用即可在多个目标 IM 处插值全部记录的 EDP。
+
+    构造时只读取、解析一次 IDA 结果：剔除未收敛的行，按记录（双向为记录对）分组并按 IM
+    升序排列，各 EDP 列展平后存为稠密张量 ``values``。每条记录在目标 IM 处分段线性插值，
+    与某个已有 IM 相等时直接取该行，超出该记录的 IM 范围时取边界值（不外推）。
+    结果与逐记录、逐 IM 插值相同，损失评估中对 20~50 个 IM 反复调用时不再重复解析与分组。
+
+    Parameters
+    ----------
+    ida_result : str, Path or pandas.DataFrame
+        IDA 结果文件（CSV 或 NPZ）或 DataFrame，单向或双向均可。
+
+    Attributes
+    ----------
+    bidir : bool
+        是否为双向结果。
+    records : list
+        记录名（双向为 ``(X, Y)`` 元组），按结果中首次出现的顺序。
+    IM : numpy.ndarray
+        ``(n_records, n_IM)``，各记录的 IM 升序排列，IM 个数不足 ``n_IM`` 的记录以 ``inf`` 补齐。
+    values : numpy.ndarray
+        ``(n_records, n_IM, n_EDP)``，与 ``IM`` 对应的 EDP，补齐位置为 NaN。
+    columns : dict
+        ``{列名: slice}``，各 EDP 列在 ``values`` 最后一维中的位置。
+
+    Examples
+    --------
+    >>> interp = IDAInterpolator('IDA_results.npz')
+    >>> drift, accel, res, vel, extra = interp.edp([0.2, 0.4, 0.6], num_stories=3)
+    >>> drift.shape   # (目标 IM 数, 记录数, 层数)
+    (3, 44, 3)
+    """
+
+    def __init__(self, ida_result: Union[str, Path, pd.DataFrame]):
+        if isinstance(ida_result, pd.DataFrame):
+            ida_result = self._parse_str_cells(ida_result)
+        scalars, matrices = read_IDA_matrices(ida_result)
+        self.bidir = 'EQRecord_X' in scalars.columns
+        ok = scalars['Iffinish'].astype(bool).to_numpy()
+        if not ok.any():
+            raise ValueError("双向 IDA 结果中没有收敛完成的记录。" if self.bidir
+                             else "没有收敛完成的记录，无法提取 EDP。")
+        scalars = scalars.loc[ok].reset_index(drop=True)
+        matrices = {c: m[ok] for c, m in matrices.items()}
+
+        # 记录编号按首次出现的顺序；各行按 (记录, IM) 排序后在记录内的位置
+        if self.bidir:
+            codes, _ = pd.factorize(scalars['EQRecord_X'].astype(str) + '|' + scalars['EQRecord_Y'].astype(str))
+        else:
+            codes, _ = pd.factorize(scalars['EQRecord'])
+        im = scalars['IM'].to_numpy(dtype=float)
+        order = np.lexsort((im, codes))
+        codes, im = codes[order], im[order]
+        self.n_IM = np.bincount(codes)
+        starts = np.cumsum(self.n_IM) - self.n_IM
+        pos = np.arange(len(codes)) - np.repeat(starts, self.n_IM)
+        n_rec, width_im = len(self.n_IM), int(self.n_IM.max())
+        first = order[starts]   # 各记录 IM 最小的一行（原始行号）
+        self.records = (list(zip(scalars['EQRecord_X'].to_numpy()[first], scalars['EQRecord_Y'].to_numpy()[first]))
+                        if self.bidir else list(scalars['EQRecord'].to_numpy()[first]))
+        self.IM = np.full((n_rec, width_im), np.inf)
+        self.IM[codes, pos] = im
+
+        # 各 EDP 列（标量列宽度为 1）按列拼接为 (n_rows, n_EDP)，记录各记录的数组长度
+        std = _STANDARD_COLS_2D if self.bidir else _STANDARD_COLS_1D
+        blocks, self.columns, self._lengths, self._scalar_cols = [], {}, {}, set()
+        candidates = [c for c in list(matrices) + list(scalars.columns)
+                      if c in matrices or c.startswith('ResDrift')
+                      or (c not in std and _column_kind(scalars[c]) in ('num', 'bool'))]
+        e = 0
+        for col in dict.fromkeys(candidates):
+            if col in matrices:
+                mat = matrices[col]
+                valid = ~np.isnan(mat)
+                lengths = np.where(valid.any(axis=1), mat.shape[1] - np.argmax(valid[:, ::-1], axis=1), 0)
+            else:
+                mat = scalars[col].to_numpy(dtype=float)[:, None]
+                lengths = np.ones(len(mat), dtype=np.int64)
+                self._scalar_cols.add(col)
+            blocks.append(mat)
+            self.columns[col] = slice(e, e + mat.shape[1])
+            self._lengths[col] = lengths[first]
+            e += mat.shape[1]
+        self.values = np.full((n_rec, width_im, e), np.nan)
+        if blocks:
+            self.values[codes, pos] = np.concatenate(blocks, axis=1)[order]
+
+    @staticmethod
+    def _parse_str_cells(df: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame 中以字符串存储的数组单元格（如直接 ``pd.read_csv`` 读入）解析为数组。"""
+        cols = [c for c in df.columns if df[c].dtype == object
+                and any(isinstance(v, str) and v.lstrip().startswith('[') for v in df[c])]
+        if not cols:
+            return df
+        df = df.copy()
+        for col in cols:
+            df[col] = df[col].map(lambda v: _parse_ida_array(v) if isinstance(v, str) else v)
+        return df
+
+    def _locate(self, im_targets: np.ndarray) -> tuple:
+        """各目标 IM 在各记录 IM 序列中的插值位置 ``(lo, hi, w, hit_lo, hit_hi)``，形状均为 ``(n_targets, n_records)``。"""
+        t = im_targets[:, None]
+        up = (self.IM[None] <= t[..., None]).sum(axis=2)
+        last = self.n_IM - 1
+        lo = np.clip(up - 1, 0, last)
+        hi = np.minimum(up, last)
+        rec = np.arange(len(self.n_IM))
+        im_lo, im_hi = self.IM[rec, lo], self.IM[rec, hi]
+        den = im_hi - im_lo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(den > 0, (t - im_lo) / den, 0.0)
+        # 目标 IM 与已有 IM 相等（np.isclose）时直接取该行，两者皆相等时取较低者
+        hit_lo = np.isclose(im_lo, t)
+        hit_hi = np.isclose(im_hi, t) & ~hit_lo
+        return lo, hi, w, hit_lo, hit_hi
+
+    def _interp_col(self, loc: tuple, column: str) -> np.ndarray:
+        lo, hi, w, hit_lo, hit_hi = loc
+        rec = np.arange(len(self.n_IM))
+        v = self.values[:, :, self.columns[column]]
+        v_lo, v_hi = v[rec, lo], v[rec, hi]
+        out = v_lo + w[..., None] * (v_hi - v_lo)
+        return np.where(hit_lo[..., None], v_lo, np.where(hit_hi[..., None], v_hi, out))
+
+    def interp(self, im_targets, column: str) -> np.ndarray:
+        """在目标 IM 处插值单个 EDP 列。
+
+        Returns
+        -------
+        numpy.ndarray
+            ``(n_targets, n_records, width)``；标量列为 ``(n_targets, n_records)``。
+            ``im_targets`` 为单个数值时去掉第一维。
+        """
+        t = np.atleast_1d(np.asarray(im_targets, dtype=float))
+        out = self._interp_col(self._locate(t), column)
+        if column in self._scalar_cols:
+            out = out[..., 0]
+        return out if np.ndim(im_targets) else out[0]
+
+    def edp(self, im_targets, num_stories: int) -> tuple:
+        """在目标 IM 处提取损失评估所需的 EDP 样本。
+
+        返回值与 :func:`interp_edp_from_ida`（单向）或 :func:`interp_edp_from_ida_bidir`
+        （双向）相同；``im_targets`` 为多个 IM 时各矩阵（含自定义 EDP）增加第一维（目标 IM）。
+        """
+        t = np.atleast_1d(np.asarray(im_targets, dtype=float))
+        N = int(num_stories)
+        loc = self._locate(t)
+        out = self._edp_bidir(loc, N) if self.bidir else self._edp_1d(loc, N)
+        if np.ndim(im_targets):
+            return out
+        return tuple({k: v[0] for k, v in o.items()} if isinstance(o, dict) else o[0] for o in out)
+
+    def _vel(self, loc: tuple, column: str, N: int) -> np.ndarray:
+        """峰值楼面速度取前 N+1 个元素；缺少地面节点（长度不足 N+1）的记录首列补 0。"""
+        v = self._interp_col(loc, column)
+        with_ground = _take_width(v, N + 1)
+        shifted = np.concatenate([np.zeros(v.shape[:-1] + (1,)), _take_width(v, N)], axis=-1)
+        return np.where((self._lengths[column] >= N + 1)[:, None], with_ground, shifted)
+
+    def _check_accel(self, column: str, N: int) -> None:
+        n = int(self._lengths[column][0])
+        if n < N + 1:
+            raise ValueError(
+                f"{column} 数组长度 {n}，需要包含地面节点（N+1={N + 1} 个元素），请检查 GeneralModelWrapper 版本。"
+            )
+
+    def _extra(self, loc: tuple, column: str):
+        """自定义 EDP：标量列为 ``(n_targets, n_records)``，数组列为 ``(n_targets, n_records, 长度)``；各记录长度不同时返回 None。"""
+        if column in self._scalar_cols:
+            return self._interp_col(loc, column)[..., 0]
+        lengths = self._lengths[column]
+        if (lengths != lengths[0]).any():
+            return None
+        return self._interp_col(loc, column)[..., :lengths[0]]
+
+    def _edp_1d(self, loc: tuple, N: int) -> tuple:
+        n_t, n_rec = loc[0].shape
+        drift_mat = np.clip(self._interp_col(loc, 'MaxDrift')[..., :N], 1e-8, None)
+        self._check_accel('MaxAbsAccel', N)
+        accel_mat = np.clip(self._interp_col(loc, 'MaxAbsAccel')[..., :N + 1], 1e-8, None) / 9800.0
+        res_arr   = np.clip(np.fmax.reduce(self._interp_col(loc, 'ResDrift'), axis=-1), 1e-8, None)
+        vel_mat   = (np.clip(self._vel(loc, 'MaxAbsVel', N) / 1000.0, 1e-8, None)
+                     if 'MaxAbsVel' in self.columns else np.full((n_t, n_rec, N + 1), 10.0))
+        extra_dict = {}
+        for col in self.columns:
+            if col not in _STANDARD_COLS_1D:
+                val = self._extra(loc, col)
+                if val is not None:
+                    extra_dict[col] = val
+        return drift_mat, accel_mat, res_arr, vel_mat, extra_dict
+
+    def _edp_bidir(self, loc: tuple, N: int) -> tuple:
+        n_t, n_rec = loc[0].shape
+        clip = lambda arr: np.clip(arr, 1e-8, None)
+        if 'MaxAbsAccel_X' in self.columns:
+            self._check_accel('MaxAbsAccel_X', N)
+        out = []
+        for suf in ('_X', '_Y'):
+            out.append((
+                clip(self._interp_col(loc, 'MaxDrift' + suf)[..., :N]),
+                clip(self._interp_col(loc, 'MaxAbsAccel' + suf)[..., :N + 1] / 9800.0),
+                clip(self._interp_col(loc, 'ResDrift' + suf)[..., 0]),
+                clip(self._vel(loc, 'MaxAbsVel' + suf, N) / 1000.0 if 'MaxAbsVel_X' in self.columns
+                     else np.full((n_t, n_rec, N + 1), 10.0)),
+            ))
+        (drift_X, accel_X, res_X, vel_X), (drift_Y, accel_Y, res_Y, vel_Y) = out
+
+        extra_x, extra_y = {}, {}
+        for base in [c[:-2] for c in self.columns if c not in _STANDARD_COLS_2D and c.endswith('_X')]:
+            for suf, dst in (('_X', extra_x), ('_Y', extra_y)):
+                if base + suf in self.columns:
+                    val = self._extra(loc, base + suf)
+                    if val is not None:
+                        dst[base] = val
+        return (drift_X, drift_Y, accel_X, accel_Y, res_X, res_Y,
+                vel_X, vel_Y, extra_x, extra_y)
+
 
 def interp_edp_from_ida(
-    ida_csv: Union[str, Path, pd.DataFrame],
-    im_target: float,
+    ida_csv: Union[str, Path, pd.DataFrame, IDAInterpolator],
+    im_target,
     num_stories: int,
 ):
     """从单向 IDA 结果中提取目标 IM 处的 EDP 样本（各记录独立线性插值）。
 
+    ``im_target`` 可为多个 IM，此时各返回值增加第一维（目标 IM）。对同一结果反复插值时，
+    先构造 :class:`IDAInterpolator` 作为 ``ida_csv`` 传入，避免重复读取与解析。
+
     Returns
     -------
     tuple
@@ -589,78 +1694,21 @@ def interp_edp_from_ida(
         - **vel_mat**   ``(n, N+1)`` – 峰值楼面速度（m/s）
         - **extra_dict** ``dict`` – 用户自定义 EDP 插值结果
     """
-    N = int(num_stories)
-    df = ida_csv.copy() if isinstance(ida_csv, pd.DataFrame) else read_IDA_csv(ida_csv)
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-    df['Iffinish'] = df['Iffinish'].astype(bool)
-    df = df.loc[df['Iffinish']].reset_index(drop=True)
-    if df.empty:
-        raise ValueError("没有收敛完成的记录，无法提取 EDP。")
-
-    # 解析字符串列为数组
-    for col in ['MaxDrift', 'MaxAbsAccel', 'MaxAbsVel', 'ResDrift']:
-        if col in df.columns:
-            df[col] = df[col].apply(
-                lambda v: _parse_ida_array(v) if isinstance(v, str) else np.asarray(v, dtype=float))
-
-    extra_cols = [c for c in df.columns if c not in _STANDARD_COLS_1D]
-    for col in extra_cols:
-        df[col] = df[col].apply(
-            lambda v: _parse_ida_array(v) if isinstance(v, str) else np.asarray(v, dtype=float))
-
-    drift_rows, accel_rows, res_rows, vel_rows = [], [], [], []
-    extra_rows = {c: [] for c in extra_cols}
-
-    for _, rows in df.groupby('EQRecord', sort=False):
-        drift = np.asarray(_interp_ida_value(rows, im_target, 'MaxDrift'), dtype=float)[:N]
-        accel_full = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsAccel'), dtype=float)
-        res   = _interp_ida_value(rows, im_target, 'ResDrift')
-        res   = float(res) if not hasattr(res, '__len__') else float(np.max(res))
-
-        drift_rows.append(drift)
-        accel_rows.append(accel_full)
-        res_rows.append(res)
-
-        if 'MaxAbsVel' in df.columns:
-            vel = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsVel'), dtype=float)
-            vel_rows.append(vel[:N + 1] if len(vel) >= N + 1 else np.concatenate([[0.0], vel[:N]]))
-
-        for col in extra_cols:
-            if col in rows.columns:
-                extra_rows[col].append(np.asarray(_interp_ida_value(rows, im_target, col), dtype=float))
-
-    drift_mat = np.clip(np.array(drift_rows, dtype=float), 1e-8, None)
-    _accel_len = len(accel_rows[0]) if accel_rows else 0
-    if _accel_len < N + 1:
-        raise ValueError(
-            f"MaxAbsAccel 数组长度 {_accel_len}，需要包含地面节点（N+1={N + 1} 个元素），请检查 GeneralModelWrapper 版本。"
-        )
-    accel_arr = np.array([r[:N + 1] for r in accel_rows], dtype=float)
-    accel_mat = np.clip(accel_arr, 1e-8, None) / 9800.0
-    res_arr   = np.clip(np.array(res_rows, dtype=float), 1e-8, None)
-    vel_mat   = (np.clip(np.array(vel_rows, dtype=float) / 1000.0, 1e-8, None)
-                 if vel_rows else np.full((len(drift_mat), N + 1), 10.0))
-
-    extra_dict = {}
-    for col, vals in extra_rows.items():
-        if vals:
-            try:
-                extra_dict[col] = np.array(vals, dtype=float)
-            except (ValueError, TypeError):
-                pass
+    interp = ida_csv if isinstance(ida_csv, IDAInterpolator) else IDAInterpolator(ida_csv)
+    if interp.bidir:
+        raise ValueError("interp_edp_from_ida 需要单向 IDA 结果，双向结果请使用 interp_edp_from_ida_bidir。")
+    return interp.edp(im_target, num_stories)
 
-    return drift_mat, accel_mat, res_arr, vel_mat, extra_dict
-
-
-# ── EDP 插值（双向） ───────────────────────────────────────────────────────────
 
 def interp_edp_from_ida_bidir(
-    ida_csv: Union[str, Path, pd.DataFrame],
-    im_target: float,
+    ida_csv: Union[str, Path, pd.DataFrame, IDAInterpolator],
+    im_target,
     num_stories: int,
 ):
     """从双向 IDA 结果中提取目标 IM 处的 X/Y 双向 EDP 样本。
 
+    ``im_target`` 可为多个 IM，此时各返回值增加第一维（目标 IM），见 :class:`IDAInterpolator`。
+
     Returns
     -------
     tuple
@@ -669,88 +1717,10 @@ def interp_edp_from_ida_bidir(
 
         各矩阵形状：drift ``(n, N)``；accel/vel ``(n, N+1)``；res ``(n,)``。
     """
-    N = int(num_stories)
-    if isinstance(ida_csv, pd.DataFrame):
-        df = ida_csv.copy()
-        for col in ['MaxDrift_X', 'MaxDrift_Y', 'MaxAbsAccel_X', 'MaxAbsAccel_Y',
-                    'MaxAbsVel_X', 'MaxAbsVel_Y']:
-            if col in df.columns:
-                df[col] = df[col].apply(
-                    lambda v: _parse_ida_array(v) if isinstance(v, str) else np.asarray(v, dtype=float))
-    else:
-        df = read_IDA_csv(ida_csv)
-
-    df['Iffinish'] = df['Iffinish'].astype(bool)
-    df = df.loc[df['Iffinish']].reset_index(drop=True)
-    if df.empty:
-        raise ValueError("双向 IDA 结果中没有收敛完成的记录。")
-
-    has_vel = 'MaxAbsVel_X' in df.columns
-
-    # 地面节点为强制要求：MaxAbsAccel 必须包含 N+1 个元素（index 0 = 地面 PGA）
-    if 'MaxAbsAccel_X' in df.columns:
-        _sample_accel = np.asarray(df.iloc[0]['MaxAbsAccel_X'], dtype=float)
-        if len(_sample_accel) < N + 1:
-            raise ValueError(
-                f"MaxAbsAccel_X 数组长度 {len(_sample_accel)}，需要包含地面节点（N+1={N + 1} 个元素），请检查 GeneralModelWrapper 版本。"
-            )
-
-    extra_bases = [c[:-2] for c in df.columns
-                   if c not in _STANDARD_COLS_2D and c.endswith('_X')]
-
-    dX, dY, aX, aY, rX, rY, vX, vY = [], [], [], [], [], [], [], []
-    eX = {b: [] for b in extra_bases}
-    eY = {b: [] for b in extra_bases}
-
-    df['_pair'] = df['EQRecord_X'].astype(str) + '|' + df['EQRecord_Y'].astype(str)
-    for _, rows in df.groupby('_pair', sort=False):
-        drift_x = np.asarray(_interp_ida_value(rows, im_target, 'MaxDrift_X'), dtype=float)[:N]
-        drift_y = np.asarray(_interp_ida_value(rows, im_target, 'MaxDrift_Y'), dtype=float)[:N]
-
-        ax_full = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsAccel_X'), dtype=float)
-        ay_full = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsAccel_Y'), dtype=float)
-        accel_x = ax_full[:N + 1] / 9800.0
-        accel_y = ay_full[:N + 1] / 9800.0
-
-        res_x = float(np.asarray(_interp_ida_value(rows, im_target, 'ResDrift_X'), dtype=float))
-        res_y = float(np.asarray(_interp_ida_value(rows, im_target, 'ResDrift_Y'), dtype=float))
-
-        if has_vel:
-            vx_raw = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsVel_X'), dtype=float)
-            vy_raw = np.asarray(_interp_ida_value(rows, im_target, 'MaxAbsVel_Y'), dtype=float)
-            vel_x = (vx_raw[:N + 1] if len(vx_raw) >= N + 1 else np.concatenate([[0.0], vx_raw[:N]])) / 1000.0
-            vel_y = (vy_raw[:N + 1] if len(vy_raw) >= N + 1 else np.concatenate([[0.0], vy_raw[:N]])) / 1000.0
-        else:
-            vel_x = vel_y = np.full(N + 1, 10.0)
-
-        dX.append(drift_x); dY.append(drift_y)
-        aX.append(accel_x); aY.append(accel_y)
-        rX.append(res_x);   rY.append(res_y)
-        vX.append(vel_x);   vY.append(vel_y)
-        for b in extra_bases:
-            if b + '_X' in rows.columns:
-                eX[b].append(np.asarray(_interp_ida_value(rows, im_target, b + '_X'), dtype=float))
-            if b + '_Y' in rows.columns:
-                eY[b].append(np.asarray(_interp_ida_value(rows, im_target, b + '_Y'), dtype=float))
-
-    clip = lambda arr: np.clip(np.array(arr, dtype=float), 1e-8, None)
-    drift_X, drift_Y = clip(dX), clip(dY)
-    accel_X, accel_Y = clip(aX), clip(aY)
-    res_X,   res_Y   = clip(rX), clip(rY)
-    vel_X,   vel_Y   = clip(vX), clip(vY)
-
-    def _build_extra(src):
-        out = {}
-        for k, vals in src.items():
-            if vals:
-                try:
-                    out[k] = np.array(vals, dtype=float)
-                except (ValueError, TypeError):
-                    pass
-        return out
-
-    return (drift_X, drift_Y, accel_X, accel_Y, res_X, res_Y,
-            vel_X, vel_Y, _build_extra(eX), _build_extra(eY))
+    interp = ida_csv if isinstance(ida_csv, IDAInterpolator) else IDAInterpolator(ida_csv)
+    if not interp.bidir:
+        raise ValueError("interp_edp_from_ida_bidir 需要双向 IDA 结果。")
+    return interp.edp(im_target, num_stories)
 
 
 # ── 双向结果转单向包络（供 Hazus 等单向模块使用） ─────────────────────────────
@@ -760,7 +1730,7 @@ def IDA_bidir_to_envelope(ida_csv: Union[str, Path]) -> pd.DataFrame:
 
     输出格式与单向 IDA 兼容，可直接传入 Hazus 损失评估函数。
     """
-    df = read_IDA_csv(ida_csv)
+    df = read_IDA(ida_csv)
 
     def _env(a, b):
         a_ = np.asarray(a, dtype=float)
@@ -781,51 +1751,189 @@ def IDA_bidir_to_envelope(ida_csv: Union[str, Path]) -> pd.DataFrame:
                                      row.get('MaxAbsVel_Y', np.array([])))),
             'ResDrift':    max(float(row['ResDrift_X']), float(row['ResDrift_Y'])),
             'Iffinish':    bool(row['Iffinish']),
+            'Collapsed':   bool(row.get('Collapsed', False)),
             'tCurrent':    float(row.get('tCurrent_X', 0.0)),
             'TotalTime':   float(row.get('TotalTime', 0.0)),
+            **({'Synthesized': bool(row['Synthesized']) if pd.notna(row['Synthesized']) else False}
+               if 'Synthesized' in df.columns else {}),
         })
     return pd.DataFrame(rows)
 
 
 # ── EDP 模拟（单向 IDA 结果） ─────────────────────────────────────────────────
 
+# 参与模拟的 EDP：各层最大层间位移角、各楼面（含地面）峰值绝对加速度、残余层间位移角
+_SIM_EDP_COLS = ('MaxDrift', 'MaxAbsAccel', 'ResDrift')
+
+
+class EDPSimulator:
+    """基于单向 IDA 结果的 EDP 蒙特卡洛模拟引擎（FEMA P-58 方法）。
+
+    构造时对样本数不少于 3 的每个 IM 级别估计 ln(EDP) 的均值向量与协方差矩阵；
+    :meth:`simulate` 在目标 IM 处按 ln(IM) 插值（规则同 :meth:`IDAAnalysis.interpMatrix`），
+    用 betaM 膨胀后协方差的特征分解生成相关的对数正态样本。各目标 IM 的分解结果缓存在实例上，
+    所有目标 IM 的标准正态数一次生成。随机数来自 ``np.random.Generator``，相同 ``seed`` 结果相同；
+    并行模拟时各任务应使用互不相关的种子，如 ``np.random.SeedSequence(s).spawn(n)``。
+    ``sampling='sobol'`` / ``'lhs'`` 时每个目标 IM 的样本为一组随机化的 Sobol 序列或拉丁超立方样本，
+    达到相同精度所需的样本数更少（见 :mod:`MDOFModel.utils.sampling`）。
+
+    Parameters
+    ----------
+    IDA_result : str, Path or pandas.DataFrame
+        单向 IDA 结果文件（CSV 或 NPZ）或 DataFrame，未收敛的行不参与统计。
+    betaM : float, default 0
+        模型不确定性（对数标准差），用于膨胀协方差。
+    per_story : bool, default True
+        ``True`` 时以各层 EDP 向量为联合分布的变量，保留楼层间的相关性；
+        ``False`` 时只用各 EDP 的最大值（3 个变量）。
+
+    Attributes
+    ----------
+    columns : list
+        变量名：``MaxDrift_1..N``、``MaxAbsAccel_0..N``（0 为地面）、``ResDrift``；
+        ``per_story=False`` 时为 ``MaxDrift``、``MaxAbsAccel``、``ResDrift``。
+    IM_levels : numpy.ndarray
+        参与统计的 IM 级别（升序）。
+    means : numpy.ndarray
+        ``(n_levels, n_var)``，各 IM 级别 ln(EDP) 的均值。
+    covs : numpy.ndarray
+        ``(n_levels, n_var, n_var)``，各 IM 级别 ln(EDP) 的协方差矩阵（未膨胀）。
+
+    Examples
+    --------
+    >>> sim = EDPSimulator('IDA_results.npz', betaM=0.25)
+    >>> IM, W = sim.simulate([0.2, 0.4, 0.6], 1000, seed=42)
+    >>> W.shape   # (3 × 1000, 变量数)
+    (3000, 8)
+    """
+
+    def __init__(self, IDA_result: Union[str, Path, pd.DataFrame], betaM: float = 0, per_story: bool = True):
+        if isinstance(IDA_result, pd.DataFrame):
+            IDA_result = IDAInterpolator._parse_str_cells(IDA_result)
+        scalars, matrices = read_IDA_matrices(IDA_result)
+        if 'EQRecord_X' in scalars.columns:
+            raise ValueError("EDP 模拟仅适用于单向 IDA 结果，双向结果请先用 IDA_bidir_to_envelope 转换。")
+        ok = scalars['Iffinish'].astype(bool).to_numpy()
+        self.betaM = betaM
+        self.per_story = per_story
+
+        blocks, self.columns = [], []
+        for col in _SIM_EDP_COLS:
+            mat = matrices[col][ok] if col in matrices else scalars[col].to_numpy(dtype=float)[ok, None]
+            if per_story and mat.shape[1] > 1:
+                first = 0 if col == 'MaxAbsAccel' else 1
+                self.columns += [f'{col}_{k + first}' for k in range(mat.shape[1])]
+                blocks.append(mat)
+            else:
+                self.columns.append(col)
+                blocks.append(np.nanmax(mat, axis=1, keepdims=True))
+        lnEDP = np.log(np.clip(np.concatenate(blocks, axis=1), 1e-8, None))
+
+        levels, inv, counts = np.unique(scalars['IM'].to_numpy(dtype=float)[ok], return_inverse=True, return_counts=True)
+        keep = np.flatnonzero(counts >= 3)
+        self.IM_levels = levels[keep]
+        n_var = len(self.columns)
+        self.means = np.empty((len(keep), n_var))
+        self.covs = np.empty((len(keep), n_var, n_var))
+        for i, j in enumerate(keep):
+            self.means[i] = lnEDP[inv == j].mean(axis=0)
+            self.covs[i] = np.cov(lnEDP[inv == j], rowvar=False)
+        self._factors = {}
+
+    def _factor(self, IM: float) -> tuple:
+        """目标 IM 处的 ``(ln 均值, 分解因子 L·sqrt(D))``，分解因子形状为 ``(n_var, 秩)``，结果缓存。"""
+        key = float(IM)
+        if key not in self._factors:
+            x, xp = math.log(key), list(np.log(self.IM_levels))
+            mean = IDAAnalysis.interpMatrix(x, xp, list(self.means))
+            cov = IDAAnalysis.interpMatrix(x, xp, list(self.covs), True)
+            n_var = cov.shape[0]
+            rank = np.linalg.matrix_rank(cov)
+
+            # 用认知不确定性 betaM 膨胀方差；方差为 0 的变量只保留 betaM
+            sigma = np.sqrt(np.diag(cov))
+            outer = np.outer(sigma, sigma)
+            R = np.divide(cov, outer, out=np.zeros_like(cov), where=outer > 0)
+            np.fill_diagonal(R, 1.0)
+            sigma2 = np.sqrt(sigma ** 2 + self.betaM ** 2)
+            D2, L = np.linalg.eigh(R * np.outer(sigma2, sigma2))   # 特征值升序
+            if rank < n_var:
+                L, D2 = L[:, n_var - rank:], D2[n_var - rank:]
+            D2 = np.where(D2 < 0, 1e-6, D2)
+            self._factors[key] = (mean, L * np.sqrt(D2))
+        return self._factors[key]
+
+    def simulate(self, IM_list, N_Sim, seed=None, sampling: str = 'random') -> Tuple[np.ndarray, np.ndarray]:
+        """在各目标 IM 下生成 EDP 样本。
+
+        Parameters
+        ----------
+        IM_list : float or list
+            目标 IM。
+        N_Sim : int or list[int]
+            每个目标 IM 的样本数（列表时与 ``IM_list`` 一一对应）。
+        seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+            随机数种子或生成器，``None`` 时取系统熵。
+        sampling : {'random', 'sobol', 'lhs'}, default 'random'
+            标准正态数的抽样方法；Sobol / LHS 按目标 IM 分组抽样并随机化。
+
+        Returns
+        -------
+        tuple
+            ``(IM, W)``：``IM`` 为 ``(n,)``，各样本对应的目标 IM；``W`` 为 ``(n, n_var)``，
+            线性空间的 EDP 样本，列顺序同 :attr:`columns`。
+        """
+        IM_arr = np.atleast_1d(np.asarray(IM_list, dtype=float))
+        counts = np.broadcast_to(np.asarray(N_Sim, dtype=np.int64), IM_arr.shape)
+        IM_rep = np.repeat(IM_arr, counts)
+        W = np.empty((len(IM_rep), len(self.columns)))
+        if not len(self.IM_levels) or not len(IM_rep):
+            return IM_rep[:0], W[:0]
+
+        rng = np.random.default_rng(seed)
+        U = rng.standard_normal(W.shape) if sampling == 'random' else None
+        start = 0
+        for IM, n in zip(IM_arr, counts):
+            mean, F = self._factor(IM)
+            seg = slice(start, start + n)
+            U_seg = U[seg, :F.shape[1]] if U is not None else normal_samples(n, F.shape[1], sampling, rng)
+            np.matmul(U_seg, F.T, out=W[seg])
+            W[seg] += mean
+            start += n
+        np.exp(W, out=W)
+        return IM_rep, W
+
+
 def SimulateEDPGivenIM(
-    IDA_result: pd.DataFrame, IM_list: list, N_Sim, betaM: float = 0
+    IDA_result: Union[str, Path, pd.DataFrame], IM_list: list, N_Sim, betaM: float = 0,
+    seed=None, per_story: bool = True, sampling: str = 'random',
 ) -> pd.DataFrame:
-    """基于单向 IDA 结果，在指定 IM 条件下蒙特卡洛模拟 EDP 样本。"""
-    SimEDP = pd.DataFrame({'IM': [], 'MaxDrift': [], 'MaxAbsAccel': [], 'ResDrift': []})
-
-    N_Sim_list = [N_Sim] * len(IM_list) if isinstance(N_Sim, int) else N_Sim
-    c = Counter(IDA_result['IM'].values.tolist())
-    IM_avail = [k for k, v in c.items() if v >= 3]
-    if not IM_avail:
-        return SimEDP
-
-    sub = IDA_result[['IM', 'MaxDrift', 'MaxAbsAccel', 'ResDrift']].copy()
-    for i in range(sub.shape[0]):
-        for j in range(sub.shape[1]):
-            sub.iat[i, j] = np.array(sub.iloc[i, j]).max()
-
-    means, covs = [], []
-    for im in IM_avail:
-        EDPs = sub.drop(columns=['IM'])[sub['IM'] == im].values.astype(float)
-        _, m, cov, _, _, _ = IDAAnalysis.FEMACodeSimulatingEDP(EDPs, betaM, 10)
-        means.append(m)
-        covs.append(cov)
-
-    for im, N in zip(IM_list, N_Sim_list):
-        m   = IDAAnalysis.interpMatrix(math.log(im),  [math.log(i) for i in IM_avail], means)
-        cov = IDAAnalysis.interpMatrix(math.log(im),  [math.log(i) for i in IM_avail], covs, True)
-        N_real = max(N, 10)
-        W, _, _, _ = IDAAnalysis.FEMACodeSimulatingEDPGivenlnMeanlncov(m, cov, betaM, N_real)
-        W = W[:N, :]
-        block = pd.DataFrame(
-            np.concatenate([np.full((N, 1), im), W], axis=1),
-            columns=['IM', 'MaxDrift', 'MaxAbsAccel', 'ResDrift'],
-        )
-        SimEDP = pd.concat([SimEDP, block], ignore_index=True)
-
-    return SimEDP
+    """基于单向 IDA 结果，在指定 IM 条件下蒙特卡洛模拟 EDP 样本（见 :class:`EDPSimulator`）。
+
+    Parameters
+    ----------
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        随机数种子或生成器；给定整数时结果可复现。
+    per_story : bool, default True
+        按各层 EDP 向量联合模拟；``False`` 时只模拟各 EDP 的最大值。
+    sampling : {'random', 'sobol', 'lhs'}, default 'random'
+        抽样方法，见 :meth:`EDPSimulator.simulate`。
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``IM``、``MaxDrift``、``MaxAbsAccel``、``ResDrift`` 列为各样本的 EDP 最大值；
+        ``per_story=True`` 时另有各层列 ``MaxDrift_1..N``、``MaxAbsAccel_0..N``。
+    """
+    sim = EDPSimulator(IDA_result, betaM, per_story)
+    IM, W = sim.simulate(IM_list, N_Sim, seed, sampling)
+    data = {'IM': IM}
+    for col in _SIM_EDP_COLS:
+        idx = [i for i, c in enumerate(sim.columns) if c == col or c.startswith(col + '_')]
+        data[col] = W[:, idx].max(axis=1) if len(idx) > 1 else W[:, idx[0]]
+    if per_story:
+        data.update((c, W[:, i]) for i, c in enumerate(sim.columns) if c not in data)
+    return pd.DataFrame(data)
 
 
 # ── 高级接口封装类 ─────────────────────────────────────────────────────────────
@@ -868,6 +1976,10 @@ class IDAAnalysis:
         ExtraEDP: dict = None,
         output_csv: Union[str, Path] = None,
         restart: bool = False,
+        HuntFill: dict = None,
+        MaxTasksPerChild: int = 500,
+        Executor: IDAExecutor = None,
+        CollapseSkip: dict = None,
     ) -> pd.DataFrame:
         """执行 IDA 分析并保存结果。
 
@@ -882,10 +1994,19 @@ class IDAAnalysis:
             实现无感断点续算；``restart=True`` 则忽略已有文件从头重算。
         restart : bool, default False
             ``True`` 时强制从头重算，忽略 ``output_csv`` 中的已有结果。
+        HuntFill : dict, optional
+            提供时改用自适应 IM 追踪（hunt & fill），``IM_list`` 不再使用，见 :func:`IDA_f`。
+        MaxTasksPerChild : int or None, default 500
+            工作进程的任务数上限，见 :func:`IDA_f`。
+        Executor : IDAExecutor, optional
+            任务执行器（串行、本机进程池、concurrent.futures 或 MPI），见 :func:`IDA_f`。
+        CollapseSkip : dict, optional
+            启用倒塌后跳过更高 IM（可为空字典），见 :func:`IDA_f`。
         """
         if period is None:
             period = float(self.FEModel.T1)
-        self.IDA_result = IDA_f(self.FEModel, IM_list, period, records, DeltaT, NumPool, ExtraEDP, output_csv, restart)
+        self.IDA_result = IDA_f(self.FEModel, IM_list, period, records, DeltaT, NumPool, ExtraEDP, output_csv, restart, HuntFill,
+                               MaxTasksPerChild, Executor, CollapseSkip)
         return self.IDA_result
 
     def SaveToCSV(self, csv_file: Union[str, Path]) -> None:
@@ -894,6 +2015,12 @@ class IDAAnalysis:
             raise RuntimeError("尚未执行分析，请先调用 Analyze()。")
         self.IDA_result.to_csv(Path(csv_file), index=False, encoding='utf-8-sig')
 
+    def SaveToNPZ(self, npz_file: Union[str, Path], compressed: bool = False) -> None:
+        """将分析结果保存为列式 NPZ 文件（见 :func:`write_IDA_npz`）。"""
+        if self.IDA_result is None:
+            raise RuntimeError("尚未执行分析，请先调用 Analyze()。")
+        write_IDA_npz(self.IDA_result, npz_file, compressed)
+
     @staticmethod
     def plot_IDA_results(
         IDA_result: Union[str, Path, pd.DataFrame],
@@ -903,9 +2030,10 @@ class IDAAnalysis:
         """绘制 IDA 曲线（自动识别单向/双向）。"""
         return plot_IDA(IDA_result, Stat=Stat, FigName=FigName)
 
-    def SimulateEDPGivenIM(self, IM_list: list, N_Sim, betaM: float = 0) -> pd.DataFrame:
-        """在指定 IM 级别下模拟 EDP 样本（仅适用于单向 IDA 结果）。"""
-        return SimulateEDPGivenIM(self.IDA_result, IM_list, N_Sim, betaM)
+    def SimulateEDPGivenIM(self, IM_list: list, N_Sim, betaM: float = 0,
+                           seed=None, per_story: bool = True, sampling: str = 'random') -> pd.DataFrame:
+        """在指定 IM 级别下模拟 EDP 样本（仅适用于单向 IDA 结果），见 :func:`SimulateEDPGivenIM`。"""
+        return SimulateEDPGivenIM(self.IDA_result, IM_list, N_Sim, betaM, seed, per_story, sampling)
 
     # ── 统计工具（用于 EDP 模拟） ──────────────────────────────────────────────
 
@@ -924,8 +2052,8 @@ class IDAAnalysis:
         return Y
 
     @staticmethod
-    def FEMACodeSimulatingEDP(EDPs: np.ndarray, betaM: float, num_realization):
-        """由 EDP 样本估计对数正态参数并生成模拟样本。
+    def FEMACodeSimulatingEDP(EDPs: np.ndarray, betaM: float, num_realization, rng=None, sampling: str = 'random'):
+        """由 EDP 样本估计对数正态参数并生成模拟样本（``rng``、``sampling`` 见 :meth:`FEMACodeSimulatingEDPGivenlnMeanlncov`）。
 
         Returns
         -------
@@ -937,15 +2065,18 @@ class IDAAnalysis:
         lnEDPs_mean = np.mean(lnEDPs, 0)[:, np.newaxis]
         lnEDPs_cov  = np.cov(np.transpose(lnEDPs))
         W, R, ratio_mean, ratio_cov = IDAAnalysis.FEMACodeSimulatingEDPGivenlnMeanlncov(
-            lnEDPs_mean, lnEDPs_cov, betaM, num_realization)
+            lnEDPs_mean, lnEDPs_cov, betaM, num_realization, rng, sampling)
         return W, lnEDPs_mean, lnEDPs_cov, R, ratio_mean, ratio_cov
 
     @staticmethod
     def FEMACodeSimulatingEDPGivenlnMeanlncov(
-        lnEDPs_mean, lnEDPs_cov, betaM, num_realization
+        lnEDPs_mean, lnEDPs_cov, betaM, num_realization, rng=None, sampling: str = 'random'
     ):
         """由对数空间均值和协方差矩阵生成 EDP 模拟样本（FEMA 方法）。
 
+        ``rng`` 为 ``np.random.Generator``，``None`` 时使用全局 ``np.random`` 状态；
+        ``sampling`` 为 ``'sobol'`` / ``'lhs'`` 时改用随机化的准蒙特卡洛抽样（见 :mod:`MDOFModel.utils.sampling`）。
+
         Returns
         -------
         tuple
@@ -970,7 +2101,11 @@ class IDAAnalysis:
 
         D2[D2 < 0] = 1e-6
         D_diag = np.diag(np.sqrt(D2))
-        U      = np.random.normal(size=(rank if rank < num_var else num_var, num_realization))
+        num_dim = rank if rank < num_var else num_var
+        if sampling == 'random':
+            U = (np.random if rng is None else rng).normal(size=(num_dim, num_realization))
+        else:
+            U = normal_samples(num_realization, num_dim, sampling, rng).T
         Z      = (L @ D_diag) @ U + lnEDPs_mean @ np.ones((1, num_realization))
 
         ratio_mean = np.mean(Z, 1) / lnEDPs_mean.T
@@ -1,60 +1,116 @@
+import io
 import os
+import re
+from collections import OrderedDict
 
-def ReadRecord(inFilename, outFilename):
-    # 查找 inFilename。若文件扩展名为 .at2，调用 ReadRecord_PEER；
-    # 若为 .txt（第1列为时间，第2列为加速度），调用 ReadRecord_TXT。
+import numpy as np
+
+from ..utils.record_library import RecordLibrary
+from ..utils.record_utils import trim_record
+
+# 进程内已解析记录的缓存：文件路径 -> ((大小, 修改时间), dt, accel)。
+# IDA 中同一条记录会在多个 IM 下反复分析，只需解析一次。
+_RECORD_CACHE = OrderedDict()
+_RECORD_CACHE_SIZE = 64
+
+# 旧版 SMD 文件头：NPTS=  3930, DT= .00500 SEC
+_SMD_HEADER = re.compile(r'NPTS=\s*(\d+)\s*,?\s*DT=\s*([-+0-9.EeDd]+)', re.IGNORECASE)
+
+
+def FindRecordFile(inFilename):
+    # 查找 inFilename 对应的记录文件：先 .at2，后 .txt；都不存在时返回 None。
     #
     # 参数:
     #   inFilename: 不含扩展名的文件路径
-    #   outFilename: 输出文件路径，扩展名为 '.dat'
-    if os.path.exists(inFilename + '.at2'):
-        dt, npts = ReadRecord_PEER (inFilename + '.at2', outFilename)
-    elif os.path.exists(inFilename + '.txt'):
-        dt, npts = ReadRecord_TXT (inFilename + '.txt', outFilename)
+    for ext in ('.at2', '.txt'):
+        if os.path.exists(str(inFilename) + ext):
+            return str(inFilename) + ext
+    return None
+
+
+def LoadRecord(inFilename):
+    # 读取地震动记录，直接返回 (dt, accel)，不写任何中间文件。
+    # 记录所在目录已打包为记录库（见 utils.record_library.RecordLibrary）且该记录的源文件
+    # 未变化时，直接返回内存映射数组的切片，不解析文本；否则按 ReadRecord 的规则查找文件，
+    # 文件大小与修改时间不变时，同一进程内只解析一次。
+    #
+    # 参数:
+    #   inFilename: 不含扩展名的文件路径
+    # 返回值:
+    #   dt    -- 时间步长 (s)
+    #   accel -- 加速度时程 (g)，只读的 numpy 数组，需修改时请先 copy()
+    # 异常:
+    #   FileNotFoundError -- 找不到 .at2 / .txt 文件
+    #   ValueError        -- 文件中解析不出有效的 dt 或加速度时程
+    head, name = os.path.split(str(inFilename))
+    library = RecordLibrary.open(head or '.')
+    if library is not None and name in library and library.is_current(name):
+        return library.record(name)
+
+    path = FindRecordFile(inFilename)
+    if path is None:
+        raise FileNotFoundError(f"找不到地震动记录文件：{inFilename}(.at2/.txt)")
+
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    key = os.path.abspath(path)
+    cached = _RECORD_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        _RECORD_CACHE.move_to_end(key)
+        return cached[1], cached[2]
+
+    if path.endswith('.at2'):
+        dt, accel = LoadRecord_PEER(path)
     else:
-        print('ERROR: Cant find record file!')
-        dt = None
-        npts = None
-    return dt, npts
+        dt, accel = LoadRecord_TXT(path)
+    if not dt > 0 or accel.size == 0:
+        raise ValueError(f"无法从 {path} 解析出加速度时程（dt={dt}，{accel.size} 个点）。")
 
-def ReadRecord_TXT (inFilename, outFilename):
-    
-    inFileID = open(inFilename, 'r')
-    outFileID = open(outFilename, 'w')
-
-    time_1 = 0.0
-    time_2 = 0.0
-    npts=0
-    for line in inFileID:
-        if line == '\n':
-            continue
-        else:
-            words = str.replace(line,',',' ').split()
-            lengthLine = len(words)
-            if lengthLine == 2:
-                npts+=1
-                if npts==1:
-                    time_1=float(words[0])
-                elif npts==2:
-                    time_2=float(words[0])
-                outFileID.write(words[1])
-                outFileID.write('\n')
-    dt = time_2 - time_1
-    
-    inFileID.close()
-    outFileID.close()
-
-    return dt, npts
+    accel.flags.writeable = False
+    _RECORD_CACHE[key] = (stamp, dt, accel)
+    if len(_RECORD_CACHE) > _RECORD_CACHE_SIZE:
+        _RECORD_CACHE.popitem(last=False)
+    return dt, accel
 
-def ReadRecord_PEER (inFilename, outFilename):
-    # 从 PEER 强震数据库的地震动记录文件中提取时间步长，并将加速度数据写入输出文件。
+
+def LoadRecordTrimmed(inFilename, Trim=None, period=None):
+    # 读取地震动记录，并按累积 Arias 强度截取主要部分、末尾补自由振动段（见 record_utils.trim_record）。
     #
-    # 形式参数:
-    #   inFilename  -- 包含 PEER 强震记录的输入文件
-    #   outFilename -- 输出文件，供 OpenSees 读取
+    # 参数:
+    #   inFilename: 不含扩展名的文件路径
+    #   Trim:       trim_record 的关键字参数字典，如 {'start': 0.001, 'end': 0.999, 'taper': 0.5}；
+    #               {} 表示全部取默认值，None 表示不截取
+    #   period:     结构基本周期 (s)，用于自动确定补零时长
     # 返回值:
-    #   dt   -- 由文件头确定的时间步长
-    #   nPts -- 由文件头确定的数据点数
+    #   dt, accel, info -- info 为截取信息字典（不截取时为空字典）
+    dt, accel = LoadRecord(inFilename)
+    if Trim is None:
+        return dt, accel, {}
+    accel, info = trim_record(accel, dt, **{'period': period, **Trim})
+    return dt, accel, info
+
+
+def LoadRecord_TXT(inFilename):
+    # 读取两列（时间, 加速度）文本记录，分隔符为空白或逗号，返回 (dt, accel)。
+    # dt 取前两个时间点之差。整个文件一次性交给 numpy 解析；
+    # 若存在非两列的行（如文件头），退回逐行筛选，只保留恰好两列的行。
+    with open(inFilename, 'r') as f:
+        text = f.read().replace(',', ' ')
+    try:
+        data = np.loadtxt(io.StringIO(text), dtype=float, ndmin=2)
+        if data.shape[1] != 2:
+            raise ValueError
+    except ValueError:
+        rows = [words for words in (line.split() for line in text.splitlines()) if len(words) == 2]
+        data = np.array(rows, dtype=float).reshape(-1, 2)
+
+    dt = float(data[1, 0] - data[0, 0]) if len(data) >= 2 else 0.0
+    return dt, np.ascontiguousarray(data[:, 1])
+
+
+def LoadRecord_PEER(inFilename):
+    # 读取 PEER 强震数据库的记录文件，返回 (dt, accel)。
+    # 文件头逐行解析，文件头之后的加速度数据一次性交给 numpy 解析。
     #
     # 支持的文件头格式（以下两种之一）：
     #  1) 新版 NGA 格式
@@ -68,73 +124,72 @@ def ReadRecord_PEER (inFilename, outFilename):
     #	  IMPERIAL VALLEY 10/15/79 2319, EL CENTRO ARRAY 6, 230
     #	  ACCELERATION TIME HISTORY IN UNITS OF G
     #	  NPTS=  3930, DT= .00500 SEC
+    #
+    # 文件头中找不到 dt 时返回 dt = 0.0 和空数组。
+    with open(inFilename, 'r') as f:
+        text = f.read()
 
     dt = 0.0
     npts = 0
-    
-    # 打开输入文件
-    inFileID = open(inFilename, 'r')
-    
-    # 打开输出文件
-    outFileID = open(outFilename, 'w')
-	
-    # 标志位：已找到 dt 后开始读取加速度数据（假设 dt 在文件头最后一行）
-    flag = 0
-	
-    # 逐行读取
-    for line in inFileID:
-        if line == '\n':
-            # 空行，跳过
+    pos = 0
+    while pos < len(text):
+        end = text.find('\n', pos)
+        end = len(text) if end < 0 else end + 1
+        words = text[pos:end].split()
+        pos = end
+        if len(words) < 4:
             continue
-        elif flag == 1:
-            # 将加速度数据写入输出文件
-            outFileID.write(line)
-        else:
-            # 在文件头中查找 dt
-            words = line.split()
-            lengthLine = len(words)
-
-            if lengthLine >= 4:
-
-                if words[0] == 'NPTS=':
-                    # 旧版 SMD 格式
-                    for word in words:
-                        if word != '':
-                            # 读取时间步长
-                            if flag == 1:
-                                dt = float(word)
-                                break
-
-                            if flag == 2:
-                                npts = int(word.strip(','))
-                                flag = 0
-
-                            # 找到目标关键词并设置标志位
-                            if word == 'DT=' or word == 'dt':
-                                flag = 1
-
-                            if word == 'NPTS=':
-                                flag = 2
-                        
-                    
-                elif words[-1] == 'DT':
-                    # 新版 NGA 格式
-                    count = 0
-                    for word in words:
-                        if word != '':
-                            if count == 0:
-                                npts = int(word)
-                            elif count == 1:
-                                dt = float(word)
-                            elif word == 'DT':
-                                flag = 1
-                                break
-
-                            count += 1
-
-                        
-
-    inFileID.close()
-    outFileID.close()
-
-    return dt, npts
+        if words[0].upper() == 'NPTS=':
+            match = _SMD_HEADER.search(' '.join(words))
+            if match:
+                npts = int(match.group(1))
+                dt = float(match.group(2).replace('D', 'E').replace('d', 'e'))
+                break
+        elif words[-1].upper() == 'DT':
+            npts = int(words[0])
+            dt = float(words[1].rstrip(','))
+            break
+    else:
+        return 0.0, np.zeros(0)
+
+    accel = np.array(text[pos:].split(), dtype=float)
+    if 0 < npts < accel.size:
+        accel = accel[:npts]
+    return dt, accel
+
+
+def WriteRecord(accel, outFilename):
+    # 将加速度时程写成每行一个数的文本文件，供 OpenSees 的 Path 时程 -filePath 读取。
+    np.savetxt(outFilename, np.asarray(accel, dtype=float), fmt='%.10g')
+
+
+def ReadRecord(inFilename, outFilename):
+    # 查找 inFilename。若文件扩展名为 .at2，按 PEER 格式读取；
+    # 若为 .txt（第1列为时间，第2列为加速度），按两列文本读取。
+    # 加速度时程写入 outFilename，供需要文件输入的 OpenSees 命令使用；
+    # 只需要数组时请直接调用 LoadRecord。
+    #
+    # 参数:
+    #   inFilename: 不含扩展名的文件路径
+    #   outFilename: 输出文件路径，扩展名为 '.dat'
+    try:
+        dt, accel = LoadRecord(inFilename)
+    except FileNotFoundError:
+        print('ERROR: Cant find record file!')
+        return None, None
+    WriteRecord(accel, outFilename)
+    return dt, accel.size
+
+
+def ReadRecord_TXT (inFilename, outFilename):
+    # 读取两列文本记录并写出 .dat 文件，返回 (dt, npts)
+    dt, accel = LoadRecord_TXT(inFilename)
+    WriteRecord(accel, outFilename)
+    return dt, accel.size
+
+
+def ReadRecord_PEER (inFilename, outFilename):
+    # 读取 PEER 格式记录并写出 .dat 文件，返回 (dt, npts)
+    dt, accel = LoadRecord_PEER(inFilename)
+    WriteRecord(accel, outFilename)
+    return dt, accel.size
@@ -7,14 +7,17 @@
 from pathlib import Path
 from operator import index
 import numpy as np
-import random
 from numpy import log
 import pandas as pd
-import statistics as sta
+from scipy.special import ndtr
+
+from ..utils.sampling import uniform_samples
 
 class BldLossAssessment:
 
     __DS_type = ['Slight', 'Moderate', 'Extensive', 'Complete']
+    # 破坏状态编号 0~4 对应的标签，0 为无破坏
+    _DS_LABELS = np.array(['None'] + __DS_type, dtype=object)
 
     # input parameters
     NumOfStories = 0
@@ -23,11 +26,12 @@ class BldLossAssessment:
     SeismicDesignLevel = 'moderate-code' # 'high-code', 'moderate-code', 'low-code'
     OccupancyClass = 'UNKNOWN'
 
-    ## 评估结果
-    # 破坏状态
-    DS_Struct = ['UNKNOWN'] # None/'Slight'/'Moderate'/'Extensive'/'Complete'
-    DS_NonStruct_DriftSen = ['UNKNOWN']
-    DS_NonStruct_AccelSen = ['UNKNOWN']
+    ## 评估结果（LossAssessment 之后均为与输入等长的 numpy 数组）
+    # 破坏状态编号（int8）：0 - None, 1 - Slight, 2 - Moderate, 3 - Extensive, 4 - Complete
+    # 字符串标签见 DS_Struct 等属性，访问时才生成
+    DS_Struct_idx = None
+    DS_NonStruct_DriftSen_idx = None
+    DS_NonStruct_AccelSen_idx = None
     # 修复费用
     RepairCost_Total = ['UNKNOWN']
     RepairCost_Struct = ['UNKNOWN']
@@ -132,19 +136,45 @@ class BldLossAssessment:
         self.__Read_RepairTime_DS()
         self.__Read_IDR_Accel_thresholds_DS()
 
-    def LossAssessment(self,MaxDriftRatio,MaxAbsAccel, MaxRIDR = 'none'):
+    def LossAssessment(self,MaxDriftRatio,MaxAbsAccel, MaxRIDR = 'none', Sampling = 'random', seed = None):
         # 参数:
-        # MaxDriftRatio - 最大层间位移角，列表[]，多次分析时为向量。
-        # MaxAbsAccel   - 最大绝对加速度（g），列表[]。
-        # MaxRIDR       - 最大残余层间位移角，列表[]。
+        # MaxDriftRatio - 最大层间位移角，列表[] 或 numpy 数组，多次分析时为向量。
+        # MaxAbsAccel   - 最大绝对加速度（g），列表[] 或 numpy 数组。
+        # MaxRIDR       - 最大残余层间位移角，列表[] 或 numpy 数组。
+        # Sampling      - 破坏状态抽样方法：'random'（伪随机）、'sobol' 或 'lhs'（随机化的准蒙特卡洛），
+        #                 见 MDOFModel.utils.sampling。
+        # seed          - 随机数种子或 np.random.Generator，给定时结果可复现。
+        #                 改用 np.random.Generator 后，同一种子得到的破坏状态与旧版本（random 模块逐次抽样）
+        #                 不再逐次相同，二者仅在统计上等价。
 
         if len(MaxDriftRatio)==0 or len(MaxAbsAccel)==0:
             return
 
-        self.__Estimate_DamageState(MaxDriftRatio,MaxAbsAccel,MaxRIDR)
+        # 全部实现一次向量化计算，结果（破坏状态编号、费用、时间）均为 numpy 数组
+        self.__Estimate_DamageState(MaxDriftRatio,MaxAbsAccel,MaxRIDR,Sampling,seed)
         self.__Estimate_RepairCost()
         self.__Estimate_RepairTime()
 
+    @classmethod
+    def DS_Labels(cls, DS_idx):
+        # 破坏状态编号数组转为字符串标签列表，如 [0, 2] -> ['None', 'Moderate']
+        if DS_idx is None:
+            return ['UNKNOWN']
+        return cls._DS_LABELS[np.asarray(DS_idx)].tolist()
+
+    @property
+    def DS_Struct(self):
+        # 结构破坏状态标签：None/'Slight'/'Moderate'/'Extensive'/'Complete'
+        return self.DS_Labels(self.DS_Struct_idx)
+
+    @property
+    def DS_NonStruct_DriftSen(self):
+        return self.DS_Labels(self.DS_NonStruct_DriftSen_idx)
+
+    @property
+    def DS_NonStruct_AccelSen(self):
+        return self.DS_Labels(self.DS_NonStruct_AccelSen_idx)
+
     def __Read_StructuralType(self,StructuralType):
         rownames = self._HazusInventoryTable4_2.index.to_list()
         rownames_NO_LMH = rownames.copy()
@@ -237,108 +267,54 @@ class BldLossAssessment:
         self.Beta_Accel_NonStruct_DS = HazusTable5_12.loc[self.SeismicDesignLevel,('Beta')].values.tolist()
         self.Beta_Accel_NonStruct_DS = [self.Beta_Accel_NonStruct_DS[i] for i in sorted_indices]
         
-    def __Estimate_DamageState(self,MaxDriftRatio,MaxAbsAccel,MaxRIDR):
-
-        # 正态分布对象
-        nd_DS_Struct = []
-        for a, b in zip(self.Median_IDR_Struct_DS,self.Beta_IDR_Struct_DS):
-            nd_DS_Struct.append(sta.NormalDist(log(a),b))
-        nd_DS_NonStruct_Drift = []
-        for a, b in zip(self.Median_IDR_NonStruct_DS,self.Beta_IDR_NonStruct_DS):
-            nd_DS_NonStruct_Drift.append(sta.NormalDist(log(a),b))
-        nd_DS_NonStruct_Accel = []
-        for a, b in zip(self.Median_Accel_NonStruct_DS,self.Beta_Accel_NonStruct_DS):
-            nd_DS_NonStruct_Accel.append(sta.NormalDist(log(a),b))
-        
-        if not ((self.Median_RIDR ==0) or (MaxRIDR=='none')):
-            nd_irrepairable = sta.NormalDist(log(self.Median_RIDR),self.Beta_RIDR)
-
-        self.DS_Struct = ['None'] * len(MaxDriftRatio)
-        self.DS_NonStruct_DriftSen = ['None']* len(MaxDriftRatio)
-        self.DS_NonStruct_AccelSen = ['None']* len(MaxDriftRatio)
-        i = 0
-        for d, a in zip(MaxDriftRatio, MaxAbsAccel):
-            # damage states
-
-            # irrepairable
-            if not ((self.Median_RIDR ==0) or (MaxRIDR=='none')):
-                assert isinstance(MaxRIDR,list)
-                assert len(MaxRIDR)==len(MaxDriftRatio)
-
-                P_irrepairable = nd_irrepairable.cdf(log(MaxRIDR[i]))
-                if random.random()<=P_irrepairable:
-                    # irrepairable
-                    self.DS_Struct[i] = self.__DS_type[-1]
-                    self.DS_NonStruct_DriftSen[i] = self.__DS_type[-1]
-                    self.DS_NonStruct_AccelSen[i] = self.__DS_type[-1]
-
-                    i+=1
-                    continue
-
-            # repairable
-            P_DS_Struct = [nd.cdf(log(d)) for nd in nd_DS_Struct]
-            P_DS_NonStruct_Drift = [nd.cdf(log(d)) for nd in nd_DS_NonStruct_Drift]
-            P_DS_NonStruct_Accel = [nd.cdf(log(a)) for nd in nd_DS_NonStruct_Accel]
-
-            ind = np.nonzero(np.array(P_DS_Struct)>=random.random())[0]
-            if ind.size>0:
-                self.DS_Struct[i] = self.__DS_type[ind[-1]]
-
-            ind = np.nonzero(np.array(P_DS_NonStruct_Drift)>=random.random())[0]
-            if ind.size>0:
-                self.DS_NonStruct_DriftSen[i] = self.__DS_type[ind[-1]]
-
-            ind = np.nonzero(np.array(P_DS_NonStruct_Accel)>=random.random())[0]
-            if ind.size>0:
-                self.DS_NonStruct_AccelSen[i] = self.__DS_type[ind[-1]]
-
-            i+=1
+    @staticmethod
+    def __Sample_DS(lnEDP,Median_DS,Beta_DS,u):
+        # 一次计算全部实现、全部破坏状态的易损性 CDF 矩阵 (n, 4)，
+        # 破坏状态取 CDF >= u 的最后一个编号（1~4），都不满足时为 0
+        P = ndtr((lnEDP[:,None]-log(np.asarray(Median_DS,dtype=float)))/np.asarray(Beta_DS,dtype=float))
+        exceed = P>=u[:,None]
+        n_DS = exceed.shape[1]
+        return np.where(exceed.any(axis=1), n_DS-np.argmax(exceed[:,::-1],axis=1), 0).astype(np.int8)
+
+    def __Estimate_DamageState(self,MaxDriftRatio,MaxAbsAccel,MaxRIDR,Sampling='random',seed=None):
+
+        with np.errstate(divide='ignore'):
+            lnD = log(np.asarray(MaxDriftRatio,dtype=float))
+            lnA = log(np.asarray(MaxAbsAccel,dtype=float))
+
+        # 每次实现 4 个均匀随机数：不可修复、结构、位移敏感非结构、加速度敏感非结构
+        u = uniform_samples(len(lnD), 4, Sampling, seed)
+
+        # repairable
+        self.DS_Struct_idx = self.__Sample_DS(lnD,self.Median_IDR_Struct_DS,self.Beta_IDR_Struct_DS,u[:,1])
+        self.DS_NonStruct_DriftSen_idx = self.__Sample_DS(lnD,self.Median_IDR_NonStruct_DS,self.Beta_IDR_NonStruct_DS,u[:,2])
+        self.DS_NonStruct_AccelSen_idx = self.__Sample_DS(lnA,self.Median_Accel_NonStruct_DS,self.Beta_Accel_NonStruct_DS,u[:,3])
+
+        # irrepairable：残余位移角超过阈值时三类构件均为 Complete
+        if not ((self.Median_RIDR ==0) or isinstance(MaxRIDR,str)):
+            assert len(MaxRIDR)==len(lnD)
+            with np.errstate(divide='ignore'):
+                lnR = log(np.asarray(MaxRIDR,dtype=float))
+            irrepairable = u[:,0]<=ndtr((lnR-log(self.Median_RIDR))/self.Beta_RIDR)
+            for DS in (self.DS_Struct_idx,self.DS_NonStruct_DriftSen_idx,self.DS_NonStruct_AccelSen_idx):
+                DS[irrepairable] = len(self.__DS_type)
 
     def __Estimate_RepairCost(self):
-        # 基于破坏状态计算修复费用
-        self.RepairCost_Struct = [0]*len(self.DS_Struct)
-        self.RepairCost_NonStruct_DriftSen = [0]*len(self.DS_Struct)
-        self.RepairCost_NonStruct_AccelSen = [0]*len(self.DS_Struct)
-        self.RepairCost_Total = [0]*len(self.DS_Struct)
-        i=0
-        for ds1,ds2,ds3 in zip(self.DS_Struct,self.DS_NonStruct_DriftSen,self.DS_NonStruct_AccelSen):
-
-            if ds1 in self.__DS_type:
-                ind = self.__DS_type.index(ds1) 
-                self.RepairCost_Struct[i] = self.StructureRCRatio_DS[ind]*self.StructureReplacementCost
-            else:
-                self.RepairCost_Struct[i] = 0
-
-            if ds2 in self.__DS_type:
-                ind = self.__DS_type.index(ds2) 
-                self.RepairCost_NonStruct_DriftSen[i] = \
-                    self.DriftSenNonstructRCRatio_DS[ind]*self.StructureReplacementCost
-            else:
-                self.RepairCost_NonStruct_DriftSen[i] = 0
-
-            if ds3 in self.__DS_type:
-                ind = self.__DS_type.index(ds3) 
-                self.RepairCost_NonStruct_AccelSen[i] = \
-                    self.AccelSenNonstructRCRatio_DS[ind]*self.StructureReplacementCost \
-                    + self.ContentsRCRatio_DS[ind]*self.StructureReplacementCost
-            else:
-                self.RepairCost_NonStruct_AccelSen[i] = 0
-
-            self.RepairCost_Total[i] = self.RepairCost_Struct[i] + \
-                self.RepairCost_NonStruct_DriftSen[i] + \
-                self.RepairCost_NonStruct_AccelSen[i]
-
-            i+=1
+        # 基于破坏状态编号查表计算修复费用（编号 0 对应费用 0）
+        RC_Struct = np.r_[0.0,self.StructureRCRatio_DS]*self.StructureReplacementCost
+        RC_DriftSen = np.r_[0.0,self.DriftSenNonstructRCRatio_DS]*self.StructureReplacementCost
+        RC_AccelSen = (np.r_[0.0,self.AccelSenNonstructRCRatio_DS]+np.r_[0.0,self.ContentsRCRatio_DS]) \
+            *self.StructureReplacementCost
+        self.RepairCost_Struct = RC_Struct[self.DS_Struct_idx]
+        self.RepairCost_NonStruct_DriftSen = RC_DriftSen[self.DS_NonStruct_DriftSen_idx]
+        self.RepairCost_NonStruct_AccelSen = RC_AccelSen[self.DS_NonStruct_AccelSen_idx]
+        self.RepairCost_Total = self.RepairCost_Struct + \
+            self.RepairCost_NonStruct_DriftSen + \
+            self.RepairCost_NonStruct_AccelSen
 
     def __Estimate_RepairTime(self):
-        self.RepairTime = [0]*len(self.DS_Struct)
-        self.RecoveryTime = [0]*len(self.DS_Struct)
-        self.FunctionLossTime = [0]*len(self.DS_Struct)
-
-        i = 0
-        for ds in self.DS_Struct:
-            ind = self.__DS_type.index(ds) if ds in self.__DS_type else -1
-            self.RepairTime[i] = self.RepairTime_DS[ind+1]
-            self.RecoveryTime[i] = self.RecoveryTime_DS[ind+1]
-            self.FunctionLossTime[i] = self.RecoveryTime[i]*self.FunctionLossMultipliers[ind+1]
-            i+=1
+        # RepairTime_DS 等为 5 个破坏状态（含无破坏）的取值，直接按编号索引
+        ind = self.DS_Struct_idx
+        self.RepairTime = np.asarray(self.RepairTime_DS,dtype=float)[ind]
+        self.RecoveryTime = np.asarray(self.RecoveryTime_DS,dtype=float)[ind]
+        self.FunctionLossTime = self.RecoveryTime*np.asarray(self.FunctionLossMultipliers,dtype=float)[ind]
@@ -370,7 +370,7 @@ class PelicunLossAssessment:
     def LossAssessment(
         self,
         ImLevel: float,
-        IdaCsv: 'str | Path | pd.DataFrame',
+        IdaCsv: 'str | Path | pd.DataFrame | _IDA_2D.IDAInterpolator',
         StructuralCmp: 'pd.DataFrame | None' = None,
         CustomComponents: 'pd.DataFrame | None' = None,
         ReplacementCost: float = None,
@@ -392,9 +392,10 @@ class PelicunLossAssessment:
         ----
         ImLevel : float
             目标地震动强度（Sa，单位 g），用于从 IDA 结果中插值提取 EDP。
-        IdaCsv : str, Path, or pd.DataFrame
-            IDA 结果 CSV 文件路径或已读取的 DataFrame（由 ``MDOFModel.analysis.IDA`` 或
-            ``MDOFModel.analysis.IDA_3D`` 输出）。
+        IdaCsv : str, Path, pd.DataFrame, or IDAInterpolator
+            IDA 结果文件路径（CSV 或 NPZ）或已读取的 DataFrame（由 ``MDOFModel.analysis.IDA`` 或
+            ``MDOFModel.analysis.IDA_3D`` 输出）。对同一 IDA 结果评估多个 ``ImLevel`` 时，
+            可传入预先构造的 ``IDA_2D.IDAInterpolator``，避免每次重新读取与解析。
         StructuralCmp : pd.DataFrame, optional
             结构构件定义，由 ``make_struct_cmp()`` 生成。
             列名: cmp, loc, dir, uid, Theta_0, Theta_1, Family, Blocks, Units。
@@ -438,13 +439,15 @@ class PelicunLossAssessment:
         extra_edp       = {}
         extra_edp_y     = {}
 
-        if isinstance(IdaCsv, pd.DataFrame):
+        if isinstance(IdaCsv, _IDA_2D.IDAInterpolator):
+            _is_3d = IdaCsv.bidir
+        elif isinstance(IdaCsv, pd.DataFrame):
             _header = IdaCsv
             _is_3d  = ('MaxDrift_X' in _header.columns and 'MaxDrift_Y' in _header.columns)
         else:
             try:
-                _header = pd.read_csv(IdaCsv, nrows=0)
-                _is_3d  = ('MaxDrift_X' in _header.columns and 'MaxDrift_Y' in _header.columns)
+                _columns = _IDA_2D.read_IDA_columns(IdaCsv)
+                _is_3d   = ('MaxDrift_X' in _columns and 'MaxDrift_Y' in _columns)
             except Exception:
                 _is_3d = False
 
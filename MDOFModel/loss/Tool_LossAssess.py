@@ -6,7 +6,7 @@
 #   --EQRecordFile <> --EQScaling <> --NumofStories <> --FloorArea <> --StructuralType <> --OccupancyClass <> --DesignLevel <> --OutputDir <> --SelfCenteringEnhancingFactor <>
 #
 # 2. 基于 IDA 结果，在指定 IM 下模拟 EDP。
-#   --IM_list <0.1 0.2 0.3 ...> --N_Sim <100> --IDA_result <> --betaM <> --OutputDir <> --NumofStories <> --FloorArea <> --StructuralType <> --OccupancyClass <> --DesignLevel <>
+#   --IM_list <0.1 0.2 0.3 ...> --N_Sim <100> --IDA_result <> --betaM <> --OutputDir <> --NumofStories <> --FloorArea <> --StructuralType <> --OccupancyClass <> --DesignLevel <> [--Seed <> --Sampling <random/sobol/lhs>]
 
 ########################################################
 
@@ -96,14 +96,14 @@ def DynamicAnalysis_1Sim(NumofStories, FloorArea, StructuralType, OccupancyClass
     df = pd.DataFrame(data)
     df.to_csv(Path(OutputDir).joinpath('BldLoss.csv'), index=False)
 
-def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, OutputDir, NumofStories, FloorArea, StructuralType, DesignInfo, OccupancyClass) -> tuple[pd.DataFrame, pd.DataFrame]:
+def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, OutputDir, NumofStories, FloorArea, StructuralType, DesignInfo, OccupancyClass, Seed=None, Sampling='random') -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     基于 IDA 结果，在指定 IM 水平下模拟 EDP 并执行 Hazus 损失评估。
 
     参数
     ----
     IDA_result : str
-        IDA 结果 CSV 文件路径。
+        IDA 结果文件路径（CSV 或 NPZ）。
     IM_list : list[float]
         目标强震危险度指标（IM）列表，单位为 g。
     N_Sim : list[int] | int
@@ -122,6 +122,12 @@ def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, Outp
         设计信息字典，包含 'Code'、'SeismicDesignLevel' 等键。
     OccupancyClass : str
         建筑使用类别，如 'RES1'、'COM4' 等。
+    Seed : int, optional
+        EDP 模拟与破坏状态抽样的随机数种子；给定时结果可复现。
+    Sampling : str, optional
+        抽样方法：'random'（默认）、'sobol' 或 'lhs'，同时用于 EDP 模拟与破坏状态抽样。
+        Sobol / LHS 为随机化的准蒙特卡洛抽样，相同精度所需的模拟次数更少；
+        用不同 Seed 重复计算，各次结果的离散程度即为蒙特卡洛误差的估计。
 
     返回
     ----
@@ -132,16 +138,8 @@ def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, Outp
     if isinstance(IDA_result, pd.DataFrame):
         IDA_result = IDA_result.copy()
     else:
-        IDA_result = pd.read_csv(Path(IDA_result))
-        # 将以字符串形式存储的数组列（MaxDrift / MaxAbsAccel 等）还原为 numpy 数组
-        for ind, row in IDA_result.iterrows():
-            for varname in ['MaxDrift', 'MaxAbsAccel', 'MaxRelativeAccel']:
-                if varname not in IDA_result.columns:
-                    continue
-                if isinstance(row[varname], str):
-                    IDA_result.at[ind, varname] = np.array(
-                        [float(val) for val in
-                         row[varname].replace('[', '').replace(']', '').replace(',', ' ').split()])
+        # CSV 中的数组列由 read_IDA 解析为 numpy 数组；NPZ 直接读取定宽矩阵
+        IDA_result = IDA.read_IDA(Path(IDA_result))
 
     # ── 在给定 IM 下模拟 EDP ─────────────────────────────────────────────────
     IDA_result = IDA_result.loc[:, ~IDA_result.columns.str.contains('^Unnamed')]
@@ -150,7 +148,8 @@ def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, Outp
 
     if len(N_Sim) == 1:
         N_Sim = N_Sim[0]
-    SimEDP = IDA.SimulateEDPGivenIM(IDA_result, IM_list, N_Sim, betaM)
+    rng = np.random.default_rng(Seed)
+    SimEDP = IDA.SimulateEDPGivenIM(IDA_result, IM_list, N_Sim, betaM, seed=rng, sampling=Sampling)
     if OutputDir is not None:
         SimEDP.to_csv(Path(OutputDir) / 'SimEDP.csv')
 
@@ -161,9 +160,10 @@ def Simulate_losses_given_IM_basedon_IDA(IDA_result, IM_list, N_Sim, betaM, Outp
     blo = bl.BldLossAssessment(NumofStories, FloorArea, StructuralType, DesignLevel, OccupancyClass)
     # MaxAbsAccel 单位为 mm/s²，除以 9800 换算为 g
     blo.LossAssessment(
-        SimEDP['MaxDrift'].tolist(),
-        (SimEDP['MaxAbsAccel'] / 9800.0).tolist(),
-        SimEDP['ResDrift'].tolist(),
+        SimEDP['MaxDrift'].to_numpy(),
+        (SimEDP['MaxAbsAccel'] / 9800.0).to_numpy(),
+        SimEDP['ResDrift'].to_numpy(),
+        Sampling=Sampling, seed=rng,
     )
 
     # ── 汇整结果并保存 ────────────────────────────────────────────────────────
@@ -210,6 +210,10 @@ def main(args):
         help='IDA 结果 CSV 文件路径')
     parser.add_argument('--betaM', type=float, default=0.0,
         help='认知不确定参数（对数标准差），默认 0.0')
+    parser.add_argument('--Seed', type=int, default=None,
+        help='EDP 模拟与破坏状态抽样的随机数种子，默认不固定')
+    parser.add_argument('--Sampling', default='random', choices=['random', 'sobol', 'lhs'],
+        help='EDP 与破坏状态的抽样方法，默认 random')
 
     # ── 公共参数 ──────────────────────────────────────────────────────────────
     parser.add_argument('--OutputDir', default='',
@@ -241,7 +245,7 @@ def main(args):
             args.IDA_result, args.IM_list, args.N_Sim,
             args.betaM, args.OutputDir,
             args.NumofStories, args.FloorArea, args.StructuralType,
-            args.DesignInfo, args.OccupancyClass,
+            args.DesignInfo, args.OccupancyClass, args.Seed, args.Sampling,
         )
     else:
         print('ERROR: 请提供 --EQRecordFile 或 --IDA_result 参数')
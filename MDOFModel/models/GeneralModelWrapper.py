@@ -4,10 +4,77 @@ from pathlib import Path
 from typing import Callable, List, Optional
 import opsvis as opsv
 import matplotlib.pyplot as plt
+import os
+import pickle
 import sys
-import eqsig.single
+import traceback
+import warnings
+
+from ..analysis.ReadRecord import LoadRecordTrimmed, WriteRecord
+from ..utils.record_utils import compute_sa
+from ..utils.scratch import ScratchSpace
+from .MDOFNative import SettleMonitor, strong_shaking_end
+
+# 本进程 OpenSees 域中保留的重力分析后快照（见 GeneralModelWrapper.GravitySnapshot）：
+# key -> (build_model_func, DampingRatio, g_factor)，fingerprint -> 建立快照时的域指纹，
+# valid -> 与重新建模的结果是否一致，TotalWeight -> 重力分析得到的总重力
+_GRAVITY_SNAPSHOT = {}
+
+
+def _domain_fingerprint() -> tuple:
+    """当前 OpenSees 域的指纹：节点与单元编号，以及时间、全部节点位移与单元抗力组成的数组。"""
+    nodes = tuple(ops.getNodeTags())
+    eles = tuple(ops.getEleTags())
+    state = [ops.getTime()]
+    for nd in nodes:
+        state.extend(ops.nodeDisp(nd))
+    for ele in eles:
+        state.extend(ops.eleForce(ele))
+    return nodes, eles, np.array(state, dtype=float)
+
+
+def _same_fingerprint(a: tuple, b: tuple) -> bool:
+    return (a[0] == b[0] and a[1] == b[1] and a[2].shape == b[2].shape
+            and np.allclose(a[2], b[2], rtol=1e-9, atol=1e-12 * max(1.0, float(np.abs(a[2]).max(initial=0.0)))))
+
+
+def _call_in_fork(func):
+    """在 ``os.fork()`` 派生的子进程中调用 ``func()``，返回其结果（经 pickle 传回）。
+
+    子进程继承本进程的 OpenSees 域（写时复制），对域的任何修改都不影响本进程。
+    子进程中的异常以 RuntimeError 在本进程中重新抛出。
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            os.close(r)
+            try:
+                payload = (True, func())
+            except BaseException:
+                payload = (False, traceback.format_exc())
+                code = 1
+            with os.fdopen(w, 'wb') as f:
+                pickle.dump(payload, f)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    os.close(w)
+    with os.fdopen(r, 'rb') as f:
+        data = f.read()
+    _, status = os.waitpid(pid, 0)
+    if not data:
+        raise RuntimeError(f"OpenSees 子进程异常退出（waitpid 状态 {status}）。")
+    ok, result = pickle.loads(data)
+    if not ok:
+        raise RuntimeError("OpenSees 子进程出错：\n" + result)
+    return result
 
-from ..analysis.ReadRecord import ReadRecord
 
 class GeneralModelWrapper:
     """
@@ -27,6 +94,32 @@ class GeneralModelWrapper:
 
     TmpDir: Path = Path(".opensees_tmp")
     """pathlib.Path: OpenSees Recorder 及日志等临时文件的输出根目录。默认为工作目录下的 .opensees_tmp/，不会被 git 追踪。可在实例化后修改。"""
+
+    ScratchMode: Optional[str] = "disk"
+    """Optional[str]: 每次动力分析临时文件目录的建立方式（见 :class:`~MDOFModel.utils.scratch.ScratchSpace`）。
+
+    - ``"disk"``（默认）：在 :attr:`TmpDir` 下为每次分析建立独立目录 ``opensees_{记录名}_SF{缩放系数}_{进程号}_{随机后缀}``；
+    - ``"tmpfs"``：同上，但目录建在内存文件系统（``/dev/shm``，不可用时为系统临时目录）上，recorder 读写不经过磁盘；
+    - ``None``：旧方式，固定使用 ``TmpDir/opensees_{记录名}_{进程号}``，分析后保留。
+
+    前两种方式下同一进程、同一记录的不同 IM 或双向分析的 X/Y 分量互不覆盖，
+    目录在标准后处理与 :attr:`extra_post_process` 完成后删除（:attr:`KeepScratch` 为 ``True`` 时保留）。
+    """
+
+    KeepScratch: bool = False
+    """bool: 是否保留每次动力分析的临时目录（recorder 输出与 OpenSees 日志），便于检查。默认 ``False``。"""
+
+    RecordInput: str = "Memory"
+    """str: 地震动加速度及地面速度时程传入 OpenSees 的方式。``"Memory"``（默认）以 Path 时程的 ``-values`` 直接传入内存中的数组，
+    每次分析不再写 ``.dat`` 文件；``"File"`` 先写入临时目录再以 ``-filePath`` 读取（旧方式，便于检查输入）。"""
+
+    RecordTrim: Optional[dict] = None
+    """Optional[dict]: 动力分析前的记录截取设置，为 :func:`~MDOFModel.utils.record_utils.trim_record` 的关键字参数字典，
+    如 ``{'start': 0.001, 'end': 0.999, 'taper': 0.5}``；``{}`` 表示全部取默认值。按累积 Arias 强度截去首尾低幅值段、
+    两端加余弦过渡，并在末尾补零作为自由振动段（未指定 ``tail`` 时按 :attr:`T1` 自动确定）。默认 ``None``，不截取。"""
+
+    RecordTrimInfo: dict = {}
+    """dict: 最近一次动力分析的截取信息 ``TrimStart``、``TrimEnd``、``TrimTail``、``OriginalDuration``（s）；未截取时为空字典。"""
     
     MaxDrift: list = []
     """list[float]: 单次动力分析完成后提取的各楼层最大层间位移角。格式为浮点数列表，长度对应总楼层数量（如 [一层角, 二层角, ...]）。"""
@@ -58,6 +151,54 @@ class GeneralModelWrapper:
     ResDrift: float = 0.0
     """float: 单次动力分析结束后整个结构（通常为全楼层中出现的最大值）的残余层间位移角。"""
 
+    CollapseDriftLimit: Optional[float] = None
+    """Optional[float | list[float]]: 倒塌层间位移角限值，标量或各层列表（如 :func:`~MDOFModel.analysis.Collapse.get_hazus_collapse_drift` 的返回值）。
+    设置后，:meth:`DynamicAnalysis` 每一步检查各层层间位移角，任一层超过限值即停止积分，返回的 ``finished`` 为 ``False``
+    且 :attr:`Collapsed` 为 ``True``。默认 ``None``，不检查。
+    """
+
+    Collapsed: bool = False
+    """bool: 最近一次动力分析是否因层间位移角超过 :attr:`CollapseDriftLimit` 而提前终止，用于区分倒塌与不收敛。"""
+
+    SettleTolerance: Optional[float] = None
+    """Optional[float]: 振动衰减提前结束的相对动能容差（如 1e-4）。设置后，强震段结束（见 :attr:`SettleAriasFraction`）之后
+    每隔 :attr:`SettleCheckInterval` 由控制节点的质量与相对速度计算动能，动能不超过历史峰值的 ``SettleTolerance`` 倍、
+    速度不超过峰值的 ``sqrt(SettleTolerance)`` 倍且连续保持 :attr:`SettleWindow` 秒时停止积分，
+    :attr:`ResDrift` 取该静止窗口内层间位移角的均值。默认 ``None``，分析到记录结束。
+    """
+
+    SettleWindow: Optional[float] = None
+    """Optional[float]: 判为衰减所需连续静止的时长（s）。默认 ``None``，取 ``max(2 s, 2 * T1)``。"""
+
+    SettleAriasFraction: float = 0.99
+    """float: 强震段结束时刻对应的输入记录累积 Arias 强度比例，此前不做衰减判别。默认 0.99。"""
+
+    SettleCheckInterval: float = 0.25
+    """float: 振动衰减的检查间隔（s），换算为分析步数后至少为 1 步。默认 0.25。"""
+
+    GravitySnapshot: bool = False
+    """bool: 是否复用重力分析后的模型状态，默认 ``False``。
+
+    为 ``True`` 时，同一进程中第一次 :meth:`DynamicAnalysis` 建立模型、完成重力分析并施加阻尼后保留该状态（快照），
+    之后的每次分析用 ``os.fork()`` 派生子进程，子进程继承快照（写时复制）直接施加地震动进行时程分析，
+    本进程中的快照保持不变，不再重复建模、重力分析与模态分析。建立快照时另在子进程中重新建模并完成重力分析，
+    比较节点位移与单元抗力，不一致（如 ``build_model_func`` 依赖外部状态）时给出警告并退回每次重建；
+    每次使用前核对 OpenSees 域的指纹，域被清除或换成其他模型（如调用 :meth:`Pushover`）后自动重建快照。
+    :attr:`extra_recorder_setup` 在子进程中调用，对 ``self`` 的修改不会传回；``animate=True`` 或平台不支持
+    ``os.fork()``（Windows）时按原方式分析。
+    """
+
+    Settled: bool = False
+    """bool: 最近一次动力分析是否因振动衰减（:attr:`SettleTolerance`）而提前结束；此时分析成功标志仍为 ``True``。"""
+
+    ModalCache: Optional[dict] = None
+    """Optional[dict]: 重力分析后模型的模态分析结果缓存（见 :meth:`ModalProperties`），默认 ``None``。
+
+    第一次 :meth:`DynamicAnalysis` 或 :meth:`ModalProperties` 时计算，此后每次动力分析直接取其圆频率计算 Rayleigh 阻尼，
+    不再重复特征值分析。缓存只含 Python 列表与浮点数，随实例 pickle / deepcopy，IDA 子进程直接继承；
+    ``build_model_func``、``g_factor``、``floor_nodes`` 或 ``dof`` 改变时自动重算。
+    """
+
     TotalWeight: float = 0.0
     """float: 自动重力分析中根据节点质量和 g_factor 计算得到的结构总重力。"""
     
@@ -165,6 +306,10 @@ class GeneralModelWrapper:
         self.MaxRelativeVel = []
         self.ResDrift = []
         self.TotalWeight = 0.0
+        self.CollapseDriftLimit = None
+        self.Collapsed = False
+        self.Settled = False
+        self.ModalCache = None
 
         # 用户自定义 EDP 回调（默认不启用）
         self.extra_recorder_setup = None
@@ -250,52 +395,153 @@ class GeneralModelWrapper:
         Returns
         -------
         Tuple[bool, float, float]
-            分析是否成功、当前时间、总时间。
+            分析是否成功、当前时间、总时间。因超过 :attr:`CollapseDriftLimit` 而提前终止时，
+            分析成功标志为 ``False``，并以 :attr:`Collapsed` 与不收敛区分。
+            因振动衰减（:attr:`SettleTolerance`）而提前结束时，分析成功标志为 ``True``，
+            :attr:`Settled` 为 ``True``，当前时间小于总时间。
         """
         # 读取并设置地震波文件
         p = Path(record_file)
         self.UniqueRecorderPrefix = p.stem
         prefix = self.UniqueRecorderPrefix
 
-        # 所有临时文件（含日志）统一放入 TmpDir/<prefix>，不自动清理
-        _tmp_dir = self.TmpDir / f"opensees_{prefix}"
-        _tmp_dir.mkdir(parents=True, exist_ok=True)
+        # 所有临时文件（含日志）统一放入本次分析的临时目录（见 ScratchMode），后处理完成后删除
+        if self.ScratchMode is None:
+            scratch = ScratchSpace(None, self.TmpDir / f"opensees_{prefix}_{os.getpid()}")
+        else:
+            scratch = ScratchSpace(self.ScratchMode, self.TmpDir, tag=f"opensees_{prefix}_SF{scale_factor:.4g}",
+                                   keep=self.KeepScratch)
+        with scratch:
+            return self._dynamic_analysis_in(scratch.path, record_file, scale_factor, ifprint,
+                                             delta_t, animate, show_progress, kwargs)
+
+    def _dynamic_analysis_in(self, _tmp_dir: Path, record_file, scale_factor, ifprint, delta_t, animate, show_progress, kwargs):
+        """在临时目录 ``_tmp_dir`` 中完成一次动力分析及后处理，参数与返回值同 :meth:`DynamicAnalysis`。"""
         log_file = _tmp_dir / "opensees.log"
-        temp_eq_file = _tmp_dir / f"temp_{p.name}.dat"
+
+        if self.GravitySnapshot and not animate and self._gravity_snapshot_ready(log_file, ifprint):
+            # 子进程继承本进程中重力分析后的模型状态完成时程分析，本进程中的快照保持不变
+            finished, tCurrent, totalTime, res_drift = self._transient_in_fork(
+                record_file, scale_factor, ifprint, delta_t, show_progress, _tmp_dir, log_file)
+        else:
+            ops.wipe()
+            ops.logFile(log_file.as_posix(), "-noEcho")
+            self._build_and_load(ifprint)
+            finished, tCurrent, totalTime, res_drift = self._transient(
+                record_file, scale_factor, ifprint, delta_t, animate, show_progress, _tmp_dir, kwargs)
+
+        # 6. 后处理：从包络文件读取 EDP 最大值，从位移时程中计算漂移和残余漂移
+        self._post_process(*self._result_files(_tmp_dir))
+        if res_drift is not None:
+            # 提前结束时，记录器末尾几秒含静止前的振动，残余漂移改取静止窗口内的均值
+            self.ResDrift = res_drift
+
+        # 用户自定义 EDP 后处理（读取自定义 recorder 文件并设置属性）
+        if self.extra_post_process is not None:
+            self.extra_post_process(self, _tmp_dir)
+            
+        return finished, tCurrent, totalTime
+
+    def _gravity_snapshot_ready(self, log_file: Path, ifprint: bool = False) -> bool:
+        """确保本进程 OpenSees 域中保留着本模型重力分析后的快照，必要时重新建立并校验。
+
+        平台不支持 ``os.fork()`` 或快照与重新建模的结果不一致时返回 ``False``。
+        """
+        if not hasattr(os, 'fork'):
+            return False
+        key = (self.build_model_func, self.DampingRatio, self._g_factor)
+        snap = _GRAVITY_SNAPSHOT
+        if snap.get('key') == key:
+            if not snap['valid']:
+                return False
+            if _same_fingerprint(_domain_fingerprint(), snap['fingerprint']):
+                self.TotalWeight = snap['TotalWeight']
+                return True
 
         ops.wipe()
         ops.logFile(log_file.as_posix(), "-noEcho")
+        self._build_and_load(ifprint)
+        fingerprint = _domain_fingerprint()
 
-        # 1. 建立模型和重力
+        def _fresh_fingerprint():
+            ops.wipe()
+            ops.logFile(os.devnull, "-noEcho")
+            self._build_and_load(False)
+            return _domain_fingerprint()
+
+        valid = _same_fingerprint(_call_in_fork(_fresh_fingerprint), fingerprint)
+        if not valid:
+            warnings.warn("重力分析后的模型快照与重新建模的结果不一致，GravitySnapshot 退回为每次重新建模。")
+        snap.clear()
+        snap.update(key=key, fingerprint=fingerprint, valid=valid, TotalWeight=self.TotalWeight)
+        return valid
+
+    def _transient_in_fork(self, record_file, scale_factor, ifprint, delta_t, show_progress, _tmp_dir, log_file):
+        """在子进程中基于重力分析后的快照进行时程分析，返回值同 :meth:`_transient`，并传回分析状态属性。"""
+        def _run():
+            ops.logFile(log_file.as_posix(), "-noEcho")
+            out = self._transient(record_file, scale_factor, ifprint, delta_t, False, show_progress, _tmp_dir, {})
+            return out, self.RecordTrimInfo, self.Collapsed, self.Settled
+
+        out, self.RecordTrimInfo, self.Collapsed, self.Settled = _call_in_fork(_run)
+        return out
+
+    def _build_and_load(self, ifprint: bool = False):
+        """建立模型、完成重力分析并施加 Rayleigh 阻尼，即每次时程分析前的准备工作。"""
         self.build_model_func()
         self._auto_apply_gravity()
 
-        # 2. 自动施加阻尼 (使用内置模态计算与Rayleigh阻尼)
-        omegas, _ = self.ModalAnalysis(num_modes=5, ifprint=ifprint)
+        # 自动施加阻尼 (使用缓存的模态结果与Rayleigh阻尼)
+        if not self._modal_cache_valid():
+            self.ModalCache = self._modal_properties_current(5)
+        omegas, periods = self.ModalCache['omegas'], self.ModalCache['periods']
+        if ifprint and len(periods) >= 2:
+            print(f'Eigen Analysis: T1 = {periods[0]:.2f} s; T2 = {periods[1]:.2f} s')
+        elif ifprint and len(periods) == 1:
+            print(f'Eigen Analysis: T1 = {periods[0]:.2f} s')
         if len(omegas) >= 2:
             alpha_m = self.DampingRatio * (2.0 * omegas[0] * omegas[1]) / (omegas[0] + omegas[1])
             beta_k_init = 2.0 * self.DampingRatio / (omegas[0] + omegas[1])
             ops.rayleigh(alpha_m, 0.0, beta_k_init, 0.0)
-        dt_gm, nPts = ReadRecord(record_file, temp_eq_file.as_posix())
+
+    def _result_files(self, tmp_dir: Path) -> tuple:
+        """时程分析标准 recorder 的输出文件，顺序与 :meth:`_post_process` 的参数一致；无底部节点时基底位移文件为 ``None``。"""
+        return (tmp_dir / "disp.out", tmp_dir / "abs_accel_env.out", tmp_dir / "rel_accel_env.out",
+                tmp_dir / "abs_vel_env.out", tmp_dir / "rel_vel_env.out",
+                tmp_dir / "basedisp.out" if self._base_nodes else None)
+
+    def _transient(self, record_file, scale_factor, ifprint, delta_t, animate, show_progress, _tmp_dir, kwargs):
+        """在已完成重力分析和阻尼设置的模型上施加地震动并进行时程分析，结束时 ``ops.wipe()`` 以写出 recorder 文件。
+
+        Returns
+        -------
+        tuple
+            ``(finished, tCurrent, totalTime, res_drift)``；``res_drift`` 为振动衰减提前结束时静止窗口内的残余漂移，否则为 ``None``。
+        """
+        dt_gm, _eq_accel, self.RecordTrimInfo = LoadRecordTrimmed(
+            str(record_file), self.RecordTrim, self.T1 if self.T1 > 0 else None)
+        nPts = _eq_accel.size
 
         # 预计算地面速度时程（积分地面加速度），供绝对速度 Recorder 的 -timeSeries 引用
-        _eq_accel_arr = np.array(open(temp_eq_file).read().split(), dtype=float) * (scale_factor * self._g_factor)
+        _eq_accel_arr = _eq_accel * (scale_factor * self._g_factor)
         _eq_vel_arr   = np.cumsum(_eq_accel_arr) * dt_gm
-        vel_ts_file   = _tmp_dir / "ground_vel.dat"
-        np.savetxt(vel_ts_file, _eq_vel_arr, fmt='%.9e')
 
         ana_dt = dt_gm if delta_t == 'AsInRecord' else float(delta_t)
 
         # 4. 定义地震动激励及速度时程（需在 Recorder 引用前定义）
-        ops.timeSeries("Path", 111, "-dt", dt_gm, "-filePath", temp_eq_file.as_posix(), "-factor", scale_factor * self._g_factor)
-        ops.timeSeries("Path", 112, "-dt", dt_gm, "-filePath", vel_ts_file.as_posix(), "-factor", 1.0)
+        if self.RecordInput == "File":
+            temp_eq_file = _tmp_dir / f"temp_{Path(record_file).name}.dat"
+            vel_ts_file  = _tmp_dir / "ground_vel.dat"
+            WriteRecord(_eq_accel, temp_eq_file)
+            np.savetxt(vel_ts_file, _eq_vel_arr, fmt='%.9e')
+            ops.timeSeries("Path", 111, "-dt", dt_gm, "-filePath", temp_eq_file.as_posix(), "-factor", scale_factor * self._g_factor)
+            ops.timeSeries("Path", 112, "-dt", dt_gm, "-filePath", vel_ts_file.as_posix(), "-factor", 1.0)
+        else:
+            ops.timeSeries("Path", 111, "-dt", dt_gm, "-values", *_eq_accel.tolist(), "-factor", scale_factor * self._g_factor)
+            ops.timeSeries("Path", 112, "-dt", dt_gm, "-values", *_eq_vel_arr.tolist(), "-factor", 1.0)
         ops.pattern("UniformExcitation", 111, self._dof, "-accel", 111)
 
-        disp_file          = _tmp_dir / "disp.out"
-        abs_accel_env_file = _tmp_dir / "abs_accel_env.out"
-        rel_accel_env_file = _tmp_dir / "rel_accel_env.out"
-        abs_vel_env_file   = _tmp_dir / "abs_vel_env.out"
-        rel_vel_env_file   = _tmp_dir / "rel_vel_env.out"
+        disp_file, abs_accel_env_file, rel_accel_env_file, abs_vel_env_file, rel_vel_env_file, base_disp_file = self._result_files(_tmp_dir)
 
         # 加速度/速度 Recorder 节点列表：index 0 为地面节点（取 base_nodes[0]，若有），其余为各楼层节点
         # 地面节点（固定，相对加速度/速度 = 0）：
@@ -314,9 +560,7 @@ class GeneralModelWrapper:
         ops.recorder("EnvelopeNode", "-file", abs_vel_env_file.as_posix(),   "-timeSeries", 112, "-node", *_acc_vel_nodes, "-dof", self._dof, "vel")
         ops.recorder("EnvelopeNode", "-file", rel_vel_env_file.as_posix(),                       "-node", *_acc_vel_nodes, "-dof", self._dof, "vel")
 
-        base_disp_file = None
-        if self._base_nodes:
-            base_disp_file = _tmp_dir / "basedisp.out"
+        if base_disp_file is not None:
             ops.recorder("Node", "-file", base_disp_file.as_posix(), "-time", "-node", *self._base_nodes, "-dof", self._dof, "disp")
 
         # 用户自定义 recorder（在标准 recorder 之后、分析开始之前注册）
@@ -334,6 +578,30 @@ class GeneralModelWrapper:
         
         n_steps = int((nPts * dt_gm) / ana_dt)
         finished = True
+        self.Collapsed = False
+        self.Settled = False
+        heights = np.asarray(self._story_heights, dtype=float)
+
+        def _story_drifts():
+            base = np.mean([ops.nodeDisp(nd, self._dof) for nd in self._base_nodes]) if self._base_nodes else 0.0
+            floor_disp = np.array([base] + [ops.nodeDisp(nd, self._dof) for nd in self._floor_nodes])
+            return np.diff(floor_disp) / heights
+
+        # 倒塌判别：每步由楼层节点位移计算层间位移角，任一层超过限值即停止
+        drift_limit = None
+        if self.CollapseDriftLimit is not None:
+            drift_limit = np.broadcast_to(np.asarray(self.CollapseDriftLimit, dtype=float), (len(self._floor_nodes),))
+
+        # 振动衰减判别：强震段结束后由控制节点的质量和相对速度计算动能，衰减到容差以下即停止
+        settle = None
+        if self.SettleTolerance is not None:
+            masses = np.array([ops.nodeMass(nd, self._dof) for nd in self._floor_nodes], dtype=float)
+            if not masses.any():
+                masses = np.ones(len(self._floor_nodes))  # 控制节点上没有集中质量时按等质量计
+            window = self.SettleWindow if self.SettleWindow is not None else max(2.0, 2.0 * self.T1)
+            settle = SettleMonitor(masses, self.SettleTolerance, window,
+                                   strong_shaking_end(_eq_accel, dt_gm, self.SettleAriasFraction))
+            settle_steps = max(1, int(round(self.SettleCheckInterval / ana_dt)))
         
         # 动画设置：如果 animate=True，则设置xlim和ylim以适应模型尺寸，记录每步的位移数据供后续动画使用
         if animate:
@@ -380,6 +648,18 @@ class GeneralModelWrapper:
             if ok != 0:
                 finished = False
                 break
+
+            if drift_limit is not None:
+                if np.any(np.abs(_story_drifts()) > drift_limit):
+                    self.Collapsed = True
+                    finished = False
+                    break
+
+            if settle is not None and (step + 1) % settle_steps == 0:
+                vel = [ops.nodeVel(nd, self._dof) for nd in self._floor_nodes]
+                if settle.update(ops.getTime(), [vel], [_story_drifts()])[0]:
+                    self.Settled = True
+                    break
                 
             anim_step_interval = max(1, int(0.1 / ana_dt))  # 控制帧数为 10 帧/秒，即每 0.1 秒记录一次
             
@@ -435,20 +715,15 @@ class GeneralModelWrapper:
                 
         # Wipe 会自动 flush file recorder，以确保可以读取
         ops.wipe()
-        
-        # 6. 后处理：从包络文件读取 EDP 最大值，从位移时程中计算漂移和残余漂移
-        self._post_process(disp_file, abs_accel_env_file, rel_accel_env_file, abs_vel_env_file, rel_vel_env_file, base_disp_file)
 
-        # 用户自定义 EDP 后处理（读取自定义 recorder 文件并设置属性）
-        if self.extra_post_process is not None:
-            self.extra_post_process(self, _tmp_dir)
-            
-        return finished, tCurrent, totalTime
+        res_drift = float(settle.residual()[0]) if self.Settled else None
+        return finished, tCurrent, totalTime, res_drift
 
     def DynamicAnalysis_Sa(self, record_file: str, target_Sa: float, ifprint: bool = False, delta_t='AsInRecord', animate: bool = False, show_progress: bool = False, **kwargs):
         """
         以目标谱加速度 Sa(T₁, ζ)（单位 g）为输入做动力时程分析。
-        内部用 eqsig 计算原始记录在结构基本周期 T₁ 处的谱加速度，
+        原始记录在结构基本周期 T₁ 处的谱加速度按该周期精确积分
+        （见 :func:`~MDOFModel.utils.record_utils.compute_sa`），
         进而推算所需缩放系数后调用 :meth:`DynamicAnalysis`。
         响应谱计算使用 ``self.DampingRatio`` 作为阻尼比。
 
@@ -487,21 +762,8 @@ class GeneralModelWrapper:
                 "请检查模型质量矩阵或手动设置 wrapper_model.T1。"
             )
 
-        # ── 读取地震动，获取 dt 及加速度序列（g） ──────────────────────────
-        p = Path(record_file)
-        _sa_tmp_dir = self.TmpDir / "sa_calc"
-        _sa_tmp_dir.mkdir(parents=True, exist_ok=True)
-        tmp_path = (_sa_tmp_dir / ('temp_' + p.name + '.dat')).as_posix()
-        dt_gm, _ = ReadRecord(record_file, tmp_path)
-        if dt_gm is None:
-            raise FileNotFoundError(f"无法读取地震动记录: {record_file}")
-        with open(tmp_path, 'r') as f:
-            accel_g = np.array(f.read().split(), dtype=float)
-
-        # ── 用 eqsig 计算原始记录在 T1 处的 Sa（g） ─────────────────────
-        record = eqsig.single.AccSignal(accel_g * 9.8, dt_gm)
-        record.generate_response_spectrum(response_times=np.array([self.T1]), xi=self.DampingRatio)
-        Sa_record = record.s_a[0] / 9.8
+        # ── 原始记录在 T1 处的 Sa（g） ──────────────────────────────────────
+        Sa_record = compute_sa(record_file, self.T1, self.DampingRatio, use_index=False)
 
         if Sa_record < 1.0e-10:
             raise ValueError(
@@ -916,6 +1178,66 @@ class GeneralModelWrapper:
         return omegas, periods
 
 
+    def _modal_cache_key(self) -> tuple:
+        return (self.build_model_func, self._g_factor, tuple(self._floor_nodes), self._dof)
+
+    def _modal_cache_valid(self) -> bool:
+        return self.ModalCache is not None and self.ModalCache['key'] == self._modal_cache_key()
+
+    def ModalProperties(self, num_modes: int = 5) -> dict:
+        """
+        返回重力分析后模型的模态分析结果，结果缓存在 :attr:`ModalCache` 中。
+
+        缓存有效且阶数足够时直接返回，否则重新建模、完成重力分析后进行特征值分析（会清除当前 OpenSees 域）。
+        IDA 在派发任务前调用本方法，子进程随模型一起继承缓存。
+
+        Parameters
+        ----------
+        num_modes : int, optional
+            模态阶数，默认 5。
+
+        Returns
+        -------
+        dict
+            ``omegas``（圆频率）、``periods``（周期）、``mode_shapes``（各阶振型在 ``floor_nodes`` 的 ``dof`` 方向分量，
+            ``mode_shapes[i][j]`` 为第 i+1 阶第 j+1 层，已按顶层分量归一化为 1）、
+            ``participation``（``dof`` 方向的振型参与系数）。返回的字典应视为只读。
+        """
+        if self._modal_cache_valid() and len(self.ModalCache['omegas']) >= num_modes:
+            return self.ModalCache
+        ops.wipe()
+        try:
+            self.build_model_func()
+            self._auto_apply_gravity()
+            self.ModalCache = self._modal_properties_current(num_modes)
+        finally:
+            ops.wipe()
+        return self.ModalCache
+
+    def _modal_properties_current(self, num_modes: int) -> dict:
+        """对当前 OpenSees 域进行特征值分析，整理为 :attr:`ModalCache` 的格式。"""
+        omegas, periods = self.ModalAnalysis(num_modes=num_modes, ifprint=False)
+
+        # 参与系数 Γ = φᵀ M r / φᵀ M φ（集中质量，r 为 dof 方向的影响向量）
+        node_tags = ops.getNodeTags()
+        masses = {tag: ops.nodeMass(tag) for tag in node_tags}
+        mode_shapes, participation = [], []
+        for mode in range(1, len(omegas) + 1):
+            num = den = 0.0
+            for tag in node_tags:
+                phi = ops.nodeEigenvector(tag, mode)
+                mass = masses[tag]
+                den += sum(mi * p * p for mi, p in zip(mass, phi))
+                if len(phi) >= self._dof:
+                    num += mass[self._dof - 1] * phi[self._dof - 1]
+            shape = [ops.nodeEigenvector(tag, mode, self._dof) for tag in self._floor_nodes]
+            top = shape[-1] if shape and shape[-1] != 0.0 else 1.0
+            mode_shapes.append([v / top for v in shape])
+            participation.append(num / den * top if den > 0.0 else 0.0)
+
+        return {'key': self._modal_cache_key(), 'omegas': omegas, 'periods': periods,
+                'mode_shapes': mode_shapes, 'participation': participation}
+
     def PlotModel(self, **kwargs):
         """
         使用 opsvis 包绘制包含节点和单元的模型示意图。
@@ -13,6 +13,9 @@ import os
 import mpl_toolkits.axisartist as axisartist
 
 from ..analysis import ReadRecord
+from .MDOFNative import (ShearBuildingIntegrator, SettleMonitor, hysteretic_backbone,
+    resample_record, shear_modal_properties, strong_shaking_end)
+from ..utils.scratch import ScratchSpace, opensees_path
 
 class MDOFOpenSees():
 
@@ -28,9 +31,63 @@ class MDOFOpenSees():
     HystereticParameters = ()
     SelfCenteringEnhancingFactor = 0.0 # 0-1
 
+    # 动力分析后端：'OpenSees' 或 'Native'（进程内 NumPy 积分器，见 MDOFNative.py）
+    Backend = 'OpenSees'
+
+    # 地震动输入方式（OpenSees 后端）：'Memory' 以 Path 时程的 -values 直接传入内存中的记录；
+    # 'File' 先写 .dat 文件再以 -filePath 读取（旧方式）
+    RecordInput = 'Memory'
+
+    # 记录截取（见 record_utils.trim_record）：按累积 Arias 强度截去首尾低幅值段，两端加余弦过渡，
+    # 末尾补零作为自由振动段。None 表示不截取；字典为 trim_record 的关键字参数，
+    # 如 {'start': 0.001, 'end': 0.999, 'taper': 0.5}，{} 表示全部取默认值
+    RecordTrim = None
+    RecordTrimInfo = {} # 最近一次动力分析的截取信息：TrimStart, TrimEnd, TrimTail, OriginalDuration（s）
+
     # 输出目录
     outputdir = str(Path.cwd())
 
+    # 临时文件（recorder 输出；RecordInput = 'File' 时的 .dat 记录）的位置（见 utils.scratch.ScratchSpace），
+    # 默认值与 GeneralModelWrapper 相同：
+    # 'disk'（默认）为每次分析在 outputdir 下建立独立的临时目录，'tmpfs' 为建在内存文件系统（/dev/shm）上，
+    # 目录名含前缀、记录名、缩放系数与进程号且后缀随机，互不冲突，读取结果后删除（KeepScratch = True 时保留）；
+    # None 为旧方式，写入 outputdir（.dat 写在记录旁），文件名前缀 UniqueRecorderPrefix，分析后保留
+    ScratchMode = 'disk'
+    KeepScratch = False
+
+    # 动力分析求解策略（OpenSees 后端）
+    ChunkSteps = 500 # 收敛时每次 analyze 的步数
+    FastPathAlgorithm = ('NewtonLineSearch',)
+    # 不收敛时依次尝试：(收敛判据, 算法参数, 子步数, 最大迭代次数)
+    FallbackLadder = (
+        ('NormDispIncr', ('KrylovNewton', '-initial'), 1, 50),
+        ('NormDispIncr', ('NewtonLineSearch',), 2, 50),
+        ('NormDispIncr', ('KrylovNewton', '-initial'), 4, 50),
+        ('EnergyIncr', ('NewtonLineSearch',), 10, 100),
+        ('RelativeNormUnbalance', ('BFGS',), 10, 100),
+        ('NormUnbalance', ('ModifiedNewton', '-initial'), 20, 200),
+    )
+    AnalysisStats = {} # 最近一次动力分析的计数：Steps, SubSteps, AnalyzeCalls, Fallbacks
+
+    # 倒塌判别：任一层层间位移超过限值时提前终止动力分析，结果记为倒塌（Collapsed = True）
+    CollapseDriftLimit = None # 标量或各层列表，单位同 MaxDrift（如 MDOF_LU.DeltaCi）；None 表示不检查
+    # OpenSees 后端每隔多少步检查一次；默认逐步检查，与 Native 后端及 GeneralModelWrapper 一致。
+    # 大于 1 时只在每块结束时检查，块内短暂超限后又回落的情况会被漏判，结果是近似的
+    CollapseCheckSteps = 1
+
+    # 振动衰减提前终止：强震段结束（输入记录累积 Arias 强度达到 SettleAriasFraction）之后，
+    # 相对动能不超过历史峰值的 SettleTolerance 倍、楼层速度不超过峰值的 sqrt(SettleTolerance) 倍，
+    # 且连续保持 SettleWindow 秒时停止分析（Iffinish = True，Settled = True），
+    # 残余位移取该静止窗口内层间位移的均值（见 MDOFNative.SettleMonitor）
+    SettleTolerance = None # 如 1e-4；None 表示分析到记录结束
+    SettleWindow = None # 静止窗口（s）；None 时取 max(2 s, 2*T1)
+    SettleAriasFraction = 0.99
+    SettleCheckInterval = 0.25 # 检查间隔（s），换算为分析步数后至少为 1 步
+
+    # 模态分析结果缓存（见 ModalProperties）：(参数键, 结果字典)。随实例 pickle / deepcopy，
+    # IDA 子进程直接继承，不再每次分析重新求特征值；m、k、DampingRatio 改变时自动重算
+    ModalCache = None
+
     # 执行推覆分析的结果保存
     # DriftHistory = {} # DriftHistory['time'] 为时间列表，DriftHistory[1] 为第1层层间位移角列表
     # ForceHistory = {} 
@@ -42,6 +99,8 @@ class MDOFOpenSees():
     MaxRelativeAccel = np.array([]) # [0] 为地面
     MaxAbsVel = np.array([]) # MaxAbsVel[0] 为地面（固定节点，值为 0）
     ResDrift = None
+    Collapsed = False # 是否因超过 CollapseDriftLimit 而提前终止
+    Settled = False # 是否因振动衰减（SettleTolerance）而提前结束
     DriftHistory = {} # DriftHistory['time'] 为时间列表，DriftHistory[1] 为第1层层间位移角列表
     ForceHistory = {} 
     NodeAbsAccelHistory = {} # NodeAbsAccelHistory[0] 为地面
@@ -71,6 +130,17 @@ class MDOFOpenSees():
         self.HystereticCurveType = HystereticCurveType
         self.HystereticParameters = HystereticParameters
 
+    def ModalProperties(self):
+        # 返回模态分析结果字典（见 MDOFNative.shear_modal_properties）：
+        #   omegas (rad/s), periods (s), modes（质量归一化振型，列为振型）, participation（参与系数）,
+        #   alphaM, betaKinit（Rayleigh 阻尼系数）, K0
+        # 结果缓存在 ModalCache 中，模型参数不变时直接返回；返回的字典应视为只读
+        key = (int(self.NStories), tuple(np.asarray(self.m, dtype=float).ravel()),
+            tuple(np.asarray(self.k, dtype=float).ravel()), float(self.DampingRatio))
+        if self.ModalCache is None or self.ModalCache[0] != key:
+            self.ModalCache = (key, shear_modal_properties(self.m, self.k, self.DampingRatio))
+        return self.ModalCache[1]
+
     def StaticPushover(self, maxU: list = [0.10,-0.10,0], dU = 0.001,
         CFloor = 'roof', ifprint: bool = True):
         # 参数:
@@ -81,6 +151,10 @@ class MDOFOpenSees():
         # 返回值:
         # Iffinish, currentDisp
         
+        with self.__Scratch('Pushover') as scratch:
+            return self.__StaticPushoverOpenSees(maxU, dU, CFloor, ifprint, scratch)
+
+    def __StaticPushoverOpenSees(self, maxU, dU, CFloor, ifprint, scratch):
         if ifprint:
             print('Pushover analysis of a MDOF lumped-mass building model with OpenSees...')
         
@@ -97,15 +171,14 @@ class MDOFOpenSees():
             load(i, i, 0.0, 0.0)
 
         # recorders
-        outputdir = Path(self.outputdir).relative_to(Path.cwd())
         recorder('Element', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'DriftHistory.txt')), '-time',
+            self.__RecorderPath(scratch, 'DriftHistory.txt'), '-time',
             '-ele', *list(range(1,self.NStories+1)), 'deformations')
         recorder('Element', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'ForceHistory.txt')), '-time',
+            self.__RecorderPath(scratch, 'ForceHistory.txt'), '-time',
             '-ele', *list(range(1,self.NStories+1)), 'axialForce')
         recorder('Node', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'NodeDispHistory.txt')),'-time',
+            self.__RecorderPath(scratch, 'NodeDispHistory.txt'),'-time',
             '-node', *list(range(1,self.NStories+1)), '-dof', 1, 'disp')
         
         # 执行分析        
@@ -145,7 +218,7 @@ class MDOFOpenSees():
             print(f'State (Successful or Fault): {Iffinish:d}')
         
         wipe()
-        self.__ReadPushoverRecorderFiles()
+        self.__ReadPushoverRecorderFiles(scratch)
 
         return Iffinish, currentDisp
         
@@ -159,110 +232,348 @@ class MDOFOpenSees():
         #
         # 返回值:
         # Iffinish, tCurrent, TotalTime
+        # 设置 CollapseDriftLimit 时，超过限值提前终止的分析 Iffinish = False，
+        # 并以 self.Collapsed = True 与不收敛区分
+        # 设置 SettleTolerance 时，振动衰减后提前结束的分析 Iffinish = True、self.Settled = True，
+        # tCurrent 小于 TotalTime
+
+        if self.Backend == 'Native':
+            return self.__DynamicAnalysisNative(EQRecordfile, GMScaling, ifprint, DeltaT)
 
+        with self.__Scratch(f'{Path(EQRecordfile).name}_SF{GMScaling:.4g}') as scratch:
+            return self.__DynamicAnalysisOpenSees(EQRecordfile, GMScaling, ifprint, DeltaT, scratch)
+
+    def __DynamicAnalysisOpenSees(self, EQRecordfile, GMScaling, ifprint, DeltaT, scratch):
         if ifprint:
             print('Perform dynamic analysis of a MDOF lumped-mass building model with OpenSees...')
 
         self.__BuildModel(ifprint)
 
-        # 将 SMD 记录转换为 OpenSees 可读格式
-        p = Path(EQRecordfile)
-        dt, nPts = ReadRecord.ReadRecord(EQRecordfile, 
-            (Path(p.parent, self.UniqueRecorderPrefix + p.name +'.dat')).as_posix())
-
         # 均匀激励：加速度输入
         tsTag = 100
-        EQfile = Path(p.parent,self.UniqueRecorderPrefix + p.name +'.dat')
-        timeSeries('Path', tsTag, '-dt', dt, '-filePath', 
-            os.path.relpath(EQfile,Path.cwd()),
-            '-factor', self.__g * GMScaling) # 用相对路径，避免路径中有中文字符
+        dt, nPts, accel, self.RecordTrimInfo = self.__ReadRecordAccel(EQRecordfile)
+        if self.RecordInput == 'File':
+            # 将记录写成 OpenSees 可读格式
+            p = Path(EQRecordfile)
+            if self.ScratchMode is None:
+                EQfile = Path(p.parent,self.UniqueRecorderPrefix + p.name +'.dat')
+            else:
+                EQfile = scratch.file(p.name + '.dat')
+            ReadRecord.WriteRecord(accel, EQfile)
+            timeSeries('Path', tsTag, '-dt', dt, '-filePath', 
+                opensees_path(EQfile),
+                '-factor', self.__g * GMScaling) # 用相对路径，避免路径中有中文字符
+        else:
+            timeSeries('Path', tsTag, '-dt', dt, '-values', *accel.tolist(),
+                '-factor', self.__g * GMScaling)
         IDloadTag = 400			# load tag
         GMdirection = 1
         pattern('UniformExcitation', IDloadTag, GMdirection, '-accel', tsTag)
 
         # recorders
-        outputdir = Path(self.outputdir).relative_to(Path.cwd())
         recorder('EnvelopeElement', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'MaxDrift.txt')),
+            self.__RecorderPath(scratch, 'MaxDrift.txt'),
             '-ele', *list(range(1,self.NStories+1)), 'deformations')
         recorder('Element', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'DriftHistory.txt')),'-time',
+            self.__RecorderPath(scratch, 'DriftHistory.txt'),'-time',
             '-ele', *list(range(1,self.NStories+1)), 'deformations')
         recorder('Element', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'ForceHistory.txt')), '-time',
+            self.__RecorderPath(scratch, 'ForceHistory.txt'), '-time',
             '-ele', *list(range(1,self.NStories+1)), 'axialForce')
         recorder('EnvelopeNode', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'MaxAbsAccel.txt')), 
+            self.__RecorderPath(scratch, 'MaxAbsAccel.txt'), 
             '-timeSeries', tsTag, 
             '-node', *list(range(self.NStories+1)), '-dof', 1, 'accel')
         recorder('EnvelopeNode', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'MaxRelativeAccel.txt')),
+            self.__RecorderPath(scratch, 'MaxRelativeAccel.txt'),
             '-node', *list(range(self.NStories+1)), '-dof', 1, 'accel')
         recorder('EnvelopeNode', '-file',
-            str(Path(outputdir,self.UniqueRecorderPrefix+'MaxAbsVel.txt')),
+            self.__RecorderPath(scratch, 'MaxAbsVel.txt'),
             '-node', *list(range(self.NStories+1)), '-dof', 1, 'vel')
         recorder('Node', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'NodeAbsAccelHistory.txt')),
+            self.__RecorderPath(scratch, 'NodeAbsAccelHistory.txt'),
             '-timeSeries', tsTag, '-time', 
             '-node', *list(range(self.NStories+1)), '-dof', 1, 'accel')
         recorder('Node', '-file', 
-            str(Path(outputdir,self.UniqueRecorderPrefix+'NodeRelativeAccelHistory.txt')), '-time', 
+            self.__RecorderPath(scratch, 'NodeRelativeAccelHistory.txt'), '-time', 
             '-node', *list(range(self.NStories+1)), '-dof', 1, 'accel')
 
 
-        # 动力分析
+        # 动力分析：分析对象只配置一次；收敛时按 ChunkSteps 成块调用 analyze，
+        # 仅在某一步不收敛时才依次尝试 FallbackLadder 中的策略，成功后回到快速路径
         Tol = 1e-8
         maxNumIter = 10
         DtAnalysis = dt if DeltaT== 'AsInRecord' else DeltaT # dt
+        tFinal = nPts*dt
+        nSteps = int(np.ceil(tFinal/DtAnalysis - 1e-9))
+
         wipeAnalysis()
         constraints('Transformation')
         numberer('RCM')
-        # system('UmfPack') # 仅在使用 ExpressNewton 算法时有效
         system('BandGeneral')
+        NewmarkGamma = 0.5
+        NewmarkBeta = 0.25
+        integrator('Newmark', NewmarkGamma, NewmarkBeta)
+        test('NormDispIncr', Tol, maxNumIter)
+        algorithm(*self.FastPathAlgorithm)
+        analysis('Transient')
+
+        # 设置倒塌限值时按 CollapseCheckSteps 成块分析，每块结束后检查层间位移（默认逐步检查）
+        chunk = self.ChunkSteps
+        DriftLimit = None
+        if self.CollapseDriftLimit is not None:
+            DriftLimit = np.broadcast_to(np.asarray(self.CollapseDriftLimit, dtype=float), (self.NStories,))
+            chunk = min(chunk, self.CollapseCheckSteps)
+        self.Collapsed = False
+
+        # 设置 SettleTolerance 时按 SettleCheckInterval 成块分析，每块结束后检查振动是否已衰减
+        settle = self.__SettleMonitor([(dt, accel)])
+        if settle is not None:
+            chunk = min(chunk, self.__SettleCheckSteps(DtAnalysis))
+        self.Settled = False
+
+        stats = {'Steps': 0, 'SubSteps': 0, 'AnalyzeCalls': 0, 'Fallbacks': {}}
+        iStep = 0
+        ok = 0
+        while iStep < nSteps:
+            ok = analyze(min(chunk, nSteps - iStep), DtAnalysis)
+            stats['AnalyzeCalls'] += 1
+            iStep = int(round(getTime()/DtAnalysis))
+            if ok == 0:
+                if self.__ExceedsCollapseDrift(DriftLimit) or self.__HasSettled(settle):
+                    break
+                continue
+
+            # 第 iStep+1 步不收敛：逐级尝试备用策略，直到完成这一步
+            tTarget = (iStep + 1)*DtAnalysis
+            for testType, algoArgs, nSub, maxIter in self.FallbackLadder:
+                test(testType, Tol, maxIter)
+                algorithm(*algoArgs)
+                tRemain = tTarget - getTime()
+                nSubRemain = max(1, int(round(tRemain/(DtAnalysis/nSub))))
+                ok = analyze(nSubRemain, tRemain/nSubRemain)
+                stats['AnalyzeCalls'] += 1
+                if ok == 0:
+                    key = f'{testType}/{algoArgs[0]}/{nSub}'
+                    stats['Fallbacks'][key] = stats['Fallbacks'].get(key, 0) + 1
+                    stats['SubSteps'] += nSubRemain
+                    break
+            test('NormDispIncr', Tol, maxNumIter)
+            algorithm(*self.FastPathAlgorithm)
+            if ok != 0:
+                break
+            iStep += 1
+            if self.__ExceedsCollapseDrift(DriftLimit) or self.__HasSettled(settle):
+                break
 
         tCurrent = getTime()
+        stats['Steps'] = iStep
+        self.AnalysisStats = stats
 
-        Test = {1:'NormDispIncr', 2: 'RelativeEnergyIncr', 3:'EnergyIncr', 
-            4: 'RelativeNormUnbalance',5: 'RelativeNormDispIncr', 6: 'NormUnbalance'}
-        Algorithm = {8: 'NewtonLineSearch', 1:'KrylovNewton', 2: 'SecantNewton' , 3:'ModifiedNewton' , 
-            4: 'RaphsonNewton',5: 'PeriodicNewton', 6: 'BFGS', 7: 'Broyden'} # 9: 'ExpressNewton', 
+        Iffinish = not ok and not self.Collapsed
+        TotalTime = tFinal
 
-        # algorithm ExpressNewton 2 1.0 -currentTangent -factorOnce
+        if ifprint:
+            print(f'State (Successful or Fault): {Iffinish:d}')
+            if self.Collapsed:
+                print('Collapse: story drift exceeds CollapseDriftLimit.')
+            if self.Settled:
+                print('Settled: motion has decayed below SettleTolerance.')
+            print(f'The analysis ends at {tCurrent:.3f} sec out of {TotalTime:.3f} sec.')
+            print(f'Steps: {stats["Steps"]}, analyze calls: {stats["AnalyzeCalls"]}, '
+                  f'sub-steps: {stats["SubSteps"]}, fallbacks: {stats["Fallbacks"]}')
+        
+        wipe()
+        self.__ReadDynamicRecorderFiles(scratch)
+        if self.Settled:
+            self.ResDrift = float(settle.residual()[0])
 
-        tFinal = nPts*dt
+        return Iffinish, tCurrent, TotalTime
 
-        time = [tCurrent]
-        ok = 0
-        while tCurrent < tFinal:   
-            for i in Test:
-                test(Test[i], Tol, maxNumIter)    
-                for j in Algorithm: 
-                    if j==9:
-                        algorithm(Algorithm[j], 2, 1.0, '-currentTangent','-factorOnce')
-                    elif j < 4:
-                        algorithm(Algorithm[j], '-initial')
-                    else:
-                        algorithm(Algorithm[j])
-                    while ok == 0 and tCurrent < tFinal:    
-                        NewmarkGamma = 0.5
-                        NewmarkBeta = 0.25
-                        integrator('Newmark', NewmarkGamma, NewmarkBeta)
-                        analysis('Transient')
-                        ok = analyze(1, DtAnalysis)
-                        if ok == 0:
-                            tCurrent = getTime()                
-                            time.append(tCurrent)
-            break
+    def __ExceedsCollapseDrift(self, DriftLimit):
+        # 检查当前提交状态下是否有楼层超过倒塌限值；超过时置 self.Collapsed = True
+        if DriftLimit is None:
+            return False
+        drift = np.array([nodeDisp(i+1, 1) - nodeDisp(i, 1) for i in range(self.NStories)])
+        self.Collapsed = bool((np.abs(drift) > DriftLimit).any())
+        return self.Collapsed
+
+    def __SettleMonitor(self, records):
+        # 设置 SettleTolerance 时建立振动衰减监测，records 为各工况的 (dt, accel) 列表；否则返回 None
+        if self.SettleTolerance is None:
+            return None
+        window = self.SettleWindow
+        if window is None:
+            T1 = self.ModalProperties()['periods'][0]
+            window = max(2.0, 2.0*T1)
+        t_strong = [strong_shaking_end(accel, dt, self.SettleAriasFraction) for dt, accel in records]
+        return SettleMonitor(self.m, self.SettleTolerance, window, t_strong)
+
+    def __SettleCheckSteps(self, DtAnalysis):
+        # SettleCheckInterval 对应的分析步数
+        return max(1, int(round(self.SettleCheckInterval/DtAnalysis)))
+
+    def __HasSettled(self, settle):
+        # 以当前提交状态更新振动衰减监测；已衰减时置 self.Settled = True
+        if settle is None:
+            return False
+        vel = [nodeVel(i, 1) for i in range(1, self.NStories+1)]
+        drift = [nodeDisp(i+1, 1) - nodeDisp(i, 1) for i in range(self.NStories)]
+        self.Settled = bool(settle.update(getTime(), [vel], [drift])[0])
+        return self.Settled
+
+    def DynamicAnalysisBatch(self, EQRecordfiles: list, GMScalings: list, DeltaT = 0.1):
+        # 用 Native 积分器一次完成多条记录 / 多个缩放系数的动力分析（与 Backend 设置无关）。
+        # 所有工况在同一个向量化时程循环中积分，批量越大，单个工况的平均耗时越低。
+        # Elastic 模型采用振型叠加，每条记录只积分一次，各缩放系数的结果按比例得到。
+        # 
+        # 参数:
+        # -EQRecordfiles: 地震动记录文件列表；若为单个字符串，则所有缩放系数共用该记录
+        # -GMScalings:    与 EQRecordfiles 一一对应的缩放系数列表
+        # -DeltaT:        'AsInRecord' 或浮点数；'AsInRecord' 时按记录时间步长分组积分
+        #
+        # 返回值:
+        # pd.DataFrame，每行一个工况，列为 EQRecord, GMScaling, MaxDrift, MaxAbsAccel,
+        # MaxRelativeAccel, MaxAbsVel, ResDrift, Iffinish, Collapsed, tCurrent, TotalTime；
+        # 设置 RecordTrim 时另含截取信息列 TrimStart, TrimEnd, TrimTail, OriginalDuration
+        # 设置 SettleTolerance 时另含 Settled 列（弹性模型采用振型叠加，不提前结束）
+        # 设置 CollapseDriftLimit 时，超过限值的工况提前终止，Collapsed = True、Iffinish = False
+
+        if isinstance(EQRecordfiles, (str, Path)):
+            EQRecordfiles = [EQRecordfiles] * len(GMScalings)
+        if len(EQRecordfiles) != len(GMScalings):
+            raise ValueError('EQRecordfiles and GMScalings must have the same length')
+
+        integrator_ = ShearBuildingIntegrator(self.m, self.k, self.DampingRatio,
+            self.HystereticCurveType, self.HystereticParameters, self.SelfCenteringEnhancingFactor,
+            modal=self.ModalProperties())
+
+        records = {}
+        for rec in set(map(str, EQRecordfiles)):
+            records[rec] = self.__ReadRecordAccel(rec)
+
+        # 按分析步长分组，每组一次批量积分
+        groups = {}
+        for i, rec in enumerate(map(str, EQRecordfiles)):
+            dt = records[rec][0]
+            DtAnalysis = dt if DeltaT == 'AsInRecord' else DeltaT
+            groups.setdefault(DtAnalysis, []).append(i)
+
+        # 弹性模型用振型叠加：响应与缩放系数成正比，每条记录只在单位缩放系数下积分一次
+        elastic = self.HystereticCurveType == 'Elastic'
+
+        rows = [None] * len(GMScalings)
+        for DtAnalysis, idx in groups.items():
+            if elastic:
+                sources = list(dict.fromkeys(str(EQRecordfiles[i]) for i in idx))
+                src = [sources.index(str(EQRecordfiles[i])) for i in idx]
+                srcScaling = [1.0] * len(sources)
+                factor = [GMScalings[i] for i in idx]
+            else:
+                sources = [str(EQRecordfiles[i]) for i in idx]
+                src = list(range(len(idx)))
+                srcScaling = [GMScalings[i] for i in idx]
+                factor = [1.0] * len(idx)
+
+            tFinal = np.array([records[rec][0] * records[rec][1] for rec in sources])
+            nSteps = np.ceil(tFinal/DtAnalysis - 1e-9).astype(int)
+            ag = np.zeros((len(sources), nSteps.max() + 1))
+            for j, rec in enumerate(sources):
+                dt, nPts, accel, _ = records[rec]
+                ag[j] = resample_record(accel, dt, DtAnalysis, nSteps.max()) * self.__g * srcScaling[j]
+            if elastic:
+                res = integrator_.run_modal(ag, DtAnalysis, n_steps=nSteps)
+            else:
+                res = integrator_.run(ag, DtAnalysis, n_steps=nSteps,
+                    collapse_drift=self.CollapseDriftLimit,
+                    settle=self.__SettleMonitor([records[rec][::2] for rec in sources]),
+                    settle_check_steps=self.__SettleCheckSteps(DtAnalysis))
+
+            for i, j, f in zip(idx, src, factor):
+                # 振型叠加不能中途停止，弹性模型按缩放后的最大层间位移判别倒塌
+                collapsed = bool(res['Collapsed'][j]) or (elastic and self.CollapseDriftLimit is not None
+                    and bool((abs(f) * res['MaxDrift'][j] > np.asarray(self.CollapseDriftLimit)).any()))
+                rows[i] = {
+                    'EQRecord': EQRecordfiles[i], 'GMScaling': GMScalings[i],
+                    'MaxDrift': abs(f) * res['MaxDrift'][j], 'MaxAbsAccel': abs(f) * res['MaxAbsAccel'][j],
+                    'MaxRelativeAccel': abs(f) * res['MaxRelativeAccel'][j],
+                    'MaxAbsVel': abs(f) * res['MaxAbsVel'][j],
+                    'ResDrift': abs(f) * float(res['ResDrift'][j]), 'Iffinish': bool(res['Iffinish'][j]) and not collapsed,
+                    'Collapsed': collapsed,
+                    'tCurrent': float(res['tCurrent'][j]), 'TotalTime': float(tFinal[j]),
+                    **records[str(EQRecordfiles[i])][3],
+                }
+                if self.SettleTolerance is not None:
+                    rows[i]['Settled'] = bool(res['Settled'][j])
+
+        return pd.DataFrame(rows)
+
+    def __ReadRecordAccel(self, EQRecordfile: str):
+        # 读取地震动记录，返回 (dt, nPts, accel, TrimInfo)，accel 单位为 g；直接读入内存，不写 .dat 文件
+        # 设置 RecordTrim 时按其截取，补零时长未指定时按基本周期自动确定
+        period = None
+        if self.RecordTrim is not None and self.RecordTrim.get('tail') is None:
+            period = self.ModalProperties()['periods'][0]
+        dt, accel, info = ReadRecord.LoadRecordTrimmed(str(EQRecordfile), self.RecordTrim, period)
+        return dt, accel.size, accel, info
+
+    def __DynamicAnalysisNative(self, EQRecordfile:str, GMScaling:float, ifprint: bool = True,
+        DeltaT = 0.1):
+        # 与 DynamicAnalysis 相同的模型与积分格式，但在进程内用 NumPy 积分，
+        # 不建立 OpenSees 模型，也不写 recorder 文件。结果属性与 OpenSees 后端一致。
 
-        Iffinish = not ok
+        if ifprint:
+            print('Perform dynamic analysis of a MDOF lumped-mass building model with the native integrator...')
+
+        integrator_ = ShearBuildingIntegrator(self.m, self.k, self.DampingRatio,
+            self.HystereticCurveType, self.HystereticParameters, self.SelfCenteringEnhancingFactor,
+            modal=self.ModalProperties())
+        if ifprint:
+            print('Eigen Analysis: ' + '; '.join(
+                f'T{i+1} = {T:.2f} s' for i, T in enumerate(integrator_.periods[:2])))
+
+        dt, nPts, accel, self.RecordTrimInfo = self.__ReadRecordAccel(EQRecordfile)
+
+        DtAnalysis = dt if DeltaT== 'AsInRecord' else DeltaT
+        tFinal = nPts*dt
+        nSteps = int(np.ceil(tFinal/DtAnalysis - 1e-9))
+        ag = resample_record(accel, dt, DtAnalysis, nSteps) * self.__g * GMScaling
+
+        res = integrator_.run(ag, DtAnalysis, record_history=True,
+            collapse_drift=self.CollapseDriftLimit,
+            settle=self.__SettleMonitor([(dt, accel)]), settle_check_steps=self.__SettleCheckSteps(DtAnalysis))
+        Iffinish = bool(res['Iffinish'][0])
+        self.Collapsed = bool(res['Collapsed'][0])
+        self.Settled = bool(res['Settled'][0])
+        tCurrent = float(res['tCurrent'][0])
         TotalTime = tFinal
 
         if ifprint:
             print(f'State (Successful or Fault): {Iffinish:d}')
+            if self.Collapsed:
+                print('Collapse: story drift exceeds CollapseDriftLimit.')
+            if self.Settled:
+                print('Settled: motion has decayed below SettleTolerance.')
             print(f'The analysis ends at {tCurrent:.3f} sec out of {TotalTime:.3f} sec.')
-        
-        wipe()
-        self.__ReadDynamicRecorderFiles()
+
+        self.MaxDrift = res['MaxDrift'][0]
+        self.MaxAbsAccel = res['MaxAbsAccel'][0]
+        self.MaxRelativeAccel = res['MaxRelativeAccel'][0]
+        self.MaxAbsVel = res['MaxAbsVel'][0]
+        self.ResDrift = float(res['ResDrift'][0])
+
+        nDone = int(round(tCurrent/DtAnalysis))
+        self.AnalysisStats = {'Steps': nDone, 'SubSteps': 0, 'AnalyzeCalls': 1, 'Fallbacks': {}}
+        t = pd.Series(res['time'][:nDone])
+        self.DriftHistory = {'time': t}
+        self.ForceHistory = {'time': t}
+        self.NodeAbsAccelHistory = {'time': t}
+        self.NodeRelativeAccelHistory = {'time': t}
+        for i in range(self.NStories):
+            self.DriftHistory[i+1] = pd.Series(res['DriftHistory'][0, :nDone, i])
+            self.ForceHistory[i+1] = pd.Series(res['ForceHistory'][0, :nDone, i])
+            self.NodeAbsAccelHistory[i+1] = pd.Series(res['AbsAccelHistory'][0, :nDone, i])
+            self.NodeRelativeAccelHistory[i+1] = pd.Series(res['RelAccelHistory'][0, :nDone, i])
 
         return Iffinish, tCurrent, TotalTime
 
@@ -323,46 +634,12 @@ class MDOFOpenSees():
             if self.HystereticCurveType == 'Elastic':
                 uniaxialMaterial(self.HystereticCurveType, matTag[i], E)
             elif self.HystereticCurveType in ['Modified-Clough','Kinematic hardening','Pinching']:
-                Vyi = self.HystereticParameters[0][i]
-                betai = self.HystereticParameters[1][i]
-                etai = self.HystereticParameters[2][i]
-                DeltaCi = self.HystereticParameters[3][i]
-                s1p = Vyi / A[i] / E  # yield stress
-                e1p = s1p / E    # yield strain
-                s2p = s1p * betai
-                e2p = e1p + (s2p-s1p) / (etai * E)
-                s3p = s2p*1.001
-                e3p = DeltaCi/storyLength
-                if e3p < e2p:
-                    print('WARNING: the drift of complete damage is smaller than ultimate drift')
-                    e2p = e3p
-                    s2p = (e2p - e1p)*(etai * E) + s1p
-                    s3p = s2p*1.001
-                    e3p = e2p*1.1
-                if self.HystereticCurveType == 'Modified-Clough':
-                    uniaxialMaterial('Hysteretic', matTag[i], 
-                        s1p, e1p, s2p, e2p, s3p, e3p, 
-                        -s1p, -e1p, -s2p, -e2p, -s3p, -e3p, 0.5, 0.5, 
-                        0, 0, 0.0)
-                elif self.HystereticCurveType == 'Kinematic hardening':
-                    uniaxialMaterial('Hysteretic', matTag[i], 
-                        s1p, e1p, s2p, e2p, s3p, e3p, 
-                        -s1p, -e1p, -s2p, -e2p, -s3p, -e3p, 0.001, 0.999, 
-                        0.0, 0.0, 0.0)
-                elif self.HystereticCurveType == 'Pinching':
-                    tao = self.HystereticParameters[4]
-                    if tao == 0:
-                        tao = 0.001
-                    elif tao == 1:
-                        tao = 0.999
-                    else:
-                        pass
-                    py = tao
-                    px = 1.0 - py
-                    uniaxialMaterial('Hysteretic', matTag[i], 
-                        s1p, e1p, s2p, e2p, s3p, e3p, 
-                        -s1p, -e1p, -s2p, -e2p, -s3p, -e3p, px, py, 
-                        0, 0, 0.0)
+                s1p, e1p, s2p, e2p, s3p, e3p, px, py = hysteretic_backbone(
+                    self.HystereticCurveType, self.HystereticParameters, A[i], i, storyLength, E)
+                uniaxialMaterial('Hysteretic', matTag[i], 
+                    s1p, e1p, s2p, e2p, s3p, e3p, 
+                    -s1p, -e1p, -s2p, -e2p, -s3p, -e3p, px, py, 
+                    0, 0, 0.0)
                 
                 if (self.SelfCenteringEnhancingFactor > 0) & (self.SelfCenteringEnhancingFactor <= 1):
                     matTag_MultiLinear = 1000+matTag[i]
@@ -383,78 +660,50 @@ class MDOFOpenSees():
             else:
                 element('Truss', i+1, i,i+1, A[i], matTag[i])
 
-        # Eigenvalue Analysis   
-        if self.NStories>1:  
-            lambdaN = eigen('-fullGenLapack', 2)
-            w1 = lambdaN[0]**0.5
-            w2 = lambdaN[1]**0.5
-            T1 =  2.0*pi/w1
-            T2 =  2.0*pi/w2
-            if ifprint:
-                print(f'Eigen Analysis: T1 = {T1:.2f} s; T2 = {T2:.2f} s')
-        else:
-            lambdaN = eigen('-fullGenLapack', 1)
-            w1 = lambdaN[0]**0.5
-            T1 =  2.0*pi/w1
-            if ifprint:
-                print(f'Eigen Analysis: T1 = {T1:.2f} s')
-
-        # define & apply damping
-        # RAYLEIGH damping parameters, Where to put M/K-prop damping, switches 
-        # (http://opensees.berkeley.edu/OpenSees/manuals/usermanual/1099.htm)
+        # 模态分析与 Rayleigh 阻尼：取缓存的模态结果（见 ModalProperties），不再调用 eigen
         # D=$alphaM*M + $betaKcurr*Kcurrent + $betaKcomm*KlastCommit + $beatKinit*$Kinitial
-        if self.NStories>1: 
-            xDamp = self.DampingRatio;  
-            MpropSwitch = 1.0
-            KcurrSwitch = 0.0
-            KcommSwitch = 0.0
-            KinitSwitch = 1.0
-            nEigenI = 1 
-            nEigenJ = 2 
-            lambdaI = lambdaN[nEigenI-1] 
-            lambdaJ = lambdaN[nEigenJ-1] 
-            omegaI = lambdaI**0.5
-            omegaJ = lambdaJ**0.5
-            alphaM = MpropSwitch*xDamp*(2.0*omegaI*omegaJ)/(omegaI+omegaJ)
-            betaKcurr = KcurrSwitch*2.*xDamp/(omegaI+omegaJ)      # current-K;      +beatKcurr*KCurrent
-            betaKcomm = KcommSwitch*2.*xDamp/(omegaI+omegaJ)      # last-committed K;   +betaKcomm*KlastCommitt
-            betaKinit = KinitSwitch*2.*xDamp/(omegaI+omegaJ)      # initial-K;     +beatKinit*Kini
-            rayleigh(alphaM,betaKcurr, betaKinit, betaKcomm)       
-        else:
-            xDamp = self.DampingRatio;  
-            MpropSwitch = 1.0
-            nEigenI = 1 
-            lambdaI = lambdaN[nEigenI-1] 
-            omegaI = lambdaI**0.5
-            alphaM = MpropSwitch*xDamp*2.0*omegaI
-            rayleigh(alphaM, 0, 0, 0)  
+        # (http://opensees.berkeley.edu/OpenSees/manuals/usermanual/1099.htm)
+        modal = self.ModalProperties()
+        if ifprint:
+            print('Eigen Analysis: ' + '; '.join(
+                f'T{i+1} = {T:.2f} s' for i, T in enumerate(modal['periods'][:2])))
+        rayleigh(modal['alphaM'], 0.0, modal['betaKinit'], 0.0)
+
+    def __Scratch(self, tag: str):
+        # 本次分析的临时文件命名空间（见 ScratchMode）
+        return ScratchSpace(self.ScratchMode, self.outputdir, tag=self.UniqueRecorderPrefix + tag,
+            keep=self.KeepScratch)
+
+    def __RecorderPath(self, scratch, name: str):
+        # recorder 输出文件传给 OpenSees 的路径（相对路径，避免路径中有中文字符）
+        return opensees_path(scratch.file(self.UniqueRecorderPrefix + name))
 
-    def __ReadDynamicRecorderFiles(self):
+    def __ReadDynamicRecorderFiles(self, scratch):
 
         # check if analysis results are empty
-        fpath = str(Path(self.outputdir,self.UniqueRecorderPrefix+'MaxDrift.txt'))
+        fpath = scratch.file(self.UniqueRecorderPrefix+'MaxDrift.txt')
         if not (os.path.isfile(fpath) and os.path.getsize(fpath) > 0):
             return
 
         self.MaxDrift = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'MaxDrift.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'MaxDrift.txt'), 
             sep=r'\s+', header=None).loc[2,:].values
         self.MaxAbsAccel = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'MaxAbsAccel.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'MaxAbsAccel.txt'), 
             sep=r'\s+', header=None).loc[2,:].values
         self.MaxRelativeAccel = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'MaxRelativeAccel.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'MaxRelativeAccel.txt'), 
             sep=r'\s+', header=None).loc[2,:].values
         self.MaxAbsVel = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'MaxAbsVel.txt')),
+            scratch.file(self.UniqueRecorderPrefix+'MaxAbsVel.txt'),
             sep=r'\s+', header=None).loc[2,:].values
         
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'DriftHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'DriftHistory.txt'), 
             sep=r'\s+', header=None)
         self.DriftHistory = {}
         self.DriftHistory['time'] = df.loc[:,0]
-        ind_last5sec = ((self.DriftHistory['time'][-1:]-self.DriftHistory['time'])<5.0)
+        ind_last5sec = ((self.DriftHistory['time'].iloc[-1]-self.DriftHistory['time'])<5.0)
         ResDrift_dict = {}
         for i in range(self.NStories):
             self.DriftHistory[i+1] = df.loc[:,i+1]
@@ -463,7 +712,7 @@ class MDOFOpenSees():
         self.ResDrift = np.abs(np.array(list(ResDrift_dict.values()))).max()
 
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'ForceHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'ForceHistory.txt'), 
             sep=r'\s+', header=None)
         self.ForceHistory = {}
         self.ForceHistory['time'] = df.loc[:,0]
@@ -471,7 +720,7 @@ class MDOFOpenSees():
             self.ForceHistory[i+1] = df.loc[:,i+1]
         
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'NodeAbsAccelHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'NodeAbsAccelHistory.txt'), 
             sep=r'\s+', header=None)
         self.NodeAbsAccelHistory = {}
         self.NodeAbsAccelHistory['time'] = df.loc[:,0]
@@ -479,17 +728,17 @@ class MDOFOpenSees():
             self.NodeAbsAccelHistory[i+1] = df.loc[:,i+1]
 
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'NodeRelativeAccelHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'NodeRelativeAccelHistory.txt'), 
             sep=r'\s+', header=None)
         self.NodeRelativeAccelHistory = {}
         self.NodeRelativeAccelHistory['time'] = df.loc[:,0]
         for i in range(self.NStories):
             self.NodeRelativeAccelHistory[i+1] = df.loc[:,i+1]
 
-    def __ReadPushoverRecorderFiles(self):
+    def __ReadPushoverRecorderFiles(self, scratch):
 
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'DriftHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'DriftHistory.txt'), 
             sep=r'\s+', header=None)
         self.DriftHistory = {}
         self.DriftHistory['time'] = df.loc[:,0]
@@ -497,7 +746,7 @@ class MDOFOpenSees():
             self.DriftHistory[i+1] = df.loc[:,i+1]
 
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'ForceHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'ForceHistory.txt'), 
             sep=r'\s+', header=None)
         self.ForceHistory = {}
         self.ForceHistory['time'] = df.loc[:,0]
@@ -505,7 +754,7 @@ class MDOFOpenSees():
             self.ForceHistory[i+1] = df.loc[:,i+1]
 
         df = pd.read_table(
-            str(Path(self.outputdir,self.UniqueRecorderPrefix+'NodeDispHistory.txt')), 
+            scratch.file(self.UniqueRecorderPrefix+'NodeDispHistory.txt'), 
             sep=r'\s+', header=None)
         self.NodeDispHistory = {}
         self.NodeDispHistory['time'] = df.loc[:,0]
@@ -0,0 +1,236 @@
+########################################################
+# record_library.py – 打包的地震动记录库
+#
+# 把目录中的全部记录按顺序拼成一个连续的 float64 数组（RecordLibrary.npy），
+# 另存一张目录表（RecordLibrary.csv）：每条记录的偏移、点数、dt、PGA/PGV、
+# Arias 强度、显著持时、双向分量配对及源文件的 (大小, 修改时间)。
+# 读取时以内存映射打开数据文件，按偏移切片即得到记录，不复制数据；
+# 多个进程映射同一文件时共用操作系统页缓存中的同一份数据。
+########################################################
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .record_utils import ground_motion_parameters
+
+_RECORD_SUFFIXES = ('.at2', '.txt')
+
+# 目录表的列
+_CATALOG_COLUMNS = ['Record', 'File', 'Offset', 'NPTS', 'DT', 'PGA', 'PGV', 'Ia', 'D5_95',
+                    'Component', 'Pair', 'Size', 'MtimeNs']
+
+# 进程内缓存：目录 -> RecordLibrary，避免同一进程反复加载目录表
+_LIBRARY_CACHE = {}
+
+
+def _source_file(directory: Path, name: str) -> Optional[Path]:
+    """记录对应的 .at2 / .txt 源文件，查找顺序与 ReadRecord 相同；都不存在时返回 None。"""
+    for suffix in _RECORD_SUFFIXES:
+        path = directory / (name + suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def _read_pairs(directory: Path) -> dict:
+    """由目录中的 MetaData*.txt（含 AccelXfile / AccelYfile 列）得到 记录名 -> (分量, 配对记录名)。"""
+    pairs = {}
+    for meta in sorted(directory.glob('MetaData*.txt')):
+        try:
+            T = pd.read_csv(meta, sep=',', usecols=['AccelXfile', 'AccelYfile'])
+        except (ValueError, OSError):
+            continue
+        for x, y in zip(T['AccelXfile'].astype(str), T['AccelYfile'].astype(str)):
+            x, y = Path(x).stem, Path(y).stem
+            pairs[x] = ('X', y)
+            pairs[y] = ('Y', x)
+    return pairs
+
+
+class RecordLibrary:
+    """记录目录的打包记录库。
+
+    :meth:`pack` 读取目录中的全部记录，写出 ``RecordLibrary.npy``（全部加速度时程首尾相接，
+    单位 g）和 ``RecordLibrary.csv``（目录表）。此后
+    :func:`~MDOFModel.analysis.ReadRecord.LoadRecord` 读取该目录中的记录时直接从内存映射的
+    数组中切片返回，不再解析文本；源文件的大小或修改时间与目录表不一致时，该记录退回
+    读取源文件，直到重新打包。
+
+    Parameters
+    ----------
+    directory : str or Path
+        记录所在目录，其中须已有打包文件（见 :meth:`pack`）。
+
+    Attributes
+    ----------
+    catalog : pandas.DataFrame
+        目录表，以记录名为索引，列为 File、Offset、NPTS、DT、PGA（g）、PGV（m/s）、
+        Ia（m/s）、D5_95（s）、Component（'X' / 'Y'，无配对信息时为空）、Pair（配对记录名）、
+        Size、MtimeNs。
+
+    Examples
+    --------
+    >>> lib = RecordLibrary.pack('Resources/FEMA_P-695_far-field_ground_motions')
+    >>> dt, accel = lib.record('RSN68_SFERN_PEL090')
+    >>> lib.catalog.loc[lib.catalog['PGA'] > 0.5]
+    """
+
+    DATA_FILENAME = 'RecordLibrary.npy'
+    CATALOG_FILENAME = 'RecordLibrary.csv'
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._stamp = self._disk_stamp()
+        if self._stamp is None:
+            raise FileNotFoundError(f"记录库文件未找到：{self.catalog_path}")
+        catalog = pd.read_csv(self.catalog_path, keep_default_na=False,
+                              dtype={'Record': str, 'File': str, 'Component': str, 'Pair': str})
+        self.catalog = catalog.set_index('Record')
+        self._data = np.load(self.data_path, mmap_mode='r')
+        # 记录名 -> (偏移, 点数, dt, 源文件名, (大小, 修改时间))，查询时不经过 DataFrame
+        c = self.catalog
+        self._rows = {name: (int(o), int(n), float(dt), f, (int(size), int(mtime)))
+                      for name, o, n, dt, f, size, mtime in zip(
+                          c.index, c['Offset'], c['NPTS'], c['DT'], c['File'], c['Size'], c['MtimeNs'])}
+
+    @property
+    def data_path(self) -> Path:
+        return self.directory / self.DATA_FILENAME
+
+    @property
+    def catalog_path(self) -> Path:
+        return self.directory / self.CATALOG_FILENAME
+
+    def _disk_stamp(self):
+        try:
+            st = os.stat(self.catalog_path)
+            os.stat(self.data_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    @classmethod
+    def open(cls, directory: Union[str, Path]) -> Optional['RecordLibrary']:
+        """返回目录的记录库，同一进程内复用同一实例；目录中没有记录库时返回 None。
+
+        记录库被重新打包（目录表的大小或修改时间变化）后自动重新加载。
+        """
+        key = os.path.abspath(directory)
+        lib = _LIBRARY_CACHE.get(key)
+        if lib is not None and lib._disk_stamp() == lib._stamp:
+            return lib
+        try:
+            lib = cls(key)
+        except (OSError, ValueError, KeyError):
+            lib = None
+        if lib is None:
+            _LIBRARY_CACHE.pop(key, None)
+        else:
+            _LIBRARY_CACHE[key] = lib
+        return lib
+
+    @classmethod
+    def pack(cls, directory: Union[str, Path], records: Iterable[str] = None,
+             progress: bool = False) -> 'RecordLibrary':
+        """读取目录中的记录（默认全部 .at2 / .txt 记录，不含 MetaData*.txt 与 pSa_*.txt）并打包。
+
+        无法解析为加速度时程的文件跳过。数据文件和目录表均先写临时文件再原子替换，
+        已映射旧文件的进程不受影响。
+
+        Parameters
+        ----------
+        directory : str or Path
+            记录所在目录，打包文件也写入该目录。
+        records : iterable of str, optional
+            只打包指定的记录名（不含扩展名）。
+        progress : bool
+            是否显示进度条。
+        """
+        from ..analysis.ReadRecord import LoadRecord_PEER, LoadRecord_TXT  # 延迟导入，避免包级循环依赖
+
+        directory = Path(directory)
+        if records is None:
+            names = sorted({p.stem for p in directory.iterdir()
+                            if p.suffix.lower() in _RECORD_SUFFIXES
+                            and not p.name.startswith(('MetaData', 'pSa_'))})
+        else:
+            names = [Path(r).name for r in records]
+        pairs = _read_pairs(directory)
+
+        if progress:
+            from tqdm import tqdm
+            names = tqdm(names, desc='RecordLibrary', unit='record')
+        chunks, rows, offset = [], [], 0
+        for name in names:
+            path = _source_file(directory, name)
+            if path is None:
+                continue
+            # 直接解析源文件，不经过 LoadRecord（否则会读回旧的记录库）
+            dt, accel = (LoadRecord_PEER if path.suffix == '.at2' else LoadRecord_TXT)(str(path))
+            if not dt > 0 or accel.size == 0:
+                continue
+            st = path.stat()
+            component, pair = pairs.get(name, ('', ''))
+            rows.append({'Record': name, 'File': path.name, 'Offset': offset, 'NPTS': accel.size,
+                         'DT': dt, **ground_motion_parameters(accel, dt),
+                         'Component': component, 'Pair': pair,
+                         'Size': st.st_size, 'MtimeNs': st.st_mtime_ns})
+            chunks.append(accel)
+            offset += accel.size
+
+        data = np.concatenate(chunks) if chunks else np.zeros(0)
+        catalog = pd.DataFrame(rows, columns=_CATALOG_COLUMNS)
+        pid = os.getpid()
+        tmp_data = directory / f'.{cls.DATA_FILENAME}.{pid}.tmp'
+        tmp_catalog = directory / f'.{cls.CATALOG_FILENAME}.{pid}.tmp'
+        try:
+            with open(tmp_data, 'wb') as f:
+                np.save(f, data.astype(np.float64))
+            with open(tmp_catalog, 'w', newline='') as f:
+                catalog.to_csv(f, index=False)
+            os.replace(tmp_data, directory / cls.DATA_FILENAME)
+            os.replace(tmp_catalog, directory / cls.CATALOG_FILENAME)
+        finally:
+            tmp_data.unlink(missing_ok=True)
+            tmp_catalog.unlink(missing_ok=True)
+        return cls.open(directory)
+
+    # ── 查询 ──────────────────────────────────────────────────────────────────
+
+    def record(self, name: str) -> tuple:
+        """返回记录的 ``(dt, accel)``。``accel`` 为内存映射数组的只读切片，不复制数据。
+
+        Raises
+        ------
+        KeyError
+            记录不在库中。
+        """
+        offset, npts, dt, _, _ = self._rows[Path(name).name]
+        return dt, self._data[offset:offset + npts].view(np.ndarray)
+
+    def is_current(self, name: str) -> bool:
+        """库中的记录是否与源文件一致（源文件大小与修改时间未变；源文件已删除时视为一致）。"""
+        _, _, _, file, stamp = self._rows[Path(name).name]
+        try:
+            st = os.stat(self.directory / file)
+        except OSError:
+            return True
+        return (st.st_size, st.st_mtime_ns) == stamp
+
+    def pairs(self) -> list:
+        """按目录表顺序返回双向记录 ``(X 分量, Y 分量)`` 的记录名列表。"""
+        X = self.catalog[self.catalog['Component'] == 'X']
+        return [(name, pair) for name, pair in zip(X.index, X['Pair']) if pair in self._rows]
+
+    def __contains__(self, name: str) -> bool:
+        return Path(name).name in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self.catalog.index)
@@ -1,21 +1,315 @@
 ########################################################
 # record_utils.py – 地震动记录处理工具
 #
-# 提供从记录文件计算谱加速度（Sa）和峰值地面速度（PGV）的工具函数。
+# 提供读取地震动记录、计算强度参数（PGA/PGV、Arias 强度、显著持时）、
+# 弹性反应谱及谱加速度（Sa）的工具函数。
+# 反应谱由 response_spectra 对 记录 × 阻尼比 × 周期 批量向量化计算。
 ########################################################
 
-import tempfile
 from pathlib import Path
 
-import eqsig.single
 import numpy as np
 
 
-def compute_sa(record_file: str, period: float) -> float:
+def load_record(record_file: str) -> tuple:
+    """读取地震动记录，返回 ``(dt, accel)``。
+
+    Parameters
+    ----------
+    record_file : str
+        地震动记录文件路径（不含扩展名），支持 ``.at2`` 和 ``.txt`` 格式。
+
+    Returns
+    -------
+    tuple[float, numpy.ndarray]
+        时间步长（s）与加速度时程（g）。数组为只读，且在进程内缓存、多处共享。
+
+    Raises
+    ------
+    FileNotFoundError
+        找不到记录文件。
+    ValueError
+        文件中没有可用的加速度时程。
+    """
+    from MDOFModel.analysis.ReadRecord import LoadRecord  # 延迟导入，避免包级循环依赖
+
+    return LoadRecord(str(record_file))
+
+
+def arias_intensity(accel: np.ndarray, dt: float) -> np.ndarray:
+    """累积 Arias 强度 ``Ia(t) = π/(2g) ∫ a² dt``（m/s），返回与 ``accel`` 等长的累积值。
+
+    ``accel`` 单位为 g，g 取 9.8 m/s²。
+    """
+    a = np.asarray(accel, dtype=float) * 9.8
+    return np.cumsum(a * a) * (np.pi / (2 * 9.8) * dt)
+
+
+def significant_duration(accel: np.ndarray, dt: float, start: float = 0.05, end: float = 0.95) -> tuple:
+    """显著持时：累积 Arias 强度从 ``start`` 增长到 ``end`` 所经历的时间。
+
+    Returns
+    -------
+    tuple[float, float, float]
+        ``(持时, 起始时刻, 结束时刻)``（s），默认即 D5-95。
+    """
+    ia = arias_intensity(accel, dt)
+    if ia.size == 0 or ia[-1] <= 0:
+        return 0.0, 0.0, 0.0
+    i0, i1 = np.searchsorted(ia, [start * ia[-1], end * ia[-1]])
+    return float((i1 - i0) * dt), float(i0 * dt), float(i1 * dt)
+
+
+def ground_motion_parameters(accel: np.ndarray, dt: float) -> dict:
+    """地震动强度参数：PGA（g）、PGV（m/s）、Arias 强度 Ia（m/s）与显著持时 D5_95（s）。
+
+    地面速度由加速度按梯形公式积分得到，未做基线校正。
+    """
+    a = np.asarray(accel, dtype=float)
+    if a.size == 0:
+        return {'PGA': 0.0, 'PGV': 0.0, 'Ia': 0.0, 'D5_95': 0.0}
+    vel = np.concatenate(([0.0], np.cumsum((a[1:] + a[:-1]) * (0.5 * 9.8 * dt))))
+    return {
+        'PGA':   float(np.abs(a).max()),
+        'PGV':   float(np.abs(vel).max()),
+        'Ia':    float(arias_intensity(a, dt)[-1]),
+        'D5_95': significant_duration(a, dt)[0],
+    }
+
+
+def trim_record(accel: np.ndarray, dt: float, start: float = 0.001, end: float = 0.999,
+                taper: float = 0.5, tail: float = None, period: float = None) -> tuple:
+    """按累积 Arias 强度截取记录的主要部分，两端加余弦过渡，并在末尾补零作为自由振动段。
+
+    记录首尾常有很长的低幅值段，截去后可显著减少非线性时程分析的步数，而峰值 EDP
+    基本不变。末尾补零使结构在记录结束后自由振动，供残余位移（取最后 5 s 均值）使用。
+
+    Parameters
+    ----------
+    accel : numpy.ndarray
+        加速度时程（g）。
+    dt : float
+        时间步长（s）。
+    start, end : float
+        保留区间的累积 Arias 强度分位，默认 0.1%–99.9%。
+    taper : float
+        两端余弦过渡段的时长（s），不超过保留区间的 1/4。0 表示不加过渡。
+    tail : float, optional
+        末尾补零的时长（s）。默认按 ``max(10, 5 + 5·period)`` 自动确定，
+        ``period`` 未给出时为 10 s。
+    period : float, optional
+        结构基本周期（s），用于自动确定 ``tail``。
+
+    Returns
+    -------
+    tuple[numpy.ndarray, dict]
+        截取后的加速度时程，以及截取信息 ``TrimStart`` / ``TrimEnd``（保留区间在原记录中的
+        起止时刻，s）、``TrimTail``（补零时长，s）、``OriginalDuration``（原记录时长，s）。
+    """
+    a = np.asarray(accel, dtype=float)
+    ia = arias_intensity(a, dt)
+    if a.size < 2 or ia[-1] <= 0:
+        i0, i1 = 0, a.size
+    else:
+        i0 = int(np.searchsorted(ia, start * ia[-1]))
+        i1 = min(int(np.searchsorted(ia, end * ia[-1])) + 1, a.size)
+        i0 = min(i0, i1 - 2)
+    body = a[i0:i1].copy()
+
+    n_taper = min(int(round(taper / dt)), body.size // 4)
+    if n_taper > 0:
+        ramp = 0.5 * (1.0 - np.cos(np.pi * np.arange(n_taper) / n_taper))
+        body[:n_taper] *= ramp
+        body[-n_taper:] *= ramp[::-1]
+
+    if tail is None:
+        tail = max(10.0, 5.0 + 5.0 * period) if period else 10.0
+    n_tail = int(np.ceil(tail / dt - 1e-9))
+    info = {
+        'TrimStart': i0 * dt,
+        'TrimEnd': i1 * dt,
+        'TrimTail': n_tail * dt,
+        'OriginalDuration': a.size * dt,
+    }
+    return np.concatenate((body, np.zeros(n_tail))), info
+
+
+def _nigam_jennings_coefficients(omega: np.ndarray, xi: np.ndarray, dt: np.ndarray) -> tuple:
+    """分段线性荷载下单自由度体系的精确递推系数（Nigam & Jennings, 1968；Chopra 表 5.2.1）。
+
+    单位质量体系 ``ü + 2ξωu̇ + ω²u = p`` 在一个时间步内 p 线性变化时::
+
+        u₁ = A·u₀ + B·v₀ + C·p₀ + D·p₁
+        v₁ = A'·u₀ + B'·v₀ + C'·p₀ + D'·p₁
+
+    各参数可为可广播的数组，返回 ``(A, B, C, D, A', B', C', D')``。
+    """
+    k   = omega ** 2
+    sq  = np.sqrt(1.0 - xi ** 2)
+    wd  = omega * sq
+    e   = np.exp(-xi * omega * dt)
+    s   = np.sin(wd * dt)
+    c   = np.cos(wd * dt)
+    r   = xi / sq
+    wdt = omega * dt
+
+    A  = e * (r * s + c)
+    B  = e * s / wd
+    C  = (2 * xi / wdt + e * (((1 - 2 * xi ** 2) / (wd * dt) - r) * s - (1 + 2 * xi / wdt) * c)) / k
+    D  = (1 - 2 * xi / wdt + e * ((2 * xi ** 2 - 1) / (wd * dt) * s + 2 * xi / wdt * c)) / k
+    Ap = -e * omega / sq * s
+    Bp = e * (c - r * s)
+    Cp = (-1 / dt + e * ((omega / sq + xi / (dt * sq)) * s + c / dt)) / k
+    Dp = (1 - e * (r * s + c)) / (k * dt)
+    return A, B, C, D, Ap, Bp, Cp, Dp
+
+
+def response_spectra(accels, dts, periods, dampings=0.05, min_dt_ratio: float = 4) -> tuple:
+    """批量计算多条记录在多个周期、阻尼比下的弹性反应谱。
+
+    所有 (记录, 阻尼比, 周期) 振子组成一个数组，按 Nigam–Jennings 精确分段线性
+    递推逐时间步同时推进。记录按长度从长到短排列，已结束的记录不再参与后续时间步。
+    与 ``eqsig`` 相同，若 ``min(periods) / 20`` 小于记录时间步长，先将记录线性插值
+    加密（至多 ``min_dt_ratio`` 倍），以免漏掉短周期振子在两个采样点之间的峰值。
+
+    Parameters
+    ----------
+    accels : sequence of array-like
+        各条记录的加速度时程（g）。
+    dts : float or sequence of float
+        各条记录的时间步长（s），可为同一标量。
+    periods : array-like
+        周期（s），须大于 0。
+    dampings : float or array-like
+        阻尼比，默认 5%。
+    min_dt_ratio : float
+        插值加密的最大倍数。
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        ``(Sa, Sv, Sd)``，形状均为 ``(n_records, n_dampings, n_periods)``：
+        拟加速度谱 ω²·Sd（g）、拟速度谱 ω·Sd（m/s）、位移谱 Sd（m）。
+        周期小于 6 倍积分步长时 Sa 取 PGA（与 ``eqsig`` 一致）。
+    """
+    accels   = [np.asarray(a, dtype=float) for a in accels]
+    n_rec    = len(accels)
+    dts      = np.broadcast_to(np.asarray(dts, dtype=float), (n_rec,))
+    periods  = np.atleast_1d(np.asarray(periods, dtype=float))
+    dampings = np.atleast_1d(np.asarray(dampings, dtype=float))
+    n_xi, n_T = len(dampings), len(periods)
+
+    # 插值加密（规则同 eqsig.AccSignal.gen_response_spectrum）
+    loads, steps = [], np.empty(n_rec)
+    for r, (a, dt) in enumerate(zip(accels, dts)):
+        target = max(periods.min() / 20, dt / min_dt_ratio)
+        m = int(np.ceil(dt / target)) if target < dt else 1
+        if m > 1:
+            a = np.interp(np.arange(len(a) * m) / m, np.arange(len(a)), a)
+        loads.append(-9.8 * a)          # p = -a_g（m/s²）
+        steps[r] = dt / m
+
+    # 振子：(阻尼比, 周期) 展平为一维，每条记录一行
+    omega = np.tile(2 * np.pi / periods, n_xi)
+    xi    = np.repeat(dampings, n_T)
+    order = np.argsort([-len(p) for p in loads], kind='stable')
+    lengths = np.array([len(loads[r]) for r in order])
+    A, B, C, D, Ap, Bp, Cp, Dp = _nigam_jennings_coefficients(
+        omega[None, :], xi[None, :], steps[order][:, None])
+    # 消去速度后位移满足二阶差分方程（n ≥ 2）：
+    #   u[n] = b0·p[n] + b1·p[n-1] + b2·p[n-2] - a1·u[n-1] - a2·u[n-2]
+    shape = (n_rec, len(omega))
+    b0, b1, b2 = (np.broadcast_to(x, shape) for x in (D, C - Bp * D + B * Dp, B * Cp - Bp * C))
+    a1, a2     = (np.broadcast_to(x, shape) for x in (-(A + Bp), A * Bp - B * Ap))
+
+    P = np.zeros((n_rec, lengths.max() if n_rec else 0))
+    for row, r in enumerate(order):
+        P[row, :lengths[row]] = loads[r]
+
+    u2   = np.zeros(shape)                    # u[n-2]，u[0] = 0
+    u1   = np.zeros(shape)                    # u[n-1]
+    buf  = np.empty(shape)
+    tmp  = np.empty(shape)
+    umax = np.zeros(shape)
+    if P.shape[1] > 1:
+        u1[...] = C * P[:, :1] + D * P[:, 1:2]
+        np.abs(u1, out=umax)
+        umax[lengths < 2] = 0.0
+    n_active = n_rec
+    for n in range(2, P.shape[1]):
+        # 记录已按长度降序排列，已结束的记录（行）不再推进
+        while n_active and lengths[n_active - 1] <= n:
+            n_active -= 1
+        if not n_active:
+            break
+        k = n_active
+        out, t = buf[:k], tmp[:k]
+        np.multiply(b0[:k], P[:k, n, None], out=out)
+        np.multiply(b1[:k], P[:k, n - 1, None], out=t); out += t
+        np.multiply(b2[:k], P[:k, n - 2, None], out=t); out += t
+        np.multiply(a1[:k], u1[:k], out=t); out -= t
+        np.multiply(a2[:k], u2[:k], out=t); out -= t
+        u2, u1, buf = u1, buf, u2
+        np.abs(out, out=t)
+        np.maximum(umax[:k], t, out=umax[:k])
+
+    inv = np.empty_like(order)
+    inv[order] = np.arange(n_rec)
+    Sd = umax[inv].reshape(n_rec, n_xi, n_T)
+    w  = 2 * np.pi / periods
+    Sv = Sd * w
+    Sa = Sd * w ** 2 / 9.8
+    pga = np.array([np.abs(a).max() if a.size else 0.0 for a in accels])
+    short = periods[None, :] < 6 * steps[:, None]
+    Sa = np.where(short[:, None, :], pga[:, None, None], Sa)
+    return Sa, Sv, Sd
+
+
+def response_spectrum(accel: np.ndarray, dt: float, periods, damping: float = 0.05) -> tuple:
+    """计算单条记录的弹性反应谱，见 :func:`response_spectra`。
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        ``(Sa, Sv, Sd)``，长度均与 ``periods`` 相同。
+    """
+    Sa, Sv, Sd = response_spectra([accel], dt, periods, damping)
+    return Sa[0, 0], Sv[0, 0], Sd[0, 0]
+
+
+def compute_spectra(record_files: list, periods, dampings=0.05, batch_size: int = 64) -> tuple:
+    """批量读取记录并计算反应谱，用于记录筛选、谱形比较等大批量场景。
+
+    Parameters
+    ----------
+    record_files : list[str]
+        记录文件路径（不含扩展名）。
+    periods : array-like
+        周期（s）。
+    dampings : float or array-like
+        阻尼比，默认 5%。
+    batch_size : int
+        每批同时推进的记录数，用于控制内存。
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        ``(Sa, Sv, Sd)``，形状为 ``(len(record_files), n_dampings, n_periods)``，含义同
+        :func:`response_spectra`。
+    """
+    out = []
+    for start in range(0, len(record_files), batch_size):
+        loaded = [load_record(f) for f in record_files[start:start + batch_size]]
+        out.append(response_spectra([a for _, a in loaded], [dt for dt, _ in loaded], periods, dampings))
+    return tuple(np.concatenate([o[j] for o in out]) for j in range(3))
+
+
+def compute_sa(record_file: str, period: float, damping: float = 0.05, use_index: bool = False) -> float:
     """计算单条地震动记录在给定周期处的弹性谱加速度（g）。
 
-    读取 PEER AT2 或 TXT 格式地震动记录，利用 ``eqsig`` 计算
-    单自由度弹性反应谱，返回给定周期处的谱加速度。
+    默认对该周期精确积分（记录读取结果在进程内缓存）。``use_index=True`` 时改从记录所在目录的
+    反应谱索引（见 :class:`~MDOFModel.utils.spectrum_index.SpectrumIndex`）对数插值，
+    不再读取记录文件，但有插值误差（个别周期可达数个百分点），不宜用于确定缩放系数。
 
     Parameters
     ----------
@@ -23,22 +317,18 @@ def compute_sa(record_file: str, period: float) -> float:
         地震动记录文件路径（不含扩展名），支持 ``.at2`` 和 ``.txt`` 格式。
     period : float
         计算谱加速度的目标周期（单位：s），通常取结构基本周期 T₁。
+    damping : float
+        阻尼比，默认 5%。
+    use_index : bool, default False
+        True 时查询反应谱索引（近似值）；记录首次查询时计算其整张谱并写入索引。
 
     Returns
     -------
     float
-        谱加速度 Sa（g），阻尼比 5%。
+        谱加速度 Sa（g）。
     """
-    from MDOFModel.analysis import ReadRecord  # 延迟导入，避免包级循环依赖
-
-    with tempfile.NamedTemporaryFile(suffix='.dat', mode='w', delete=False) as f:
-        tmp = f.name
-    try:
-        dt, _ = ReadRecord.ReadRecord(record_file, tmp)
-        accel = np.array(open(tmp).read().split(), dtype=float)
-    finally:
-        Path(tmp).unlink(missing_ok=True)
-    sig = eqsig.single.AccSignal(accel * 9.8, dt)
-    sig.generate_response_spectrum(response_times=np.array([period]))
-    return float(sig.s_a[0] / 9.8)
-
+    if use_index:
+        from .spectrum_index import SpectrumIndex
+        return SpectrumIndex.open(Path(record_file).parent).sa(record_file, period, damping)
+    dt, accel = load_record(record_file)
+    return float(response_spectrum(accel, dt, [period], damping)[0][0])
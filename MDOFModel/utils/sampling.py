@@ -0,0 +1,69 @@
+########################################################
+# sampling.py – 蒙特卡洛抽样工具
+#
+# 生成 (0,1) 上的均匀样本矩阵或标准正态样本矩阵，可选伪随机、Sobol 低差异序列
+# 或拉丁超立方（LHS）抽样，供 EDP 模拟与 Hazus 破坏状态抽样共用。
+# Sobol 与 LHS 默认随机化（scramble）：每组样本仍是无偏估计，用不同种子重复抽样
+# 得到的各组估计相互独立，其离散程度即为蒙特卡洛误差的估计。
+########################################################
+
+import warnings
+
+import numpy as np
+from scipy.special import ndtri
+
+# 可选的抽样方法
+SAMPLING_METHODS = ('random', 'sobol', 'lhs')
+
+# 均匀样本限制在 (_EPS, 1-_EPS) 内，避免未随机化的 Sobol 首点 0 经逆变换得到 -inf
+_EPS = 1e-12
+
+
+def uniform_samples(n: int, d: int, method: str = 'random', seed=None, scramble: bool = True) -> np.ndarray:
+    """生成 ``(n, d)`` 的 (0,1) 均匀样本。
+
+    Parameters
+    ----------
+    n : int
+        样本数。Sobol 序列在 n 为 2 的幂时均衡性最好，其他 n 也可使用。
+    d : int
+        维数（每个样本所需的独立随机数个数）。
+    method : {'random', 'sobol', 'lhs'}, default 'random'
+        伪随机、Sobol 低差异序列或拉丁超立方抽样。
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        随机数种子或生成器，同时决定 Sobol / LHS 的随机化。
+    scramble : bool, default True
+        Sobol / LHS 是否随机化；``False`` 时每次得到相同的点集，无法估计误差。
+
+    Returns
+    -------
+    numpy.ndarray
+        ``(n, d)`` 均匀样本。
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'random':
+        return rng.random((n, d))
+    if n == 0 or d == 0:
+        return np.empty((n, d))
+
+    from scipy.stats import qmc
+    if method == 'sobol':
+        sampler = qmc.Sobol(d, scramble=scramble, seed=rng)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)   # n 不是 2 的幂时的均衡性提示
+            u = sampler.random(n)
+    elif method == 'lhs':
+        u = qmc.LatinHypercube(d, scramble=scramble, seed=rng).random(n)
+    else:
+        raise ValueError(f"未知的抽样方法 {method!r}，可选 {SAMPLING_METHODS}。")
+    return np.clip(u, _EPS, 1.0 - _EPS)
+
+
+def normal_samples(n: int, d: int, method: str = 'random', seed=None, scramble: bool = True) -> np.ndarray:
+    """生成 ``(n, d)`` 的标准正态样本，参数同 :func:`uniform_samples`。
+
+    ``'random'`` 直接调用 ``Generator.standard_normal``；Sobol / LHS 由均匀样本经正态分布逆变换得到。
+    """
+    if method == 'random':
+        return np.random.default_rng(seed).standard_normal((n, d))
+    return ndtri(uniform_samples(n, d, method, seed, scramble))
@@ -0,0 +1,96 @@
+########################################################
+# scratch.py – 单次分析的临时文件命名空间
+#
+# 每次分析（进程 × 记录 × IM）在根目录下用 mkdtemp 建立独立的临时目录，
+# 目录名含可读的标签与进程号，后缀随机，多进程、多次 IDA 同时运行也不会冲突。
+# 根目录可放在内存文件系统（/dev/shm）上，recorder 的写入与读回不经过磁盘；
+# 结果读取后（退出 with 块时）自动删除。
+########################################################
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+# 内存文件系统的候选位置，依次尝试
+_TMPFS_CANDIDATES = ('/dev/shm',)
+
+# 目录名中只保留字母、数字和 ._-，其余字符（含中文与路径分隔符）替换为 '_'
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def tmpfs_root() -> Path:
+    """内存文件系统上的临时目录根，不可用时（如 Windows、macOS）退回系统临时目录。"""
+    for path in _TMPFS_CANDIDATES:
+        if os.path.isdir(path) and os.access(path, os.W_OK | os.X_OK):
+            return Path(path)
+    return Path(tempfile.gettempdir())
+
+
+def opensees_path(path: Union[str, Path]) -> str:
+    """传给 OpenSees 命令的文件路径：尽量用相对于工作目录的路径，避免路径中有中文字符；
+    不能表示为相对路径时（如 Windows 上不同盘符）返回绝对路径。"""
+    try:
+        return os.path.relpath(path, Path.cwd())
+    except ValueError:
+        return str(Path(path).resolve())
+
+
+class ScratchSpace:
+    """一次分析的临时文件命名空间，用作上下文管理器。
+
+    Parameters
+    ----------
+    mode : {None, 'disk', 'tmpfs'}
+        - ``None``：不建立新目录，直接使用 ``base``，退出时不删除（旧方式，文件名须由调用方区分）；
+        - ``'disk'``：在 ``base`` 下建立独立的临时目录；
+        - ``'tmpfs'``：在 :func:`tmpfs_root` 下建立独立的临时目录，``base`` 不使用。
+    base : str or Path
+        ``mode`` 为 ``None`` 或 ``'disk'`` 时的根目录，不存在时自动建立。
+    tag : str
+        目录名中的可读标签（如记录名与 IM），不影响唯一性。
+    keep : bool
+        退出时是否保留新建的目录，便于检查 recorder 输出与日志。
+
+    Examples
+    --------
+    >>> with ScratchSpace('tmpfs', tag='RSN68_IM3') as scratch:
+    ...     ops.recorder('Node', '-file', opensees_path(scratch.file('disp.out')), ...)
+    ...     ...
+    ...     data = np.loadtxt(scratch.file('disp.out'))
+    """
+
+    MODES = (None, 'disk', 'tmpfs')
+
+    def __init__(self, mode: Optional[str] = 'disk', base: Union[str, Path] = '.',
+                 tag: str = '', keep: bool = False):
+        if mode not in self.MODES:
+            raise ValueError(f"未知的临时文件方式 {mode!r}，应为 None、'disk' 或 'tmpfs'。")
+        self.mode = mode
+        self.keep = keep
+        if mode is None:
+            self.path = Path(base)
+            self.path.mkdir(parents=True, exist_ok=True)
+            return
+        root = tmpfs_root() if mode == 'tmpfs' else Path(base)
+        root.mkdir(parents=True, exist_ok=True)
+        prefix = _UNSAFE_CHARS.sub('_', tag).strip('_')
+        prefix = f"{prefix}_{os.getpid()}_" if prefix else f"{os.getpid()}_"
+        self.path = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+
+    def file(self, name: str) -> Path:
+        """命名空间内的文件路径。"""
+        return self.path / name
+
+    def cleanup(self) -> None:
+        """删除新建的临时目录（``mode`` 为 ``None`` 或 ``keep=True`` 时不删除）。可重复调用。"""
+        if self.mode is not None and not self.keep:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> 'ScratchSpace':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cleanup()
@@ -0,0 +1,39 @@
+# 执行器基类不可直接实例化；MPI 工作进程初始化出错时应回报根进程而不是退出
+from collections import deque
+
+import pytest
+
+from MDOFModel.analysis.Executors import IDAExecutor, MPIExecutor, SerialExecutor
+
+
+def test_executor_base_is_abstract():
+    with pytest.raises(TypeError):
+        IDAExecutor()
+    assert SerialExecutor().map(pow, [(2, 3), (3, 2)]) == [8, 9]
+
+
+class _FakeComm:
+    # 只模拟 serve 用到的 recv / send：依次返回根进程发来的命令，记录回报
+    def __init__(self, commands):
+        self.commands = deque(commands)
+        self.sent = []
+
+    def recv(self, source, tag):
+        return self.commands.popleft()
+
+    def send(self, obj, dest, tag):
+        self.sent.append((tag, obj))
+
+
+def _bad_init():
+    raise ValueError('boom')
+
+
+def test_mpi_serve_reports_init_error():
+    ex = MPIExecutor.__new__(MPIExecutor)   # 不经 mpi4py 初始化，只测试工作进程的命令循环
+    ex.root = 0
+    ex.comm = _FakeComm([('init', _bad_init, ()), ('task', 1, pow, (2, 3)), ('stop',)])
+    ex.serve()
+    (init_tag, init_err), (task_tag, task_reply) = ex.comm.sent
+    assert init_tag == MPIExecutor._TAG_INIT and 'ValueError: boom' in init_err
+    assert task_tag == MPIExecutor._TAG_RESULT and task_reply == (1, 8, None)
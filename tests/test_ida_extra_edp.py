@@ -0,0 +1,71 @@
+# 批量分析（DynamicAnalysisBatch）与逐次分析得到的 ExtraEDP 列应一致
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from MDOFModel.analysis import IDA_2D
+from MDOFModel.models.MDOFOpenSees import MDOFOpenSees
+
+EXAMPLE_RECORD = Path(__file__).resolve().parents[1] / 'Examples' / 'Example1_ShearBuildingModel' / 'H-E12140.AT2'
+EXTRA = {'Tcust': 'T1_custom', 'm': 'size'}
+
+
+@pytest.fixture
+def record(tmp_path):
+    # ReadRecord 按小写 .at2 查找记录
+    shutil.copy(EXAMPLE_RECORD, tmp_path / 'H-E12140.at2')
+    return str(tmp_path / 'H-E12140')
+
+
+def _elastic_model(outdir):
+    N = 3
+    fe = MDOFOpenSees(N, [2e5] * N, [4e7] * N, 0.05, 'Elastic',
+                      [2e5 * 9.8 * 0.4] * N, [2.0] * N, [0.1] * N, [0.05] * N, 0.0)
+    fe.outputdir = str(outdir)
+    fe.T1_custom = 1.23
+    return fe
+
+
+class _ScalingModel(MDOFOpenSees):
+    # DynamicAnalysis 时记录缩放系数，模拟只有逐次分析才会更新的属性
+    def DynamicAnalysis(self, EQRecordfile, GMScaling, ifprint=True, DeltaT=0.1):
+        self.LastScaling = GMScaling
+        return super().DynamicAnalysis(EQRecordfile, GMScaling, ifprint, DeltaT)
+
+
+@pytest.mark.parametrize('batch', [True, False])
+def test_extra_edp_reads_model(tmp_path, record, monkeypatch, batch):
+    if not batch:
+        monkeypatch.setattr(IDA_2D, '_supports_batch', lambda *a, **k: False)
+    fe = _elastic_model(tmp_path)
+    extra = {'Res': 'ResDrift'}
+    assert IDA_2D._supports_batch(fe, extra) == batch
+    df = IDA_2D.IDA_1record(fe, [0.1, 0.2], record, 0.5, DeltaT=0.05, ExtraEDP={**extra, **EXTRA})
+    assert np.allclose(df['Res'], df['ResDrift'])
+    assert np.allclose(df['Tcust'], 1.23)
+    # 模型没有的属性为 NaN，不能取到结果行（Series）自身的属性
+    assert df['m'].isna().all()
+
+
+def test_extra_edp_batch_matches_serial(tmp_path, record, monkeypatch):
+    extra = {'Res': 'ResDrift', 'Drift': 'MaxDrift'}
+    assert IDA_2D._supports_batch(_elastic_model(tmp_path), extra)
+    ref = IDA_2D.IDA_1record(_elastic_model(tmp_path), [0.1, 0.2], record, 0.5, DeltaT=0.05, ExtraEDP=extra)
+    monkeypatch.setattr(IDA_2D, '_supports_batch', lambda *a, **k: False)
+    one = IDA_2D.IDA_1record(_elastic_model(tmp_path), [0.1, 0.2], record, 0.5, DeltaT=0.05, ExtraEDP=extra)
+    assert np.allclose(ref['Res'], one['Res'])
+    assert np.allclose(np.vstack(ref['Drift'].map(np.ravel)), np.vstack(one['Drift'].map(np.ravel)))
+
+
+def test_extra_edp_outside_batch_runs_per_im(tmp_path, record):
+    # ExtraEDP 引用批量结果之外的属性时退回逐个 IM 分析，每行取到该 IM 的值
+    N = 3
+    fe = _ScalingModel(N, [2e5] * N, [4e7] * N, 0.05, 'Elastic',
+                       [2e5 * 9.8 * 0.4] * N, [2.0] * N, [0.1] * N, [0.05] * N, 0.0)
+    fe.outputdir = str(tmp_path)
+    extra = {'SF': 'LastScaling'}
+    assert not IDA_2D._supports_batch(fe, extra)
+    df = IDA_2D.IDA_1record(fe, [0.1, 0.2, 0.4], record, 0.5, DeltaT=0.05, ExtraEDP=extra)
+    assert np.allclose(df['SF'] / df['IM'], df['SF'].iloc[0] / df['IM'].iloc[0])
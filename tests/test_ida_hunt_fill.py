@@ -0,0 +1,49 @@
+# hunt & fill 在 IDA 曲线非单调（倒塌后“复活”）时应在 max_runs 次内结束，且不重复分析同一 IM
+from types import SimpleNamespace
+
+import pytest
+
+from MDOFModel.analysis import IDA_2D
+
+MAX_RUNS = 12
+
+
+def _resurrecting(IM):
+    # 0.2 < IM < 0.3 倒塌，0.3 ~ 0.9 又能完成分析，IM >= 0.9 倒塌
+    return 0.2 < IM < 0.3 or IM >= 0.9
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_run_one_im(FEModel, IM, SF, record_x, record_y=None, DeltaT='AsInRecord', ExtraEDP=None,
+                        batch_row=None):
+        calls.append(IM)
+        if len(calls) > 2 * MAX_RUNS:
+            raise AssertionError('hunt & fill 超出分析次数上限')
+        collapsed = _resurrecting(IM)
+        data = {'IM': IM, 'EQRecord': record_x, 'MaxDrift': [[0.01 * IM]],
+                'Iffinish': not collapsed, 'Collapsed': collapsed}
+        return data, not collapsed, collapsed, 1.0, 1.0
+
+    monkeypatch.setattr(IDA_2D, '_record_sa_ref', lambda *a, **k: 1.0)
+    monkeypatch.setattr(IDA_2D, '_run_one_im', fake_run_one_im)
+    return calls
+
+
+def test_hunt_fill_resurrection_terminates(calls):
+    fe = SimpleNamespace(UniqueRecorderPrefix='')
+    df = IDA_2D.IDA_1record_hunt_fill(fe, 'RSN1', 1.0, HuntFill={'max_runs': MAX_RUNS})
+    assert len(calls) == MAX_RUNS
+    assert len(df) == MAX_RUNS
+    assert df['IM'].is_unique
+    # 复活区间内倒塌的填充点保留在结果中
+    assert any(0.2 < im < 0.3 for im in df['IM'])
+
+
+def test_hunt_step_is_geometric(calls):
+    fe = SimpleNamespace(UniqueRecorderPrefix='')
+    IDA_2D.IDA_1record_hunt_fill(fe, 'RSN1', 1.0, HuntFill={
+        'IM_start': 0.1, 'IM_step': 0.1, 'step_growth': 0.5, 'max_runs': 3})
+    assert calls == pytest.approx([0.1, 0.2, 0.35])